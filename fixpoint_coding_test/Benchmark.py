@@ -0,0 +1,400 @@
+"""
+大規模なログデータの生成と、読み込み・検出・ネットワーク解析の性能測定を行う
+
+`generate_log`は乱数のシードを固定した、再現可能なログデータを生成する。
+`run_benchmarks`は行数ごとにログデータを生成し、各処理の所要時間・スループット・ピークメモリを測定する。
+コマンドラインから実行した場合は、測定結果をJSON形式で標準出力に書き出す。
+
+    python -m fixpoint_coding_test.Benchmark --sizes 1000 10000 100000
+"""
+
+import argparse
+import functools
+import gc
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fixpoint_coding_test import Network, Server
+
+
+# ログの日時の開始時点
+START_DATETIME: str = "20201019000000"
+# 1度にファイルへ書き込む行数
+_WRITE_BATCH_ROWS: int = 1 << 16
+# 正常時と過負荷時の応答時間の範囲(ミリ秒)
+_NORMAL_RESPONSE: Tuple[int, int] = (1, 50)
+_OVERLOAD_RESPONSE: Tuple[int, int] = (200, 1000)
+
+
+def server_addresses(servers: int, subnets: int, nested: bool = False) -> List[str]:
+    """
+    サーバーのIPアドレスとネットワークプレフィックス長のペアを生成する
+
+    `k`番目のサブネットは`10.(k // 256).(k % 256).0/24`となり、サーバーは各サブネットへ順に割り当てられる。
+    `nested`が`True`の場合、`k % 256 == 0`のサブネットは`10.(k // 256).0.0/16`となり、
+    同じ`/16`に含まれる他の`/24`のサブネットを配下に持つ。
+
+    Parameters
+    ----------
+    servers : int
+        サーバー数
+    subnets : int
+        サブネット数
+    nested : bool, default = False
+        多段のサブネットを生成するかどうかを指定する
+
+    Returns
+    -------
+    List[str]
+        `"10.20.30.1/24"`の形式のアドレスの並び
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    if not (servers > 0):
+        raise ValueError(f"servers must over 0 (now {servers})")
+    if not (0 < subnets <= min(servers, 1 << 16)):
+        raise ValueError(f"subnets must be in 1 ~ {min(servers, 1 << 16)} (now {subnets})")
+    if not (math.ceil(servers / subnets) < 255):
+        raise ValueError(f"servers per subnet must under 255 (now {math.ceil(servers / subnets)})")
+
+    addresses: List[str] = []
+    for i in range(servers):
+        subnet, host = i % subnets, i // subnets + 1
+        upper, lower = subnet // 256, subnet % 256
+        prefix = 16 if nested and lower == 0 else 24
+        addresses.append(f"10.{upper}.{lower}.{host}/{prefix}")
+    return addresses
+
+
+def generate_log(
+    file_path: str,
+    rows: int,
+    servers: int = 100,
+    subnets: int = 10,
+    timeout_rate: float = 0.01,
+    overload_rate: float = 0.01,
+    switch_down_rate: float = 0.001,
+    burst: int = 5,
+    nested: bool = False,
+    seed: int = 0,
+) -> int:
+    """
+    ログデータを生成してファイルに書き込む
+
+    全サーバーが1秒ごとに1回応答ログを記録するものとし、日時の昇順に`rows`行を書き込む。
+    同じ引数であれば、常に同じ内容のファイルが生成される。
+
+    Parameters
+    ----------
+    file_path : str
+        書き込み先のファイルパス
+    rows : int
+        ログデータの行数(説明文の行を除く)
+    servers : int, default = 100
+        サーバー数
+    subnets : int, default = 10
+        サブネット数(`server_addresses`参照)
+    timeout_rate : float, default = 0.01
+        サーバーごとに、1秒あたりに`burst`秒間のタイムアウトが始まる確率
+    overload_rate : float, default = 0.01
+        サーバーごとに、1秒あたりに`burst`秒間の過負荷が始まる確率
+    switch_down_rate : float, default = 0.001
+        サブネットごとに、1秒あたりに`burst`秒間サブネット内の全サーバーがタイムアウトし始める確率
+    burst : int, default = 5
+        タイムアウト・過負荷・スイッチのダウンが継続する秒数
+    nested : bool, default = False
+        多段のサブネットを生成するかどうかを指定する
+    seed : int, default = 0
+        乱数のシード
+
+    Returns
+    -------
+    int
+        書き込んだ行数
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    if not (rows >= 0):
+        raise ValueError(f"rows must over or equal 0 (now {rows})")
+    if not (burst > 0):
+        raise ValueError(f"burst must over 0 (now {burst})")
+    for name, rate in (("timeout_rate", timeout_rate), ("overload_rate", overload_rate)):
+        if not (0 <= rate <= 1):
+            raise ValueError(f"{name} must be in 0 ~ 1 (now {rate})")
+    if not (0 <= switch_down_rate <= 1):
+        raise ValueError(f"switch_down_rate must be in 0 ~ 1 (now {switch_down_rate})")
+
+    addresses = server_addresses(servers, subnets, nested=nested)
+    server_subnets = [i % subnets for i in range(servers)]
+    generator = random.Random(seed)
+    start_epoch = Server.parse_epoch(START_DATETIME)
+
+    # サーバーごと・サブネットごとの、タイムアウト・過負荷・スイッチのダウンが継続する残り秒数
+    timeout_left = [0] * servers
+    overload_left = [0] * servers
+    switch_left = [0] * subnets
+
+    written = 0
+    with open(file_path, "w") as f:
+        f.write("datetime,server address,response time\n")
+        lines: List[str] = []
+        second = 0
+        while written < rows:
+            datetime_str = Server.epoch_to_datetime(start_epoch + second).strftime("%Y%m%d%H%M%S")
+            for subnet in range(subnets):
+                if switch_left[subnet] != 0:
+                    switch_left[subnet] -= 1
+                elif generator.random() < switch_down_rate:
+                    switch_left[subnet] = burst
+            for i in range(servers):
+                if written == rows:
+                    break
+                if timeout_left[i] != 0:
+                    timeout_left[i] -= 1
+                elif generator.random() < timeout_rate:
+                    timeout_left[i] = burst
+                if overload_left[i] != 0:
+                    overload_left[i] -= 1
+                elif generator.random() < overload_rate:
+                    overload_left[i] = burst
+
+                if timeout_left[i] != 0 or switch_left[server_subnets[i]] != 0:
+                    response = "-"
+                else:
+                    low, high = _OVERLOAD_RESPONSE if overload_left[i] != 0 else _NORMAL_RESPONSE
+                    response = str(generator.randint(low, high))
+                lines.append(f"{datetime_str},{addresses[i]},{response}\n")
+                written += 1
+            if len(lines) >= _WRITE_BATCH_ROWS:
+                f.writelines(lines)
+                lines.clear()
+            second += 1
+        f.writelines(lines)
+    return written
+
+
+def measure(stage: str, rows: int, func: Callable[[], Any], trace_memory: bool = True) -> Tuple[Dict[str, Any], Any]:
+    """
+    処理の所要時間とピークメモリを測定する
+
+    Parameters
+    ----------
+    stage : str
+        測定結果に記録する処理の名前
+    rows : int
+        処理の対象となるログデータの行数。スループットの計算に用いる
+    func : Callable[[], Any]
+        測定する処理
+    trace_memory : bool, default = True
+        `tracemalloc`でピークメモリを測定するかどうかを指定する。測定中は処理が遅くなる
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], Any]
+        測定結果と、`func`の返り値のペア
+    """
+
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - started
+        peak: Optional[int] = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    record = {
+        "stage": stage,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+    return record, result
+
+
+def _server_downtimes(servers: Dict[str, Server.Server], continuous: int) -> List[Any]:
+    """
+    `run_benchmarks`で計測する、サーバーごとのダウンタイムを求める
+    """
+
+    return [server.get_downtimes(continuous=continuous) for server in servers.values()]
+
+
+def _server_overload_times(servers: Dict[str, Server.Server], continuous: int, time_threshold: int) -> List[Any]:
+    """
+    `run_benchmarks`で計測する、サーバーごとの過負荷状態の期間を求める
+    """
+
+    return [
+        server.get_overload_times(continuous=continuous, time_threshold=time_threshold) for server in servers.values()
+    ]
+
+
+def _network_downtimes(networks: List[Network.Network], continuous: int) -> List[Any]:
+    """
+    `run_benchmarks`で計測する、ネットワークごとのダウンタイムを求める
+    """
+
+    return [network.get_network_downtime(continuous=continuous) for network in networks]
+
+
+def _switch_downtimes(networks: List[Network.Network], continuous: int) -> Any:
+    """
+    `run_benchmarks`で計測する、多段のネットワークスイッチのダウンタイムを求める
+    """
+
+    return Network.NetworkTree(networks).get_switch_downtimes(continuous=continuous)
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    servers: int = 100,
+    subnets: int = 10,
+    continuous: int = 3,
+    time_threshold: int = 100,
+    nested: bool = False,
+    seed: int = 0,
+    trace_memory: bool = True,
+    work_dir: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    行数ごとにログデータを生成し、読み込み・各検出処理・ネットワーク解析の性能を測定する
+
+    測定する処理は以下の通り。
+
+    - `generate`: `generate_log`によるログデータの生成
+    - `server_load_data`: `Server.load_data`による読み込み
+    - `get_downtimes`: 全サーバーの`Server.get_downtimes`
+    - `get_overload_times`: 全サーバーの`Server.get_overload_times`
+    - `network_load_data`: `Network.load_data`による読み込み
+    - `get_network_downtime`: 全ネットワークの`Network.get_network_downtime`
+    - `get_switch_downtimes`: `NetworkTree.get_switch_downtimes` (`nested`が`True`の場合のみ)
+
+    Parameters
+    ----------
+    sizes : Sequence[int]
+        測定するログデータの行数の並び
+    servers : int, default = 100
+        サーバー数。行数より多い場合は行数に切り詰める
+    subnets : int, default = 10
+        サブネット数。サーバー数より多い場合はサーバー数に切り詰める
+    continuous : int, default = 3
+        ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+    nested : bool, default = False
+        多段のサブネットを生成するかどうかを指定する
+    seed : int, default = 0
+        乱数のシード
+    trace_memory : bool, default = True
+        `tracemalloc`でピークメモリを測定するかどうかを指定する
+    work_dir : Optional[str], default = None
+        ログデータを生成するディレクトリ。`None`の場合は一時ディレクトリを作成し、測定後に削除する
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        処理ごとの測定結果。`stage`・`rows`・`seconds`・`rows_per_second`・`peak_memory_bytes`を持つ
+    """
+
+    if work_dir is None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            return run_benchmarks(
+                sizes, servers, subnets, continuous, time_threshold, nested, seed, trace_memory, work_dir=tmp_dir
+            )
+
+    records: List[Dict[str, Any]] = []
+    for rows in sizes:
+        size_servers = max(1, min(servers, rows))
+        size_subnets = min(subnets, size_servers)
+        file_path = os.path.join(work_dir, f"benchmark_{rows}.csv")
+
+        def _stage(stage: str, func: Callable[[], Any]) -> Any:
+            record, result = measure(stage, rows, func, trace_memory=trace_memory)
+            record.update(servers=size_servers, subnets=size_subnets, nested=nested)
+            records.append(record)
+            return result
+
+        try:
+            _stage(
+                "generate",
+                lambda: generate_log(
+                    file_path, rows, servers=size_servers, subnets=size_subnets, nested=nested, seed=seed
+                ),
+            )
+            server_dict = _stage("server_load_data", lambda: Server.load_data(file_path=file_path))
+            _stage("get_downtimes", functools.partial(_server_downtimes, server_dict, continuous))
+            _stage(
+                "get_overload_times",
+                functools.partial(_server_overload_times, server_dict, continuous, time_threshold),
+            )
+            del server_dict
+
+            networks = _stage("network_load_data", lambda: Network.load_data(file_path=file_path))
+            _stage("get_network_downtime", functools.partial(_network_downtimes, networks, continuous))
+            if nested:
+                _stage("get_switch_downtimes", functools.partial(_switch_downtimes, networks, continuous))
+            del networks
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    return records
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    コマンドラインから性能測定を実行し、測定結果をJSON形式で書き出す
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark ingest and detection on synthetic ping logs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**exponent for exponent in range(3, 7)])
+    parser.add_argument("--servers", type=int, default=100)
+    parser.add_argument("--subnets", type=int, default=10)
+    parser.add_argument("--continuous", type=int, default=3)
+    parser.add_argument("--time-threshold", type=int, default=100)
+    parser.add_argument("--nested", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false")
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--output", default=None, help="write JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    records = run_benchmarks(
+        args.sizes,
+        servers=args.servers,
+        subnets=args.subnets,
+        continuous=args.continuous,
+        time_threshold=args.time_threshold,
+        nested=args.nested,
+        seed=args.seed,
+        trace_memory=args.trace_memory,
+        work_dir=args.work_dir,
+    )
+    if args.output is None:
+        json.dump(records, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+パース済みのログデータを保存するバイナリキャッシュ
+
+ログデータと同じディレクトリに`<ログデータのファイル名>.fpcache`という名前で保存する。
+ファイルは以下の順に並んだセクションで構成される。数値はすべて書き込んだ環境のバイトオーダーで記録する。
+
+1. ヘッダ (`_HEADER`)
+    マジックナンバー、フォーマットのバージョン、バイトオーダー、元ログデータのサイズと更新日時、
+    サーバー数、応答ログの総数、アドレス表のバイト数
+2. サーバー表 (`_ENTRY` × サーバー数)
+    各サーバーの応答ログの開始位置と件数、アドレス表内のインターフェース文字列の位置と長さ
+3. アドレス表
+    インターフェース文字列をUTF-8で符号化して連結したバイト列。8バイト境界まで0で埋める
+4. エポック秒の列 (int64 × 応答ログの総数)
+5. 応答時間の列 (int32 × 応答ログの総数)
+
+応答ログはサーバーごとに連続して並んでいるため、`mmap`したファイルから
+コピーせずにサーバーごとの列を切り出すことができる。
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+CACHE_SUFFIX: str = ".fpcache"
+
+_MAGIC: bytes = b"FPCT"
+_VERSION: int = 1
+_BYTEORDER_LITTLE: int = 0
+_BYTEORDER_BIG: int = 1
+# magic, version, byteorder, source_size, source_mtime_ns, n_servers, n_samples, address_table_bytes
+_HEADER: struct.Struct = struct.Struct("=4sHHqqQQQ")
+# sample_offset, sample_count, address_offset, address_length
+_ENTRY: struct.Struct = struct.Struct("=QQII")
+
+
+def cache_path(file_path: str) -> str:
+    """
+    ログデータに対応するキャッシュファイルのパスを返す
+    """
+
+    return file_path + CACHE_SUFFIX
+
+
+def write_cache(file_path: str, columns: Mapping[str, Tuple[Sequence[int], Sequence[int]]]) -> str:
+    """
+    パース済みのログデータをキャッシュファイルに書き込む
+
+    書き込みは一時ファイルを経由して置き換えるため、読み込み中の別プロセスが壊れたキャッシュを読むことはない。
+
+    Parameters
+    ----------
+    file_path : str
+        キャッシュの元となったログデータのファイルパス
+    columns : Mapping[str, Tuple[Sequence[int], Sequence[int]]]
+        インターフェース文字列をキーとした、エポック秒の列と応答時間の列のペア
+
+    Returns
+    -------
+    str
+        書き込んだキャッシュファイルのパス
+
+    Raises
+    ------
+    OSError
+        キャッシュファイルを書き込めなかった。書き込み途中の一時ファイルは削除される
+    """
+
+    stat = os.stat(file_path)
+    addresses: List[bytes] = [address.encode("utf-8") for address in columns.keys()]
+    address_table = b"".join(addresses)
+    address_table += b"\0" * (-len(address_table) % 8)
+
+    entries: List[bytes] = []
+    sample_offset = 0
+    address_offset = 0
+    for address, (timestamps, _) in zip(addresses, columns.values()):
+        entries.append(_ENTRY.pack(sample_offset, len(timestamps), address_offset, len(address)))
+        sample_offset += len(timestamps)
+        address_offset += len(address)
+
+    byteorder = _BYTEORDER_LITTLE if sys.byteorder == "little" else _BYTEORDER_BIG
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, byteorder, stat.st_size, stat.st_mtime_ns, len(columns), sample_offset, len(address_table)
+    )
+
+    path = cache_path(file_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(b"".join(entries))
+            f.write(address_table)
+            for timestamps, _ in columns.values():
+                array("q", timestamps).tofile(f)
+            for _, responses in columns.values():
+                array("i", responses).tofile(f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # 容量不足などで書き込めなかった場合、書きかけの一時ファイルを残さない
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def read_cache(file_path: str) -> Optional[Dict[str, Tuple[memoryview, memoryview]]]:
+    """
+    ログデータに対応するキャッシュファイルを`mmap`で開き、サーバーごとの列を取り出す
+
+    返される列はキャッシュファイルを`mmap`した領域をそのまま参照する読み取り専用の`memoryview`であり、
+    データのコピーやパースは行わない。
+
+    Parameters
+    ----------
+    file_path : str
+        キャッシュの元となったログデータのファイルパス
+
+    Returns
+    -------
+    Optional[Dict[str, Tuple[memoryview, memoryview]]]
+        インターフェース文字列をキーとした、エポック秒の列と応答時間の列のペア。
+        キャッシュが存在しない、もしくはログデータの更新などにより無効な場合は`None`
+    """
+
+    path = cache_path(file_path)
+    try:
+        stat = os.stat(file_path)
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        return None
+    (
+        magic,
+        version,
+        byteorder,
+        source_size,
+        source_mtime_ns,
+        n_servers,
+        n_samples,
+        address_table_bytes,
+    ) = _HEADER.unpack_from(view)
+    expected_byteorder = _BYTEORDER_LITTLE if sys.byteorder == "little" else _BYTEORDER_BIG
+    if (
+        magic != _MAGIC
+        or version != _VERSION
+        or byteorder != expected_byteorder
+        or source_size != stat.st_size
+        or source_mtime_ns != stat.st_mtime_ns
+    ):
+        return None
+
+    entries_offset = _HEADER.size
+    address_offset = entries_offset + _ENTRY.size * n_servers
+    timestamps_offset = address_offset + address_table_bytes
+    responses_offset = timestamps_offset + array("q").itemsize * n_samples
+    if len(view) != responses_offset + array("i").itemsize * n_samples:
+        return None
+
+    all_timestamps = view[timestamps_offset:responses_offset].cast("q")
+    all_responses = view[responses_offset:].cast("i")
+    columns: Dict[str, Tuple[memoryview, memoryview]] = {}
+    for i in range(n_servers):
+        sample_offset, sample_count, address_start, address_length = _ENTRY.unpack_from(
+            view, entries_offset + _ENTRY.size * i
+        )
+        start = address_offset + address_start
+        address = bytes(view[start : start + address_length]).decode("utf-8")
+        columns[address] = (
+            all_timestamps[sample_offset : sample_offset + sample_count],
+            all_responses[sample_offset : sample_offset + sample_count],
+        )
+    return columns
@@ -0,0 +1,252 @@
+import abc
+import collections
+import datetime as DT
+from typing import Deque, List, NamedTuple, Optional
+
+from fixpoint_coding_test.Server import DOWNTIME_LABEL, OVERLOAD_LABEL, Server, epoch_to_datetime
+
+
+EVENT_OPEN: str = "open"
+EVENT_CLOSE: str = "close"
+
+
+class DetectorEvent(NamedTuple):
+    """
+    検出器が出力する、区間の開始・終了イベント
+
+    kind : str
+        `EVENT_OPEN`もしくは`EVENT_CLOSE`
+    label : str
+        `DOWNTIME_LABEL`もしくは`OVERLOAD_LABEL`
+    time : datetime.datetime
+        区間の開始日時、もしくは終了日時
+    """
+
+    kind: str
+    label: str
+    time: DT.datetime
+
+
+class _Detector(abc.ABC):
+    """
+    応答ログを1件ずつ受け取り、区間の開始・終了をイベントとして出力する検出器の基底クラス
+    """
+
+    label: str = ""
+
+    def __init__(self) -> None:
+        self._last_timestamp: Optional[int] = None
+
+    def feed(self, timestamp: int, response_msec: int) -> List[DetectorEvent]:
+        """
+        応答ログを1件受け取り、確定したイベントを返す
+
+        Parameters
+        ----------
+        timestamp : int
+            ログの日時情報(エポック秒)。直前に受け取ったログより後の日時でなければならない
+        response_msec : int
+            サーバーの応答時間。
+            タイムアウトの場合は、`Server.TIMEOUT_SYMBOL`を指定
+
+        Returns
+        -------
+        List[DetectorEvent]
+            このログによって確定したイベント。日時の昇順に並ぶ
+
+        Raises
+        ------
+        ValueError
+            `timestamp`が直前に受け取ったログの日時以前だった
+        """
+
+        if self._last_timestamp is not None and not (timestamp > self._last_timestamp):
+            raise ValueError(f"timestamp must be increasing (last {self._last_timestamp}, now {timestamp})")
+        self._last_timestamp = timestamp
+        return self._feed(timestamp, response_msec)
+
+    @abc.abstractmethod
+    def _feed(self, timestamp: int, response_msec: int) -> List[DetectorEvent]:
+        """
+        日時の検査を終えた応答ログを1件受け取り、確定したイベントを返す。各検出器で実装する
+        """
+
+    def pending_events(self) -> List[DetectorEvent]:
+        """
+        この時点でログが終了した場合に確定するイベントを返す。検出器の状態は変更しない
+
+        Returns
+        -------
+        List[DetectorEvent]
+            ログの終了によって確定するイベント
+        """
+
+        return []
+
+    def _event(self, kind: str, timestamp: int) -> DetectorEvent:
+        return DetectorEvent(kind, self.label, epoch_to_datetime(timestamp))
+
+
+class DowntimeDetector(_Detector):
+    """
+    応答ログを1件ずつ受け取り、サーバーのダウンを検出する
+
+    連続したタイムアウトの回数と開始日時のみを保持し、`Server.get_downtimes`と同じ区間を出力する。
+    タイムアウトが`continuous`回連続した時点で開始イベントを、応答が返ってきた時点で終了イベントを出力する。
+    """
+
+    label: str = DOWNTIME_LABEL
+
+    def __init__(self, continuous: int = 1) -> None:
+        """
+        Parameters
+        ----------
+        continuous : int, default=1
+            サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値。
+
+        Raises
+        ------
+        ValueError
+            `continuous` が 0以下に指定された
+        """
+
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        super().__init__()
+        self.continuous: int = continuous
+        self._run_start: int = 0
+        self._run_length: int = 0
+
+    @property
+    def open_since(self) -> Optional[DT.datetime]:
+        """
+        現在ダウンしている場合はその開始日時、ダウンしていない場合は`None`
+        """
+
+        if self._run_length >= self.continuous:
+            return epoch_to_datetime(self._run_start)
+        return None
+
+    def _feed(self, timestamp: int, response_msec: int) -> List[DetectorEvent]:
+        if response_msec == Server.TIMEOUT_SYMBOL:
+            if self._run_length == 0:
+                self._run_start = timestamp
+            self._run_length += 1
+            if self._run_length == self.continuous:
+                return [self._event(EVENT_OPEN, self._run_start)]
+            return []
+
+        is_open = self._run_length >= self.continuous
+        self._run_length = 0
+        if is_open:
+            return [self._event(EVENT_CLOSE, timestamp)]
+        return []
+
+
+class OverloadDetector(_Detector):
+    """
+    応答ログを1件ずつ受け取り、サーバーの過負荷を検出する
+
+    直近`continuous`件の応答時間、その中の有効な応答時間の合計と件数、および現在の区間の状態のみを保持し、
+    `Server.get_overload_times`と同じ区間を出力する。
+
+    有効な応答の直後に続くタイムアウトは、`continuous`回連続に達するとダウン扱いとなり過負荷から除外されるため、
+    それまでの最大`continuous - 1`件の間は判定を保留する。
+    保留中のタイムアウトに関するイベントは、応答が返ってきた時点かダウン扱いが確定した時点で、
+    本来の日時を付けて出力する。
+    """
+
+    label: str = OVERLOAD_LABEL
+
+    def __init__(self, continuous: int = 3, time_threshold: int = 100) -> None:
+        """
+        Parameters
+        ----------
+        continuous : int, default = 3
+            過負荷状態と判定するために、何応答用いて平均化処理を行うかの指定。
+        time_threshold : int, default = 100
+            過負荷状態と判定するための応答時間閾値
+
+        Raises
+        ------
+        ValueError
+            入力値の入力範囲外の値が入力された
+        """
+
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        if not (time_threshold > 0):
+            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+        super().__init__()
+        self.continuous: int = continuous
+        self.time_threshold: int = time_threshold
+        self._window: Deque[int] = collections.deque()
+        self._valid_sum: int = 0
+        self._valid_count: int = 0
+        self._is_open: bool = False
+        self._open_start: int = 0
+        self._pending_start: int = 0
+        self._pending_length: int = 0
+
+    @property
+    def open_since(self) -> Optional[DT.datetime]:
+        """
+        過負荷状態が確定している場合はその開始日時、そうでない場合は`None`
+        """
+
+        if self._is_open:
+            return epoch_to_datetime(self._open_start)
+        return None
+
+    def _push(self, response_msec: int) -> None:
+        """
+        直近`continuous`件の窓に応答時間を追加し、有効な応答時間の合計と件数を更新する
+        """
+
+        if len(self._window) == self.continuous:
+            old = self._window.popleft()
+            if old != Server.TIMEOUT_SYMBOL:
+                self._valid_sum -= old
+                self._valid_count -= 1
+        self._window.append(response_msec)
+        if response_msec != Server.TIMEOUT_SYMBOL:
+            self._valid_sum += response_msec
+            self._valid_count += 1
+
+    def _set_state(self, is_overload: bool, timestamp: int, events: List[DetectorEvent]) -> None:
+        if is_overload and not self._is_open:
+            self._is_open = True
+            self._open_start = timestamp
+            events.append(self._event(EVENT_OPEN, timestamp))
+        elif not is_overload and self._is_open:
+            self._is_open = False
+            events.append(self._event(EVENT_CLOSE, timestamp))
+
+    def _feed(self, timestamp: int, response_msec: int) -> List[DetectorEvent]:
+        self._push(response_msec)
+        events: List[DetectorEvent] = []
+
+        if response_msec != Server.TIMEOUT_SYMBOL:
+            if self._pending_length != 0:
+                # 保留中のタイムアウトはダウンに至らなかったため、過負荷として確定する
+                self._set_state(True, self._pending_start, events)
+                self._pending_length = 0
+            is_overload = (self._valid_sum / self._valid_count) >= self.time_threshold
+            self._set_state(is_overload, timestamp, events)
+            return events
+
+        if self._valid_count != 0:
+            # 窓内に有効な応答が残っている間のタイムアウトは、判定を保留する
+            if self._pending_length == 0:
+                self._pending_start = timestamp
+            self._pending_length += 1
+        else:
+            # 窓内が全てタイムアウトとなりダウン扱いとなったため、保留中のタイムアウトも含めて過負荷ではない
+            self._set_state(False, self._pending_start if self._pending_length != 0 else timestamp, events)
+            self._pending_length = 0
+        return events
+
+    def pending_events(self) -> List[DetectorEvent]:
+        if self._pending_length != 0 and not self._is_open:
+            return [self._event(EVENT_OPEN, self._pending_start)]
+        return []
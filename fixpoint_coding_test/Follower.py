@@ -0,0 +1,366 @@
+"""
+追記され続ける複数のログファイルを`asyncio`で並行して追跡し、ダウン・過負荷・スイッチのダウンを逐次検出する
+
+各ファイルは一定間隔で追記の有無を確認し、改行まで書き込まれた行のみを処理する。
+読み込んだ行は`Network`・`Server`のデータに登録すると同時に`Detector`の検出器へ与え、
+確定した区間の開始・終了を`IncidentEvent`として非同期イテレータに出力する。
+"""
+
+import asyncio
+import copy
+import datetime as DT
+import ipaddress
+import os
+from typing import AsyncIterator, BinaryIO, Dict, List, NamedTuple, Optional, Union
+
+from fixpoint_coding_test.Detector import EVENT_CLOSE, EVENT_OPEN, DetectorEvent, DowntimeDetector, OverloadDetector
+from fixpoint_coding_test.Network import SWITCH_DOWN_LABEL, Network, _NetworkIndex
+from fixpoint_coding_test.Server import (
+    READ_CHUNK_SIZE,
+    RetentionPolicy,
+    Server,
+    csv_block_to_params,
+    epoch_to_datetime,
+)
+
+
+# 新たな追記を確認する間隔(秒)
+POLL_INTERVAL: float = 0.1
+# 読み出されていないイベントを保持する最大件数
+MAX_PENDING_EVENTS: int = 1024
+# 1つのファイルから1度に読み込む最大バイト数
+MAX_READ_BYTES: int = READ_CHUNK_SIZE
+
+
+class IncidentEvent(NamedTuple):
+    """
+    `LogFollower`が出力する、区間の開始・終了イベント
+
+    kind : str
+        `Detector.EVENT_OPEN`もしくは`Detector.EVENT_CLOSE`
+    label : str
+        `Server.DOWNTIME_LABEL`・`Server.OVERLOAD_LABEL`・`Network.SWITCH_DOWN_LABEL`のいずれか
+    address : Union[ipaddress.IPv4Interface, ipaddress.IPv4Network]
+        イベントが発生したサーバーのIPアドレス、もしくはネットワークのサブネット
+    time : datetime.datetime
+        区間の開始日時、もしくは終了日時
+    """
+
+    kind: str
+    label: str
+    address: Union[ipaddress.IPv4Interface, ipaddress.IPv4Network]
+    time: DT.datetime
+
+
+class _Tail:
+    """
+    1つのログファイルについて、読み込んだ位置と行の途中で途切れた末尾を保持する
+
+    ファイルは読み込みの度に開き直すため、追跡中にファイルを開いたままにすることはない。
+    1度に読み込むのは`max_bytes`バイトまでとし、既存の大きなファイルも少しずつ読み進める。
+
+    Attributes
+    ----------
+    has_more : bool
+        前回の読み込みの時点で、まだ読み込んでいない部分が残っていたか
+    """
+
+    def __init__(self, file_path: str, max_bytes: int = MAX_READ_BYTES) -> None:
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.has_more: bool = False
+        self._offset: int = 0
+        self._remainder: bytes = b""
+        self._header_skipped: bool = False
+
+    def read_lines(self) -> List[str]:
+        """
+        前回の読み込み以降に追記された部分を最大`max_bytes`バイト読み込み、改行まで書き込まれた行を返す。
+        ファイルがまだ存在しない場合は空のリストを返し、切り詰められた場合は先頭から読み直す
+        """
+
+        try:
+            f = open(self.file_path, "rb")
+        except FileNotFoundError:
+            self.has_more = False
+            return []
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self._offset:
+                # ファイルが切り詰められた場合は、説明文から読み直す
+                self._offset, self._remainder, self._header_skipped = 0, b"", False
+            f.seek(self._offset)
+            chunk = f.read(self.max_bytes)
+        self._offset += len(chunk)
+        self.has_more = self._offset < size
+        parts = (self._remainder + chunk).split(b"\n")
+        self._remainder = parts.pop()  # 末尾の行は書き込みの途中である可能性があるため持ち越す
+        lines: List[str] = [part.decode() for part in parts]
+        if not self._header_skipped and len(lines) != 0:
+            lines.pop(0)  # ファイルの先頭は説明文なので読み飛ばす
+            self._header_skipped = True
+        return lines
+
+
+class _ServerState:
+    """
+    追跡中のサーバーごとの所属するネットワーク、検出器、最後に検出器へ与えたログの日時
+    """
+
+    def __init__(self, network: Network, continuous: int, time_threshold: int) -> None:
+        self.network = network
+        self.downtime = DowntimeDetector(continuous=continuous)
+        self.overload = OverloadDetector(continuous=continuous, time_threshold=time_threshold)
+        self.last_timestamp: Optional[int] = None
+
+
+class _SwitchState:
+    """
+    ネットワークごとの、ダウンしているサーバーの開始日時とスイッチのダウンの状態
+    """
+
+    def __init__(self) -> None:
+        self.down_since: Dict[int, DT.datetime] = {}
+        self.is_open: bool = False
+
+
+class LogFollower:
+    """
+    追記され続ける複数のログファイルを並行して追跡し、区間の開始・終了をイベントとして出力する
+
+    ファイルごとに`asyncio`のタスクを作成し、`poll_interval`秒ごとに追記された行を読み込む。
+    そのため、ログが追記されてからイベントが出力されるまでの遅延は、おおよそ`poll_interval`秒以内となる。
+    改行まで書き込まれていない行は、次に改行が書き込まれるまで処理を保留する。
+
+    サーバーのダウン・過負荷は`Detector`の検出器で判定するため、`Server.get_downtimes`・
+    `Server.get_overload_times`と同じ区間が得られる。
+    スイッチのダウンは、ネットワークに所属する全てのサーバーがダウンしている期間として判定する。
+    日時が前後したログはサーバーのデータには登録するが、検出器には与えない。
+
+    Parameters
+    ----------
+    file_paths : List[str]
+        追跡するログデータのファイルパスの並び。存在しないファイルは作成されるまで待機する
+    networks : List[Network], optional
+        既存のデータがある場合のみ指定。
+        追記形式でデータを読み込む。既存のサーバーの検出器は登録済みの応答ログで初期化し、
+        その応答ログで確定した区間はイベントとして出力しない
+    continuous : int, default = 3
+        ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+    poll_interval : float, default = POLL_INTERVAL
+        追記の有無を確認する間隔(秒)
+    max_pending_events : int, default = MAX_PENDING_EVENTS
+        読み出されていないイベントを保持する最大件数。
+        上限に達した場合は、イベントが読み出されるまでファイルの読み込みを待機する
+    max_read_bytes : int, default = MAX_READ_BYTES
+        1つのファイルから1度に読み込む最大バイト数。
+        `run`では読み込む度にイベントループへ処理を譲るため、既存の大きなファイルを追跡してもループを長時間止めない
+    retention : Optional[RetentionPolicy], default = None
+        保持ポリシーが設定されていないサーバーに、初めて行を読み込んだ時点で設定する保持ポリシー
+        (`Server.set_retention`参照)。`None`の場合は全ての応答ログを保持し続ける
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    def __init__(
+        self,
+        file_paths: List[str],
+        networks: List[Network] = [],
+        continuous: int = 3,
+        time_threshold: int = 100,
+        poll_interval: float = POLL_INTERVAL,
+        max_pending_events: int = MAX_PENDING_EVENTS,
+        max_read_bytes: int = MAX_READ_BYTES,
+        retention: Optional[RetentionPolicy] = None,
+    ) -> None:
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        if not (time_threshold > 0):
+            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+        if not (poll_interval > 0):
+            raise ValueError(f"poll_interval must over 0 (now {poll_interval})")
+        if not (max_pending_events > 0):
+            raise ValueError(f"max_pending_events must over 0 (now {max_pending_events})")
+        if not (max_read_bytes > 0):
+            raise ValueError(f"max_read_bytes must over 0 (now {max_read_bytes})")
+
+        self.continuous = continuous
+        self.time_threshold = time_threshold
+        self.poll_interval = poll_interval
+        self.max_pending_events = max_pending_events
+        self.retention = retention
+        self._networks: List[Network] = copy.copy(networks)
+        self._index = _NetworkIndex(self._networks)
+        self._tails: List[_Tail] = [_Tail(file_path, max_read_bytes) for file_path in file_paths]
+        self._servers: Dict[int, _ServerState] = {}
+        self._switches: Dict[int, _SwitchState] = {}
+        self._queue: Optional["asyncio.Queue[Optional[IncidentEvent]]"] = None
+        self._stopped: bool = False
+        # 既存のサーバーは登録済みの応答ログを検出器に与え、ダウン中・過負荷中などの状態から追跡を始める。
+        # 登録済みの応答ログで確定した区間はイベントとして出力しない
+        for network in self._networks:
+            for server in network.servers:
+                for timestamp, response_msec in zip(*server.get_columns()):
+                    self._detect(server, timestamp, response_msec)
+
+    @property
+    def networks(self) -> List[Network]:
+        """
+        読み込んだログデータで更新され続けるネットワークリスト
+        """
+
+        return self._networks
+
+    def read_available(self) -> List[IncidentEvent]:
+        """
+        全てのファイルから追記された行を読み込み、確定したイベントを返す
+
+        Returns
+        -------
+        List[IncidentEvent]
+            読み込んだ行によって確定したイベント。ファイルごとに読み込んだ順に並ぶ
+
+        Raises
+        ------
+        ValueError
+            正しくない行が含まれていた
+        """
+
+        events: List[IncidentEvent] = []
+        for tail in self._tails:
+            events.extend(self._read_tail(tail))
+            while tail.has_more:
+                events.extend(self._read_tail(tail))
+        return events
+
+    async def run(self) -> None:
+        """
+        `stop`が呼び出されるまで、全てのファイルを並行して追跡する
+
+        Raises
+        ------
+        ValueError
+            正しくない行が含まれていた
+        """
+
+        queue = self._get_queue()
+        try:
+            await asyncio.gather(*[self._follow(tail, queue) for tail in self._tails])
+        finally:
+            # 1つのファイルで例外が発生した場合も、他のファイルの追跡を終了させる
+            self._stopped = True
+            await queue.put(None)
+
+    def stop(self) -> None:
+        """
+        追跡を終了する。`run`は次に追記を確認する時点で終了し、`events`は残りのイベントを出力した後に終了する
+        """
+
+        self._stopped = True
+
+    async def events(self) -> AsyncIterator[IncidentEvent]:
+        """
+        `run`で検出されたイベントを順に取り出す非同期イテレータ
+
+        Yields
+        ------
+        IncidentEvent
+            確定した区間の開始・終了イベント
+        """
+
+        queue = self._get_queue()
+        while True:
+            event = await queue.get()
+            if event is None:
+                return
+            yield event
+
+    def _get_queue(self) -> "asyncio.Queue[Optional[IncidentEvent]]":
+        # イベントループ上で作成する必要があるため、初めて参照された時点で作成する
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending_events)
+        return self._queue
+
+    async def _follow(self, tail: _Tail, queue: "asyncio.Queue[Optional[IncidentEvent]]") -> None:
+        while not self._stopped:
+            for event in self._read_tail(tail):
+                await queue.put(event)
+            # 読み残しがある場合は、他のファイルの追跡やイベントの読み出しに処理を譲ってから続きを読み込む
+            await asyncio.sleep(0 if tail.has_more else self.poll_interval)
+
+    def _read_tail(self, tail: _Tail) -> List[IncidentEvent]:
+        events: List[IncidentEvent] = []
+        for timestamp, address, response_msec in csv_block_to_params(tail.read_lines()):
+            server = self._index.get_server(address)
+            if self.retention is not None and server.retention is None:
+                server.set_retention(self.retention)
+            server.append_ping_epoch(timestamp, response_msec)
+            events.extend(self._detect(server, timestamp, response_msec))
+        return events
+
+    def _detect(self, server: Server, timestamp: int, response_msec: int) -> List[IncidentEvent]:
+        """
+        ログを1件検出器に与え、サーバーとスイッチのイベントを返す
+        """
+
+        state = self._servers.get(id(server))
+        events: List[IncidentEvent] = []
+        if state is None:
+            network = self._index.get_network(server.network_address, server.prefixlen)
+            state = self._servers[id(server)] = _ServerState(network, self.continuous, self.time_threshold)
+            # ダウンしていないサーバーが加わったため、スイッチのダウンは終了する
+            events.extend(self._close_switch(network, timestamp))
+        if state.last_timestamp is not None and not (timestamp > state.last_timestamp):
+            return events
+        state.last_timestamp = timestamp
+
+        for detector_event in state.downtime.feed(timestamp, response_msec):
+            events.append(self._server_event(server, detector_event))
+            events.extend(self._update_switch(state.network, server, detector_event))
+        for detector_event in state.overload.feed(timestamp, response_msec):
+            events.append(self._server_event(server, detector_event))
+        return events
+
+    def _update_switch(self, network: Network, server: Server, event: DetectorEvent) -> List[IncidentEvent]:
+        """
+        サーバーのダウンの開始・終了から、ネットワークのスイッチのダウンの開始・終了を判定する
+
+        スイッチがダウンしている期間は`Network.get_network_downtime`と同様に、
+        全てのサーバーのダウンしている期間の共通部分とする。
+        """
+
+        switch = self._switches.setdefault(id(network), _SwitchState())
+        if event.kind == EVENT_OPEN:
+            switch.down_since[id(server)] = event.time
+            if not switch.is_open and len(switch.down_since) == len(network.servers):
+                switch.is_open = True
+                start = max(switch.down_since.values())
+                return [IncidentEvent(EVENT_OPEN, SWITCH_DOWN_LABEL, network.subnet_ipaddress, start)]
+            return []
+
+        switch.down_since.pop(id(server), None)
+        if switch.is_open:
+            switch.is_open = False
+            return [IncidentEvent(EVENT_CLOSE, SWITCH_DOWN_LABEL, network.subnet_ipaddress, event.time)]
+        return []
+
+    def _close_switch(self, network: Network, timestamp: int) -> List[IncidentEvent]:
+        """
+        ネットワークのスイッチがダウンしている場合、指定した日時で終了させる
+        """
+
+        switch = self._switches.get(id(network))
+        if switch is None or not switch.is_open:
+            return []
+        switch.is_open = False
+        return [IncidentEvent(EVENT_CLOSE, SWITCH_DOWN_LABEL, network.subnet_ipaddress, epoch_to_datetime(timestamp))]
+
+    @staticmethod
+    def _server_event(server: Server, event: DetectorEvent) -> IncidentEvent:
+        return IncidentEvent(event.kind, event.label, server.ip_address, event.time)
@@ -0,0 +1,212 @@
+"""
+処理段階ごとの所要時間と件数を記録する計測フック
+
+計測は既定では無効であり、`enable`でフックを登録した場合のみ記録される。
+無効な間の`stage`・`count`は登録済みのフックの有無を確認するのみで、何も記録しない。
+
+フックは`hook(event, name, value)`の形式で呼び出される関数である。
+`event`は所要時間であれば`EVENT_TIME`(`value`は秒数)、件数であれば`EVENT_COUNT`(`value`は件数)となる。
+`Stats`は受け取った値を名前ごとに集計するフックであり、`record`を用いると計測中のみ登録できる。
+
+    with Instrumentation.record() as stats:
+        servers = Server.load_data(file_path)
+        Server.print_server_error(servers)
+    stats.dump()
+
+記録される処理段階は以下の通り。処理段階は入れ子になる場合があり、その場合は所要時間も重複して記録される。
+
+- `load`: `load_data`全体
+- `parse`: CSVの行のパース
+- `register`: パースした行のサーバーへの登録(IPアドレスの処理を含む)
+- `ip`: 新たなインターフェース文字列からのネットワーク・サーバーの特定
+- `sort`: 応答ログの日時順の確認と並べ替え
+- `downtime`・`overload`: ダウン・過負荷の区間の検出
+- `intersect`: ネットワークのダウンしている区間の算出
+
+記録される件数は以下の通り。
+
+- `rows_parsed`: パースした行数
+- `rows_rejected`: 形式が正しくなかった行数
+- `rows_skipped`: 空行として読み飛ばした行数
+- `downtime_intervals`・`overload_intervals`・`network_intervals`: 検出した区間の数
+
+複数プロセスでの並列読み込み(`load_data_parallel`)では、ワーカープロセス内のパースは記録されない。
+"""
+
+import contextlib
+import json
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+
+EVENT_TIME: str = "time"
+EVENT_COUNT: str = "count"
+
+Hook = Callable[[str, str, float], None]
+
+# 登録されているフック。空の場合は計測が無効となる
+_hooks: List[Hook] = []
+
+
+class _Stage:
+    """
+    処理段階の所要時間を計測し、終了時にフックへ通知する
+    """
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        seconds = time.perf_counter() - self.started
+        for hook in list(_hooks):
+            hook(EVENT_TIME, self.name, seconds)
+
+
+_DISABLED_STAGE = contextlib.nullcontext()
+
+
+class Stats:
+    """
+    フックとして登録し、処理段階ごとの所要時間・呼び出し回数と、名前ごとの件数を集計する
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+
+    def __call__(self, event: str, name: str, value: float) -> None:
+        if event == EVENT_TIME:
+            self.seconds[name] = self.seconds.get(name, 0.0) + value
+            self.calls[name] = self.calls.get(name, 0) + 1
+        elif event == EVENT_COUNT:
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def reset(self) -> None:
+        """
+        集計した値を全て破棄する
+        """
+
+        self.seconds.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        集計した値を、JSONに変換可能な辞書で返す
+
+        Returns
+        -------
+        Dict[str, Dict[str, Dict[str, float]]]
+            `{"stages": {処理段階: {"seconds": 秒数, "calls": 回数}}, "counters": {名前: {"count": 件数}}}`の形式の辞書
+        """
+
+        return {
+            "stages": {name: {"seconds": self.seconds[name], "calls": self.calls[name]} for name in self.seconds},
+            "counters": {name: {"count": count} for name, count in self.counters.items()},
+        }
+
+    def dump(self, file: Optional[TextIO] = None) -> None:
+        """
+        集計した値をJSON形式で書き出す
+
+        Parameters
+        ----------
+        file : Optional[TextIO], default = None
+            書き出し先。`None`の場合は標準出力
+        """
+
+        out = file if file is not None else sys.stdout
+        json.dump(self.as_dict(), out, indent=2)
+        out.write("\n")
+
+
+def enable(hook: Hook) -> None:
+    """
+    フックを登録し、計測を有効にする
+
+    Parameters
+    ----------
+    hook : Callable[[str, str, float], None]
+        `hook(event, name, value)`の形式で呼び出される関数
+    """
+
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def disable(hook: Optional[Hook] = None) -> None:
+    """
+    フックの登録を解除する。全てのフックが解除されると計測は無効となる
+
+    Parameters
+    ----------
+    hook : Optional[Callable[[str, str, float], None]], default = None
+        解除するフック。`None`の場合は全てのフックを解除する
+    """
+
+    if hook is None:
+        _hooks.clear()
+    elif hook in _hooks:
+        _hooks.remove(hook)
+
+
+def is_enabled() -> bool:
+    """
+    計測が有効かどうかを返す
+    """
+
+    return len(_hooks) != 0
+
+
+@contextlib.contextmanager
+def record(stats: Optional[Stats] = None) -> Iterator[Stats]:
+    """
+    `with`文の間のみ`Stats`をフックとして登録する
+
+    Parameters
+    ----------
+    stats : Optional[Stats], default = None
+        集計先。`None`の場合は新たに作成する
+
+    Yields
+    ------
+    Stats
+        集計先の`Stats`
+    """
+
+    _stats = stats if stats is not None else Stats()
+    enable(_stats)
+    try:
+        yield _stats
+    finally:
+        disable(_stats)
+
+
+def stage(name: str):
+    """
+    `with`文の間の所要時間を処理段階`name`として記録する。計測が無効な場合は何もしない
+    """
+
+    if not _hooks:
+        return _DISABLED_STAGE
+    return _Stage(name)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    件数`name`に`value`を加える。計測が無効な場合は何もしない
+    """
+
+    if not _hooks:
+        return
+    for hook in list(_hooks):
+        hook(EVENT_COUNT, name, value)
@@ -0,0 +1,359 @@
+import bisect
+import datetime as DT
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fixpoint_coding_test.Server import Incident, Server, datetime_to_epoch
+
+
+# 終了日時が`None`(ログの末尾まで継続)の区間の終了エポック秒として扱う値
+_OPEN_END: int = 1 << 62
+
+
+# (開始エポック秒, 終了エポック秒, 区間)
+_Entry = Tuple[int, int, Incident]
+
+
+class _Node:
+    """
+    中心点を持つ区間木のノード
+
+    中心点を含む区間を、開始日時の昇順と終了日時の降順の2通りで保持する。
+    中心点より前に終わる区間は左の子へ、中心点より後に始まる区間は右の子へ振り分ける。
+    区間の追加・削除では中心点を変えないため、同じ区間は常に同じノードに振り分けられる。
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "start_keys", "end_keys", "left", "right")
+
+    def __init__(self, center: int, entries: List[_Entry]) -> None:
+        self.center = center
+        self.by_start = sorted(entries, key=lambda entry: entry[0])
+        self.by_end = sorted(entries, key=lambda entry: entry[1], reverse=True)
+        # 二分探索に用いる、開始エポック秒の昇順の列と、終了エポック秒を負にした昇順の列
+        self.start_keys: List[int] = [entry[0] for entry in self.by_start]
+        self.end_keys: List[int] = [-entry[1] for entry in self.by_end]
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+
+    def insert(self, entry: _Entry) -> None:
+        i = bisect.bisect_right(self.start_keys, entry[0])
+        self.start_keys.insert(i, entry[0])
+        self.by_start.insert(i, entry)
+        i = bisect.bisect_right(self.end_keys, -entry[1])
+        self.end_keys.insert(i, -entry[1])
+        self.by_end.insert(i, entry)
+
+    def remove(self, entry: _Entry) -> None:
+        i = self.by_start.index(entry, bisect.bisect_left(self.start_keys, entry[0]))
+        del self.start_keys[i], self.by_start[i]
+        i = self.by_end.index(entry, bisect.bisect_left(self.end_keys, -entry[1]))
+        del self.end_keys[i], self.by_end[i]
+
+
+def _build_tree(entries: List[_Entry]) -> Optional[_Node]:
+    """
+    開始日時の昇順に並んだ区間から区間木を構築する
+    """
+
+    if len(entries) == 0:
+        return None
+
+    center = entries[len(entries) // 2][0]
+    left = [entry for entry in entries if entry[1] < center]
+    right = [entry for entry in entries if entry[0] > center]
+    node = _Node(center, [entry for entry in entries if entry[0] <= center <= entry[1]])
+    node.left = _build_tree(left)
+    node.right = _build_tree(right)
+    return node
+
+
+def _find_node(root: Optional[_Node], entry: _Entry) -> Tuple[Optional[_Node], Optional[_Node], bool]:
+    """
+    区間を保持する(もしくは保持すべき)ノードを探す
+
+    Returns
+    -------
+    Tuple[Optional[_Node], Optional[_Node], bool]
+        区間の中心点を含むノード(無ければ`None`)、最後にたどったノード、そのノードの左右どちらの子をたどろうとしたか
+    """
+
+    parent: Optional[_Node] = None
+    is_left = False
+    node = root
+    while node is not None:
+        if entry[1] < node.center:
+            parent, is_left, node = node, True, node.left
+        elif entry[0] > node.center:
+            parent, is_left, node = node, False, node.right
+        else:
+            return node, parent, is_left
+    return None, parent, is_left
+
+
+class IntervalIndex:
+    """
+    複数のサーバーで検出されたダウン・過負荷の区間を横断して検索するための索引
+
+    区間は両端を含むものとして扱い、終了日時が`None`の区間はログの末尾以降も継続しているものとみなす。
+    区間の総数を n、該当する区間の数を k として、日時を指定した検索と期間を指定した検索はどちらも
+    O(log n + k) で完了する。
+
+    サーバーに応答ログを追加した後は`refresh`を呼び出すことで、応答ログが変化したサーバーのみ区間を再検出する。
+    区間木と開始日時順の列には、再検出で増減した区間のみを挿入・削除する。
+
+    Parameters
+    ----------
+    servers : Iterable[Server]
+        索引に登録するサーバーの並び
+    continuous : int, default = 3
+        ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+    with_downtime : bool, default = True
+        ダウンしている区間を索引に含めるかどうかを指定する
+    with_overload : bool, default = True
+        過負荷状態の区間を索引に含めるかどうかを指定する
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    def __init__(
+        self,
+        servers: Iterable[Server] = (),
+        continuous: int = 3,
+        time_threshold: int = 100,
+        with_downtime: bool = True,
+        with_overload: bool = True,
+    ) -> None:
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        if not (time_threshold > 0):
+            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+
+        self.continuous = continuous
+        self.time_threshold = time_threshold
+        self.with_downtime = with_downtime
+        self.with_overload = with_overload
+        self._servers: List[Server] = []
+        # サーバーごとの、区間を検出した時点の版数と検出した区間
+        self._versions: Dict[int, int] = {}
+        self._entries: Dict[int, List[_Entry]] = {}
+        self._tree: Optional[_Node] = None
+        self._by_start: List[_Entry] = []
+        self._starts: List[int] = []
+        # 区間木へ未反映の区間の増減と、前回区間木を構築してから追加した区間の数
+        self._delta: Dict[_Entry, int] = {}
+        self._built = False
+        self._inserted = 0
+        for server in servers:
+            self.add_server(server)
+        self.refresh()
+
+    def __len__(self) -> int:
+        self._build()
+        return len(self._by_start)
+
+    def add_server(self, server: Server) -> None:
+        """
+        索引にサーバーを追加する。区間は次に`refresh`を呼び出した際に検出される
+
+        Parameters
+        ----------
+        server : Server
+            索引に登録する`Server`インスタンス
+        """
+
+        if id(server) in self._versions:
+            return
+        self._servers.append(server)
+        self._versions[id(server)] = -1
+        self._entries[id(server)] = []
+
+    def refresh(self) -> int:
+        """
+        前回の検出以降に応答ログが変化したサーバーの区間を再検出する
+
+        Returns
+        -------
+        int
+            区間を再検出したサーバーの数
+        """
+
+        refreshed = 0
+        for server in self._servers:
+            if self._versions[id(server)] == server.version:
+                continue
+            self._versions[id(server)] = server.version
+            old_entries = self._entries[id(server)]
+            new_entries = self._entries[id(server)] = self._detect(server)
+            # 応答ログの追加で変化するのは末尾付近の区間のみであるため、増減した区間のみを記録する
+            old_set, new_set = set(old_entries), set(new_entries)
+            for entry in old_entries:
+                if entry not in new_set:
+                    self._delta[entry] = self._delta.get(entry, 0) - 1
+            for entry in new_entries:
+                if entry not in old_set:
+                    self._delta[entry] = self._delta.get(entry, 0) + 1
+            refreshed += 1
+        return refreshed
+
+    def at(self, time: DT.datetime) -> List[Incident]:
+        """
+        指定した日時に発生していた区間を取得する
+
+        Parameters
+        ----------
+        time : datetime.datetime
+            検索する日時
+
+        Returns
+        -------
+        List[Incident]
+            指定した日時を含む区間。開始日時の昇順に並ぶ
+        """
+
+        self._build()
+        return _sort_incidents(self._stab(datetime_to_epoch(time)))
+
+    def between(self, start: DT.datetime, end: DT.datetime) -> List[Incident]:
+        """
+        指定した期間と重なる区間を取得する
+
+        Parameters
+        ----------
+        start : datetime.datetime
+            期間の開始日時
+        end : datetime.datetime
+            期間の終了日時
+
+        Returns
+        -------
+        List[Incident]
+            指定した期間と1秒でも重なる区間。開始日時の昇順に並ぶ
+
+        Raises
+        ------
+        ValueError
+            `end`が`start`より前に指定された
+        """
+
+        if not (start <= end):
+            raise ValueError(f"end must be after start (start: {start}, end: {end})")
+
+        self._build()
+        start_epoch, end_epoch = datetime_to_epoch(start), datetime_to_epoch(end)
+        # 期間の開始時点で発生している区間と、期間内に始まる区間は重複しない
+        entries = self._stab(start_epoch)
+        first = bisect.bisect_right(self._starts, start_epoch)
+        last = bisect.bisect_right(self._starts, end_epoch)
+        entries.extend(self._by_start[first:last])
+        return _sort_incidents(entries)
+
+    def _detect(self, server: Server) -> List[_Entry]:
+        """
+        サーバーの区間を検出し、索引に登録する形式に変換する
+        """
+
+        report = server.analyze(
+            continuous=self.continuous,
+            time_threshold=self.time_threshold,
+            with_downtime=self.with_downtime,
+            with_overload=self.with_overload,
+        )
+        return [
+            (
+                datetime_to_epoch(incident.start),
+                datetime_to_epoch(incident.end) if incident.end is not None else _OPEN_END,
+                incident,
+            )
+            for incident in report.downtimes + report.overloads
+        ]
+
+    def _build(self) -> None:
+        """
+        再検出で増減した区間を区間木に反映する
+
+        増減した区間のみを区間木と開始日時順の列に挿入・削除する。
+        ただし、前回の構築以降に追加した区間の数が区間の総数を超えた場合は、木の偏りを解消するために構築し直す。
+        """
+
+        changes = [(entry, count) for entry, count in self._delta.items() if count != 0]
+        self._delta.clear()
+        self._inserted += sum(count for _, count in changes if count > 0)
+        if not self._built or self._inserted > len(self._by_start):
+            entries = sorted(
+                (entry for server in self._servers for entry in self._entries[id(server)]),
+                key=lambda entry: entry[0],
+            )
+            self._by_start = entries
+            self._starts = [entry[0] for entry in entries]
+            self._tree = _build_tree(entries)
+            self._built = True
+            self._inserted = 0
+            return
+
+        # 同じ区間が削除後に再び追加される場合に備え、削除を先に反映する
+        changes.sort(key=lambda change: change[1])
+        for entry, count in changes:
+            for _ in range(abs(count)):
+                if count < 0:
+                    self._remove(entry)
+                else:
+                    self._insert(entry)
+
+    def _insert(self, entry: _Entry) -> None:
+        i = bisect.bisect_right(self._starts, entry[0])
+        self._starts.insert(i, entry[0])
+        self._by_start.insert(i, entry)
+        node, parent, is_left = _find_node(self._tree, entry)
+        if node is not None:
+            node.insert(entry)
+        elif parent is None:
+            self._tree = _Node(entry[0], [entry])
+        elif is_left:
+            parent.left = _Node(entry[0], [entry])
+        else:
+            parent.right = _Node(entry[0], [entry])
+
+    def _remove(self, entry: _Entry) -> None:
+        i = self._by_start.index(entry, bisect.bisect_left(self._starts, entry[0]))
+        del self._starts[i], self._by_start[i]
+        node, _, _ = _find_node(self._tree, entry)
+        assert node is not None
+        node.remove(entry)
+
+    def _stab(self, time: int) -> List[_Entry]:
+        """
+        指定したエポック秒を含む区間を区間木から取り出す
+        """
+
+        results: List[_Entry] = []
+        node = self._tree
+        while node is not None:
+            if time < node.center:
+                for entry in node.by_start:
+                    if entry[0] > time:
+                        break
+                    results.append(entry)
+                node = node.left
+            elif time > node.center:
+                for entry in node.by_end:
+                    if entry[1] < time:
+                        break
+                    results.append(entry)
+                node = node.right
+            else:
+                results.extend(node.by_start)
+                break
+        return results
+
+
+def _sort_incidents(entries: List[_Entry]) -> List[Incident]:
+    """
+    区間を開始日時、終了日時、IPアドレスの順に並べる
+    """
+
+    entries.sort(key=lambda entry: (entry[0], entry[1], entry[2].address, entry[2].label))
+    return [entry[2] for entry in entries]
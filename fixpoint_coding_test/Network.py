@@ -1,22 +1,122 @@
 import copy
 import datetime as DT
+import heapq
 import ipaddress
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from fixpoint_coding_test import Instrumentation
+from fixpoint_coding_test.Server import (
+    PARALLEL_CHUNK_BYTES,
+    READ_CHUNK_SIZE,
+    Incident,
+    Server,
+    ServerRegistry,
+    ServerReport,
+    _check_time_range,
+    _filter_time_range,
+    address_to_int,
+    iter_csv_blocks,
+    load_columns,
+    load_columns_parallel,
+    parse_interface,
+    prefix_to_netmask,
+)
+from fixpoint_coding_test.Sketch import DEFAULT_QUANTILES, LatencySketch, merge_sketches
+
+
+# `intersect_intervals`で用いるイベントの種類。同じ日時では終了を先に処理する
+_EVENT_CLOSE: int = 0
+_EVENT_OPEN: int = 1
+
+SWITCH_DOWN_LABEL: str = "switch down"
+
+
+class NetworkReport(NamedTuple):
+    """
+    `analyze`が返す、1つのネットワークの解析結果
+
+    subnet : ipaddress.IPv4Network
+        ネットワークのサブネット
+    switch_downtimes : Tuple[Incident, ...]
+        スイッチがダウンしている区間。開始日時の昇順に並ぶ
+    servers : Tuple[ServerReport, ...]
+        ネットワークに所属するサーバーの解析結果。`Network.servers`と同じ順序で並ぶ
+    """
 
-from fixpoint_coding_test.Server import Server, csv_to_params
+    subnet: ipaddress.IPv4Network
+    switch_downtimes: Tuple[Incident, ...]
+    servers: Tuple[ServerReport, ...]
+
+    @property
+    def incidents(self) -> List[Incident]:
+        """
+        スイッチのダウン、サーバーのダウン、サーバーの過負荷の区間を、開始日時と終了日時の順に並べたもの
+        """
+
+        incidents = list(self.switch_downtimes)
+        for server in self.servers:
+            incidents.extend(server.downtimes)
+        for server in self.servers:
+            incidents.extend(server.overloads)
+        return sorted(incidents, key=lambda incident: (incident.start, incident.end))
 
 
 class Network:
     """
     同一ネットワークサブネット内のサーバーをまとめて管理する
+
+    サブネットはネットワークアドレスとネットワークプレフィックス長の整数で保持し、
+    `ipaddress`のオブジェクトは参照される度に生成する。
     """
 
-    subnet_ipaddress: ipaddress.IPv4Network
+    __slots__ = ("_network_address", "_prefixlen", "_netmask", "servers", "_server_index")
+
     servers: List[Server]
 
     def __init__(self, subnet_ipaddress: ipaddress.IPv4Network) -> None:
-        self.subnet_ipaddress: ipaddress.IPv4Network = subnet_ipaddress
+        self._network_address: int = int(subnet_ipaddress.network_address)
+        self._prefixlen: int = subnet_ipaddress.prefixlen
+        self._netmask: int = prefix_to_netmask(self._prefixlen)
         self.servers: List[Server] = []
+        self._server_index = ServerRegistry()
+
+    @classmethod
+    def from_int(cls, network_address: int, prefixlen: int) -> "Network":
+        """
+        ネットワークアドレスの整数値とネットワークプレフィックス長からネットワークを生成する
+        """
+
+        network = cls.__new__(cls)
+        network._netmask = prefix_to_netmask(prefixlen)
+        network._network_address = network_address & network._netmask
+        network._prefixlen = prefixlen
+        network.servers = []
+        network._server_index = ServerRegistry()
+        return network
+
+    @property
+    def subnet_ipaddress(self) -> ipaddress.IPv4Network:
+        """
+        ネットワークのサブネット。参照される度に生成する
+        """
+
+        return ipaddress.IPv4Network((self._network_address, self._prefixlen))
+
+    @property
+    def network_address(self) -> int:
+        """
+        ネットワークアドレスの整数値
+        """
+
+        return self._network_address
+
+    @property
+    def prefixlen(self) -> int:
+        """
+        ネットワークプレフィックス長
+        """
+
+        return self._prefixlen
 
     def add_server(self, server: Server) -> None:
         """
@@ -36,6 +136,28 @@ class Network:
         if not (self.is_inside_network_ip(server=server)):
             raise ValueError("This server is not this network's subset.")
         self.servers.append(server)
+        self._server_index.add(server)
+
+    def get_server(
+        self, ip_address: Union[int, str, ipaddress.IPv4Address, ipaddress.IPv4Interface]
+    ) -> Optional[Server]:
+        """
+        IPアドレスからネットワークに所属するサーバーを取得する
+
+        サーバーの探索は索引を用いて行うため、所属するサーバー数によらず一定時間で完了する。
+
+        Parameters
+        ----------
+        ip_address : Union[int, str, ipaddress.IPv4Address, ipaddress.IPv4Interface]
+            探索するサーバーのIPアドレス、もしくはその整数値。ネットワークプレフィックス長は付いていてもよい
+
+        Returns
+        -------
+        Optional[Server]
+            該当するサーバー。存在しない場合は`None`
+        """
+
+        return self._server_index.get(ip_address)
 
     def is_inside_network_ip(self, server: Server) -> bool:
         """
@@ -52,17 +174,24 @@ class Network:
             サブネットの範囲内であれば`True`
         """
 
-        return server.ip_address in self.subnet_ipaddress
+        return (server.address & self._netmask) == self._network_address
 
-    def get_network_downtime(self, continuous: int = 3) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    def get_network_downtime(
+        self, continuous: int = 3, since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+    ) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
         """
         ネットワークがダウンしている期間の開始日時と終了日時を取得する。
         ネットワークがダウンしている期間は、全てのサーバーがダウンしている最短期間となる。
+        `since`・`until`を指定した場合は、その期間と重なるもののみを取得する(`Server.get_downtimes`参照)。
 
         Parameters
         ----------
         continuous : int, default = 3
             サーバーがダウンしていることを判定するために、何度連続で応答が無いかを決定する閾値。
+        since : Optional[datetime.datetime], default = None
+            解析する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            解析する期間の終了日時。`None`の場合は最後の記録まで
 
         Returns
         -------
@@ -72,7 +201,7 @@ class Network:
         Raises
         ------
         ValueError
-            `continuous` が 0以下に指定された
+            `continuous` が 0以下に指定された、もしくは`since`が`until`より後に指定された
 
 
         Example1
@@ -92,55 +221,51 @@ class Network:
 
         if not (continuous > 0):
             raise ValueError(f"continuous must over 0 (now {continuous})")
+        _check_time_range(since, until)
 
-        # ネットワーク内の全てのサーバーのダウンタイムを取得する
-        downtimes: Dict[ipaddress.IPv4Interface, List[Tuple[DT.datetime, Optional[DT.datetime]]]] = {
-            server.ip_address: server.get_downtimes(continuous=continuous) for server in self.servers
-        }
+        # ネットワーク内の全てのサーバーのダウンタイムを取得し、全サーバーに共通する期間を求める
+        downtimes = intersect_intervals(
+            [server.get_downtimes(continuous=continuous, since=since, until=until) for server in self.servers]
+        )
+        return _filter_time_range(downtimes, since, until)
+
+    def get_latency_sketch(self) -> LatencySketch:
+        """
+        ネットワークに所属する全てのサーバーのスケッチ(`Server.get_latency_sketch`参照)を併合したスケッチを取得する
 
-        results_set: Set[Tuple[DT.datetime, Optional[DT.datetime]]] = set()
-
-        for ip_address, _tmp_downtimes in downtimes.items():
-            for outer_start, outer_end in _tmp_downtimes:
-                _inside_results = False
-                for inner_start, inner_end in results_set:
-                    # 既存のリザルトにデータが存在している場合、スキップ
-                    if is_overlap_time(outer_start, outer_end, inner_start, inner_end):
-                        _inside_results = True
-                        break
-                if _inside_results:
-                    continue
-
-                for server in self.servers:
-                    if server.ip_address is ip_address:
-                        continue  # 自身に対してはスキップする
-
-                    for inner_start, inner_end in downtimes[server.ip_address]:
-                        if is_overlap_time(outer_start, outer_end, inner_start, inner_end):
-                            # 開始時刻の更新: 遅い方に変更する
-                            outer_start = max(outer_start, inner_start)
-
-                            # 終了時刻の更新
-                            if inner_end is None:
-                                # inner_endがNoneな場合 -> outer_endを残す = Do nothing.
-                                pass
-                            elif outer_end is None:
-                                # outer_endがNoneな場合 -> inner_endを残す
-                                outer_end = inner_end
-                            else:
-                                # どちらでもないときは終了時刻を早い方に変更
-                                outer_end = min(outer_end, inner_end)
-
-                            # 有効なペアが発見できているため、同一サーバ内の追加確認をスキップ
-                            break  # breakするとfor文のelse処理に到達せずにおわる
-                    else:
-                        # 全てのパターンで条件に当てはまらなかったため、外側のペアを進める
-                        break
-                else:
-                    # パターンが見つかったため、resultsに登録
-                    results_set.add((outer_start, outer_end))
-
-        return sorted(list(results_set))
+        併合はサーバーごとのスケッチの区間の件数を足し合わせるのみであり、応答ログの件数によらない。
+        サーバー群全体の分位点は、各ネットワークのスケッチを`Sketch.merge_sketches`で併合して求められる。
+
+        Returns
+        -------
+        LatencySketch
+            併合したスケッチ
+        """
+
+        return merge_sketches(server._sketched() for server in self.servers)
+
+    def get_latency_quantiles(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[float, Optional[float]]:
+        """
+        ネットワークに所属する全てのサーバーの有効な応答時間の分位点を、相対誤差`Sketch.RELATIVE_ACCURACY`以下で求める
+
+        Parameters
+        ----------
+        quantiles : Iterable[float], default = DEFAULT_QUANTILES
+            求める分位点の並び。それぞれ0以上1以下
+
+        Returns
+        -------
+        Dict[float, Optional[float]]
+            分位点をキーとした応答時間の近似値。有効な応答が無い場合は`None`
+
+        Raises
+        ------
+        ValueError
+            0以上1以下でない分位点が含まれている
+        """
+
+        values = list(quantiles)
+        return dict(zip(values, self.get_latency_sketch().quantiles(values)))
 
 
 def is_overlap_time(
@@ -155,10 +280,281 @@ def is_overlap_time(
     return flag_s1_e2 and flag_e1_s2
 
 
-def load_data(file_path: str, networks: List[Network] = []) -> List[Network]:
+class _NetworkIndex:
+    """
+    ログデータの読み込み時に用いる、サブネットとインターフェース文字列をキーとした索引
+
+    行ごとにネットワークリストやサーバーリストを走査せずに、記録先のサーバーを一定時間で特定する。
+    初めて現れたインターフェース文字列は`parse_interface`で整数値に変換するため、
+    `ipaddress`のオブジェクトは生成しない。
+    """
+
+    def __init__(self, networks: List[Network]) -> None:
+        self._networks = networks
+        self._networks_by_subnet: Dict[Tuple[int, int], Network] = {}
+        self._servers_by_address: Dict[str, Server] = {}
+        for network in networks:
+            self._networks_by_subnet.setdefault((network.network_address, network.prefixlen), network)
+
+    def get_server(self, address: str) -> Server:
+        """
+        インターフェース文字列に対応するサーバーを取得する。
+        ネットワークやサーバーが存在しなければ新規に作成し、ネットワークリストの末尾に追加する。
+        """
+
+        server = self._servers_by_address.get(address)
+        if server is not None:
+            return server
+
+        with Instrumentation.stage("ip"):
+            ip_int, prefixlen, network_int = parse_interface(address)
+            network = self.get_network(network_int, prefixlen)
+            server = network.get_server(ip_int)
+            if server is None:
+                # 新規サーバーを登録する
+                server = Server(ip_address=address)
+                network.add_server(server=server)
+            self._servers_by_address[address] = server
+        return server
+
+    def add_columns(self, address: str, timestamps: Sequence[int], responses: Sequence[int]) -> None:
+        """
+        インターフェース文字列に対応するサーバーに列データを登録する。
+        新規サーバーの場合は、列データをコピーせずにそのまま保持させる。
+        """
+
+        server = self._servers_by_address.get(address)
+        if server is None:
+            with Instrumentation.stage("ip"):
+                ip_int, prefixlen, network_int = parse_interface(address)
+                network = self.get_network(network_int, prefixlen)
+                server = network.get_server(ip_int)
+            if server is None:
+                # 新規サーバーを登録する
+                server = Server.from_columns(address, timestamps, responses)
+                network.add_server(server=server)
+                self._servers_by_address[address] = server
+                return
+            self._servers_by_address[address] = server
+        server.extend_ping_epochs(timestamps, responses)
+
+    def get_network(self, network_address: int, prefixlen: int) -> Network:
+        """
+        ネットワークアドレスの整数値とネットワークプレフィックス長に対応するネットワークを取得する。
+        存在しなければ新規に作成する。
+        """
+
+        network = self._networks_by_subnet.get((network_address, prefixlen))
+        if network is None:
+            # 新規ネットワークを登録する
+            network = Network.from_int(network_address, prefixlen)
+            self._networks_by_subnet[(network_address, prefixlen)] = network
+            self._networks.append(network)
+        return network
+
+
+def intersect_intervals(
+    interval_lists: List[List[Tuple[DT.datetime, Optional[DT.datetime]]]]
+) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    """
+    複数の区間リストに共通する期間を求める
+
+    各区間リストの開始・終了をイベントとして日時順に1本のストリームへマージし、
+    全ての区間リストの区間が重なっている間を走査線法で取り出す。
+    同じ日時に開始と終了が重なる場合は終了を先に処理するため、あるサーバーが復旧した日時に
+    別のサーバーがダウンした場合でも、長さ0の区間`(t, t)`は返さない。
+    計算量は、区間の総数を n、区間リストの数を k として O(n log k) となる。
+
+    Parameters
+    ----------
+    interval_lists : List[List[Tuple[DT.datetime, Optional[DT.datetime]]]]
+        開始日時の昇順に並び、互いに重ならない区間のリストの並び。終了日時が`None`の区間は末尾まで続く
+
+    Returns
+    -------
+    List[Tuple[DT.datetime, Optional[DT.datetime]]]
+        全ての区間リストに共通する期間の開始日時と終了日時のペア。末尾まで続く場合、終了日時は`None`となる
+    """
+
+    if len(interval_lists) == 0 or any(len(intervals) == 0 for intervals in interval_lists):
+        return []
+
+    results: List[Tuple[DT.datetime, Optional[DT.datetime]]] = []
+    required = len(interval_lists)
+    active = 0
+    start: Optional[DT.datetime] = None
+    with Instrumentation.stage("intersect"):
+        for time, kind in heapq.merge(*[_interval_events(intervals) for intervals in interval_lists]):
+            if kind == _EVENT_OPEN:
+                active += 1
+                if active == required:
+                    start = time
+            else:
+                if active == required and start is not None:
+                    results.append((start, time))
+                active -= 1
+        if active == required and start is not None:
+            results.append((start, None))
+    Instrumentation.count("network_intervals", len(results))
+    return results
+
+
+def _interval_events(intervals: List[Tuple[DT.datetime, Optional[DT.datetime]]]) -> Iterator[Tuple[DT.datetime, int]]:
+    """
+    区間リストを、日時順に並んだ開始・終了イベントの列に変換する
+    """
+
+    for start, end in intervals:
+        yield (start, _EVENT_OPEN)
+        if end is not None:
+            yield (end, _EVENT_CLOSE)
+
+
+class NetworkTree:
+    """
+    ネットワークをサブネットの包含関係で木構造にまとめた索引(プレフィックス木)
+
+    例えば`10.20.0.0/16`配下に`10.20.10.0/24`と`10.20.20.0/24`が存在する場合、
+    `10.20.0.0/16`を親とし、2つの`/24`のネットワークを子とする木構造となる。
+    同じサブネットを持つネットワークが複数存在する場合は、1つのノードとしてまとめて扱う。
+    """
+
+    def __init__(self, networks: List[Network]) -> None:
+        self._networks: Dict[ipaddress.IPv4Network, Network] = {}
+        self._servers: Dict[ipaddress.IPv4Network, List[Server]] = {}
+        for network in networks:
+            self._networks.setdefault(network.subnet_ipaddress, network)
+            self._servers.setdefault(network.subnet_ipaddress, []).extend(network.servers)
+
+        # プレフィックス長ごとに、ネットワークアドレスの整数値からサブネットを引く表を作成する
+        self._subnets_by_prefix: Dict[int, Dict[int, ipaddress.IPv4Network]] = {}
+        for subnet in self._networks:
+            self._subnets_by_prefix.setdefault(subnet.prefixlen, {})[int(subnet.network_address)] = subnet
+        self._prefixes: List[int] = sorted(self._subnets_by_prefix, reverse=True)
+
+        # 各サブネットの親は、自身より短いプレフィックス長の中で最長一致するサブネットとなる
+        self._parents: Dict[ipaddress.IPv4Network, Optional[ipaddress.IPv4Network]] = {}
+        self._children: Dict[ipaddress.IPv4Network, List[ipaddress.IPv4Network]] = {
+            subnet: [] for subnet in self._networks
+        }
+        for subnet in self._networks:
+            parent = self._find_subnet(int(subnet.network_address), max_prefix=subnet.prefixlen - 1)
+            self._parents[subnet] = parent
+            if parent is not None:
+                self._children[parent].append(subnet)
+
+    @property
+    def roots(self) -> List[Network]:
+        """
+        親を持たないネットワークの一覧
+        """
+
+        return [self._networks[subnet] for subnet, parent in self._parents.items() if parent is None]
+
+    def get_parent(self, network: Network) -> Optional[Network]:
+        """
+        ネットワークを直接包含するネットワークを取得する。存在しない場合は`None`
+        """
+
+        parent = self._parents[network.subnet_ipaddress]
+        return self._networks[parent] if parent is not None else None
+
+    def get_children(self, network: Network) -> List[Network]:
+        """
+        ネットワークが直接包含するネットワークの一覧を取得する
+        """
+
+        return [self._networks[subnet] for subnet in self._children[network.subnet_ipaddress]]
+
+    def find_network(
+        self, ip_address: Union[str, ipaddress.IPv4Address, ipaddress.IPv4Interface]
+    ) -> Optional[Network]:
+        """
+        IPアドレスが所属するネットワークのうち、最もプレフィックス長の長いものを取得する
+
+        Parameters
+        ----------
+        ip_address : Union[str, ipaddress.IPv4Address, ipaddress.IPv4Interface]
+            探索するIPアドレス。ネットワークプレフィックス長は付いていてもよいが、探索には用いない
+
+        Returns
+        -------
+        Optional[Network]
+            該当するネットワーク。存在しない場合は`None`
+        """
+
+        subnet = self._find_subnet(address_to_int(ip_address), max_prefix=32)
+        return self._networks[subnet] if subnet is not None else None
+
+    def get_switch_downtimes(
+        self, continuous: int = 3, since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+    ) -> Dict[ipaddress.IPv4Network, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        配下のネットワークも含めた、各ネットワークのスイッチがダウンしている期間を取得する
+
+        スイッチがダウンしている期間は、直接所属するサーバーと、配下の全てのネットワークに所属するサーバーが
+        全てダウンしている期間となる。
+        プレフィックス長の長いネットワークから順に1度だけ処理し、親ネットワークの期間は
+        直接所属するサーバーのダウンタイムと、子ネットワークで求めた期間の共通部分から求める。
+        `since`・`until`を指定した場合は、その期間と重なるもののみを取得する。
+
+        Parameters
+        ----------
+        continuous : int, default = 3
+            サーバーがダウンしていることを判定するために、何度連続で応答が無いかを決定する閾値。
+        since : Optional[datetime.datetime], default = None
+            解析する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            解析する期間の終了日時。`None`の場合は最後の記録まで
+
+        Returns
+        -------
+        Dict[ipaddress.IPv4Network, List[Tuple[DT.datetime, Optional[DT.datetime]]]]
+            サブネットをキーとした、スイッチがダウンしている開始日時と終了日時のペアのリスト
+
+        Raises
+        ------
+        ValueError
+            `continuous` が 0以下に指定された、もしくは`since`が`until`より後に指定された
+        """
+
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        _check_time_range(since, until)
+
+        results: Dict[ipaddress.IPv4Network, List[Tuple[DT.datetime, Optional[DT.datetime]]]] = {}
+        for subnet in sorted(self._networks, key=lambda subnet: subnet.prefixlen, reverse=True):
+            interval_lists = [
+                server.get_downtimes(continuous=continuous, since=since, until=until)
+                for server in self._servers[subnet]
+            ]
+            interval_lists.extend(results[child] for child in self._children[subnet])
+            results[subnet] = _filter_time_range(intersect_intervals(interval_lists), since, until)
+        return {subnet: results[subnet] for subnet in self._networks}
+
+    def _find_subnet(self, address: int, max_prefix: int) -> Optional[ipaddress.IPv4Network]:
+        """
+        アドレスを含むサブネットのうち、プレフィックス長が`max_prefix`以下で最長のものを探索する
+        """
+
+        for prefix in self._prefixes:
+            if prefix > max_prefix:
+                continue
+            mask = prefix_to_netmask(prefix)
+            subnet = self._subnets_by_prefix[prefix].get(address & mask)
+            if subnet is not None:
+                return subnet
+        return None
+
+
+def load_data(
+    file_path: str, networks: List[Network] = [], chunk_size: int = READ_CHUNK_SIZE, cache: bool = False
+) -> List[Network]:
     """
     ログデータからネットワーク切り分けの行われたサーバーデータを生成する
 
+    ログデータはチャンク単位で読み込み、パースした行から順にサーバーデータへ登録する。
+
     Parameters
     ----------
     file_path : str
@@ -166,6 +562,11 @@ def load_data(file_path: str, networks: List[Network] = []) -> List[Network]:
     networks : List[Network], optional
         既存のデータがある場合のみ指定。
         追記形式でデータを読み込む
+    chunk_size : int, default = READ_CHUNK_SIZE
+        1度に読み込む文字数
+    cache : bool, default = False
+        `True`の場合、ログデータと同じディレクトリのバイナリキャッシュ(`Cache`参照)を用いる。
+        キャッシュから読み込んだ応答ログは`mmap`した領域をコピーせずに参照する
 
     Returns
     -------
@@ -174,61 +575,101 @@ def load_data(file_path: str, networks: List[Network] = []) -> List[Network]:
     """
 
     _networks = copy.copy(networks)
-    with open(file_path) as f:
-        _ = f.readline()  # ファイルの先頭は説明文なので読み飛ばす
-        for line in f.readlines():
-            line_strip = line.strip()
-            if len(line_strip) == 0:  # 入力が空の場合は処理をスキップ
-                continue
-            datetime, ip_address, response_msec = csv_to_params(line_strip)
-            _tmp_ip = ipaddress.IPv4Interface(ip_address)
-            for network in _networks:
-                if network.subnet_ipaddress == _tmp_ip.network:
-                    # 既存ネットワーク上にデータを記録する
-                    for server in network.servers:
-                        if server.ip_address == _tmp_ip:
-                            # 既存のサーバに記録する
-                            server.append_ping_results(datetime_str=datetime, response_msec=response_msec)
-                            break
-                    else:
-                        # 新規サーバーに記録する
-                        server = Server(ip_address=ip_address)
-                        server.append_ping_results(datetime_str=datetime, response_msec=response_msec)
-                        network.add_server(server=server)
-                    break
-            else:
-                # 新規ネットワーク & 新規サーバに記録する
-                server = Server(ip_address=ip_address)
-                server.append_ping_results(datetime_str=datetime, response_msec=response_msec)
+    index = _NetworkIndex(_networks)
+    with Instrumentation.stage("load"):
+        if cache:
+            columns = load_columns(file_path=file_path, cache=True)
+            with Instrumentation.stage("register"):
+                for ip_address, (timestamps, responses) in columns.items():
+                    index.add_columns(ip_address, timestamps, responses)
+            return _networks
+
+        for rows in iter_csv_blocks(file_path=file_path, chunk_size=chunk_size):
+            with Instrumentation.stage("register"):
+                for timestamp, ip_address, response_msec in rows:
+                    index.get_server(ip_address).append_ping_epoch(timestamp=timestamp, response_msec=response_msec)
 
-                network = Network(_tmp_ip.network)
-                network.add_server(server=server)
-                _networks.append(network)
+    return _networks
+
+
+def load_data_parallel(
+    file_paths: List[str],
+    networks: List[Network] = [],
+    max_workers: Optional[int] = None,
+    chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+) -> List[Network]:
+    """
+    複数のログデータを複数プロセスで並列に読み込み、ネットワーク切り分けの行われたサーバーデータを生成する
+
+    `file_paths`の順に`load_data`で追記読み込みした場合と同じ結果となる。
+
+    Parameters
+    ----------
+    file_paths : List[str]
+        ログデータのファイルパスの並び
+    networks : List[Network], optional
+        既存のデータがある場合のみ指定。
+        追記形式でデータを読み込む
+    max_workers : Optional[int], default = None
+        ワーカープロセス数。`None`の場合はCPUコア数
+    chunk_bytes : int, default = PARALLEL_CHUNK_BYTES
+        1タスクあたりのおおよそのバイト数
+
+    Returns
+    -------
+    List[Network]
+        IPアドレスで切り分けられたネットワークリスト
+    """
 
+    _networks = copy.copy(networks)
+    index = _NetworkIndex(_networks)
+    with Instrumentation.stage("load"):
+        columns = load_columns_parallel(file_paths=file_paths, max_workers=max_workers, chunk_bytes=chunk_bytes)
+        with Instrumentation.stage("register"):
+            for ip_address, (timestamps, responses) in columns.items():
+                index.add_columns(ip_address, timestamps, responses)
     return _networks
 
 
-def print_networks_error(
+def analyze(
     networks: List[Network],
     continuous: int = 3,
+    time_threshold: int = 100,
     with_server_timeout: bool = True,
     with_server_overload: bool = True,
-    time_threshold: int = 100,
-) -> None:
-    """ネットワーク内のエラー情報を含めたサーバーエラー情報を出力する
+    nested: bool = False,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+) -> List[NetworkReport]:
+    """
+    ネットワーク群のスイッチのダウン情報と、所属するサーバーのダウン情報及び過負荷情報をまとめて解析する
+
+    サーバーの解析結果は`Server.analyze`によってキャッシュされるため、
+    スイッチのダウン判定とサーバーの解析で同じ計算が繰り返されることはない。
 
     Parameters
     ----------
     networks : List[Network]
-        表示するネットワークリスト
+        解析を行うネットワークリスト
     continuous : int, default = 3
         ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
     with_server_timeout : bool, default = True
-        サーバータイムアウト情報を同時に出力するかどうかを指定する
+        サーバーのダウンしている区間を解析するかどうかを指定する
     with_server_overload : bool, default = True
-        サーバー過負荷情報を同時に出力するかどうかを指定する
+        サーバーの過負荷状態の区間を解析するかどうかを指定する
     time_threshold : int, default = 100
         過負荷状態と判定するための応答時間閾値
+    nested : bool, default = False
+        `True`の場合、スイッチのダウン判定に配下のネットワーク(`NetworkTree`参照)に所属するサーバーも含める
+    since : Optional[datetime.datetime], default = None
+        解析する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        解析する期間の終了日時。`None`の場合は最後の記録まで
+
+    Returns
+    -------
+    List[NetworkReport]
+        `networks`と同じ順序で並んだ解析結果
 
     Raises
     ------
@@ -240,42 +681,89 @@ def print_networks_error(
         raise ValueError(f"continuous must over 0 (now {continuous})")
     if not (time_threshold > 0):
         raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+    _check_time_range(since, until)
 
-    def _add_label(
-        time_pair: Tuple[DT.datetime, Optional[DT.datetime]],
-        address: Union[ipaddress.IPv4Interface, ipaddress.IPv4Network],
-        label: str,
-    ) -> Tuple[DT.datetime, Optional[DT.datetime], Union[ipaddress.IPv4Interface, ipaddress.IPv4Network], str]:
-        return (time_pair[0], time_pair[1], address, label)
-
-    SWITCH_DOWN_LABEL = "switch down"
-    DOWNTIME_LABEL = "server down"
-    OVERLOAD_LABEL = "server overload"
+    switch_downtimes = (
+        NetworkTree(networks).get_switch_downtimes(continuous=continuous, since=since, until=until) if nested else {}
+    )
 
+    reports: List[NetworkReport] = []
     for network in networks:
-        network_downtime_list_pre = network.get_network_downtime(continuous=continuous)
-        network_downtime_list = [
-            _add_label(data, network.subnet_ipaddress, SWITCH_DOWN_LABEL) for data in network_downtime_list_pre
-        ]
-
-        downtime_list = []
-        overload_list = []
-        for server in network.servers:
-            if with_server_timeout:
-                downtime_list_pre = server.get_downtimes(continuous=continuous)
-                downtime_list.extend(
-                    [_add_label(data, server.ip_address, DOWNTIME_LABEL) for data in downtime_list_pre]
-                )
-            if with_server_overload:
-                overload_list_pre = server.get_overload_times(continuous=continuous, time_threshold=time_threshold)
-                overload_list.extend(
-                    [_add_label(data, server.ip_address, OVERLOAD_LABEL) for data in overload_list_pre]
-                )
-
-        errors_list = sorted(network_downtime_list + downtime_list + overload_list, key=lambda x: x[0:2])
-        if len(errors_list) != 0:
-            print(f"{network.subnet_ipaddress}", "has error" if len(network_downtime_list) != 0 else "summary")
-            for start, end, address, label in errors_list:
-                print(f"    {address} {label} {start} ~ {end if end is not None else ''}")
+        if nested:
+            network_downtimes = switch_downtimes[network.subnet_ipaddress]
+        else:
+            network_downtimes = network.get_network_downtime(continuous=continuous, since=since, until=until)
+        server_reports = tuple(
+            server.analyze(
+                continuous=continuous,
+                time_threshold=time_threshold,
+                with_downtime=with_server_timeout,
+                with_overload=with_server_overload,
+                since=since,
+                until=until,
+            )
+            for server in network.servers
+        )
+        switch_incidents = tuple(
+            Incident(network.subnet_ipaddress, SWITCH_DOWN_LABEL, start, end) for start, end in network_downtimes
+        )
+        reports.append(NetworkReport(network.subnet_ipaddress, switch_incidents, server_reports))
+    return reports
+
+
+def print_networks_error(
+    networks: List[Network],
+    continuous: int = 3,
+    with_server_timeout: bool = True,
+    with_server_overload: bool = True,
+    time_threshold: int = 100,
+    nested: bool = False,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+) -> None:
+    """ネットワーク内のエラー情報を含めたサーバーエラー情報を出力する
+
+    Parameters
+    ----------
+    networks : List[Network]
+        表示するネットワークリスト
+    continuous : int, default = 3
+        ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+    with_server_timeout : bool, default = True
+        サーバータイムアウト情報を同時に出力するかどうかを指定する
+    with_server_overload : bool, default = True
+        サーバー過負荷情報を同時に出力するかどうかを指定する
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+    nested : bool, default = False
+        `True`の場合、スイッチのダウン判定に配下のネットワーク(`NetworkTree`参照)に所属するサーバーも含める
+    since : Optional[datetime.datetime], default = None
+        表示する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        表示する期間の終了日時。`None`の場合は最後の記録まで
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    reports = analyze(
+        networks,
+        continuous=continuous,
+        time_threshold=time_threshold,
+        with_server_timeout=with_server_timeout,
+        with_server_overload=with_server_overload,
+        nested=nested,
+        since=since,
+        until=until,
+    )
+    for report in reports:
+        incidents = report.incidents
+        if len(incidents) != 0:
+            print(f"{report.subnet}", "has error" if len(report.switch_downtimes) != 0 else "summary")
+            for incident in incidents:
+                end = incident.end if incident.end is not None else ""
+                print(f"    {incident.address} {incident.label} {incident.start} ~ {end}")
         else:
-            print(f"{network.subnet_ipaddress} has no error")
+            print(f"{report.subnet} has no error")
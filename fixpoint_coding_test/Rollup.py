@@ -0,0 +1,356 @@
+"""
+応答時間を分・時・日単位の区間ごとに集計した、多段の集計表(ロールアップ)
+
+各段は区間の開始時刻(エポック秒)の昇順に並んだ列で、区間ごとに応答ログの件数・タイムアウト数、
+有効な応答時間の最小値・最大値・合計を保持する。
+分単位の段は応答ログから、時・日単位の段は1つ細かい段の区間から集計するため、
+応答ログを追加した際に作り直すのは各段の末尾の区間のみとなる。
+
+任意の期間の集計は、期間の端数を細かい段と応答ログで補い、残りを最も粗い段の区間で求める。
+そのため、1か月分の集計でも読み込む区間は数百程度で済む。
+"""
+
+import bisect
+import datetime as DT
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+
+# 各段の区間の幅(秒)。細かい順に並び、それぞれ1つ前の幅の倍数である
+ROLLUP_WIDTHS: Tuple[int, ...] = (60, 3600, 86400)
+
+# `Server.TIMEOUT_SYMBOL`と同じ値
+_TIMEOUT: int = -1
+# 有効な応答が無い区間の最小値・最大値
+_NO_MIN: int = (1 << 31) - 1
+_NO_MAX: int = -1
+
+
+class LatencySummary(NamedTuple):
+    """
+    期間内の応答ログの集計
+
+    samples : int
+        応答ログの件数(タイムアウトを含む)
+    timeouts : int
+        タイムアウトした応答ログの件数
+    min_msec : Optional[int]
+        有効な応答時間の最小値。有効な応答が無い場合は`None`
+    max_msec : Optional[int]
+        有効な応答時間の最大値。有効な応答が無い場合は`None`
+    sum_msec : int
+        有効な応答時間の合計
+    """
+
+    samples: int
+    timeouts: int
+    min_msec: Optional[int]
+    max_msec: Optional[int]
+    sum_msec: int
+
+    @property
+    def mean_msec(self) -> Optional[float]:
+        """
+        有効な応答時間の平均。有効な応答が無い場合は`None`
+        """
+
+        valid = self.samples - self.timeouts
+        return self.sum_msec / valid if valid != 0 else None
+
+
+class RollupBucket(NamedTuple):
+    """
+    一定の幅の区間の応答ログの集計
+
+    start : datetime.datetime
+        区間の開始日時(この日時を含む)
+    end : datetime.datetime
+        区間の終了日時(この日時を含まない)
+    summary : LatencySummary
+        区間内の応答ログの集計
+    """
+
+    start: DT.datetime
+    end: DT.datetime
+    summary: LatencySummary
+
+
+class _Level:
+    """
+    一定の幅の区間ごとの集計を、区間の開始時刻の昇順に並んだ列で保持する
+    """
+
+    __slots__ = ("width", "starts", "samples", "timeouts", "mins", "maxs", "sums")
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.starts: array = array("q")
+        self.samples: array = array("q")
+        self.timeouts: array = array("q")
+        self.mins: array = array("i")
+        self.maxs: array = array("i")
+        self.sums: array = array("q")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def truncate(self, size: int) -> None:
+        """
+        先頭から`size`個の区間のみを残す
+        """
+
+        for column in (self.starts, self.samples, self.timeouts, self.mins, self.maxs, self.sums):
+            del column[size:]
+
+    def append(self, start: int, samples: int, timeouts: int, min_msec: int, max_msec: int, sum_msec: int) -> None:
+        self.starts.append(start)
+        self.samples.append(samples)
+        self.timeouts.append(timeouts)
+        self.mins.append(min_msec)
+        self.maxs.append(max_msec)
+        self.sums.append(sum_msec)
+
+    def index_range(self, begin: int, end: int) -> Tuple[int, int]:
+        """
+        開始時刻が`[begin, end)`に含まれる区間の添字の範囲を求める
+        """
+
+        return bisect.bisect_left(self.starts, begin), bisect.bisect_left(self.starts, end)
+
+
+class Rollup:
+    """
+    日時の昇順に追加される応答ログを、`ROLLUP_WIDTHS`の各幅の区間ごとに集計する
+
+    Attributes
+    ----------
+    rows : int
+        これまでに集計した応答ログの件数
+    """
+
+    __slots__ = ("rows", "_levels")
+
+    def __init__(self) -> None:
+        self.rows: int = 0
+        self._levels: List[_Level] = [_Level(width) for width in ROLLUP_WIDTHS]
+
+    def extend(self, timestamps: Sequence[int], responses: Sequence[int], start: int = 0) -> None:
+        """
+        応答ログの`start`行目以降を集計に加える
+
+        応答ログは日時の昇順(重複なし)に並び、集計済みの応答ログよりも後の日時でなければならない。
+
+        Parameters
+        ----------
+        timestamps : Sequence[int]
+            日時の昇順に並んだエポック秒の列
+        responses : Sequence[int]
+            `timestamps`と同じ順序で並んだ応答時間の列
+        start : int, default = 0
+            集計を開始する行
+        """
+
+        if start >= len(timestamps):
+            return
+        minutes = self._levels[0]
+        width = minutes.width
+        # 末尾の区間は追加される応答ログを含む可能性があるため、集計をやり直す
+        first = _first_affected(minutes, timestamps[start])
+        begin = minutes.starts[first] if first < len(minutes) else timestamps[start] - timestamps[start] % width
+        row = bisect.bisect_left(timestamps, begin, 0, start) if first < len(minutes) else start
+        minutes.truncate(first)
+
+        bucket, samples, timeouts, min_msec, max_msec, sum_msec = -1, 0, 0, _NO_MIN, _NO_MAX, 0
+        for i in range(row, len(timestamps)):
+            timestamp, response = timestamps[i], responses[i]
+            current = timestamp - timestamp % width
+            if current != bucket:
+                if samples != 0:
+                    minutes.append(bucket, samples, timeouts, min_msec, max_msec, sum_msec)
+                bucket, samples, timeouts, min_msec, max_msec, sum_msec = current, 0, 0, _NO_MIN, _NO_MAX, 0
+            samples += 1
+            if response == _TIMEOUT:
+                timeouts += 1
+                continue
+            sum_msec += response
+            if response < min_msec:
+                min_msec = response
+            if response > max_msec:
+                max_msec = response
+        if samples != 0:
+            minutes.append(bucket, samples, timeouts, min_msec, max_msec, sum_msec)
+
+        # 粗い段は、1つ細かい段の区間から末尾の区間のみを集計し直す
+        for finer, coarser in zip(self._levels, self._levels[1:]):
+            first = _first_affected(coarser, begin)
+            begin = coarser.starts[first] if first < len(coarser) else begin - begin % coarser.width
+            coarser.truncate(first)
+            lo, hi = finer.index_range(begin, finer.starts[-1] + 1)
+            _merge_into(finer, lo, hi, coarser)
+        self.rows = len(timestamps)
+
+    def summarize(self, begin: int, end: int, timestamps: Sequence[int], responses: Sequence[int]) -> LatencySummary:
+        """
+        `[begin, end)`の期間の応答ログを集計する
+
+        期間の端数のうち、分単位に満たない部分は応答ログから、それ以外は区間の幅が期間に収まる最も粗い段から集計する。
+
+        Parameters
+        ----------
+        begin : int
+            期間の開始時刻(エポック秒、この時刻を含む)
+        end : int
+            期間の終了時刻(エポック秒、この時刻を含まない)
+        timestamps : Sequence[int]
+            集計済みの応答ログのエポック秒の列
+        responses : Sequence[int]
+            集計済みの応答ログの応答時間の列
+
+        Returns
+        -------
+        LatencySummary
+            期間内の応答ログの集計
+        """
+
+        total = _Accumulator()
+        if not (begin < end):
+            return total.summary()
+        width = self._levels[0].width
+        inner_begin, inner_end = -(-begin // width) * width, end // width * width
+        if not (inner_begin < inner_end):
+            total.add_rows(timestamps, responses, begin, end)
+            return total.summary()
+        total.add_rows(timestamps, responses, begin, inner_begin)
+        total.add_rows(timestamps, responses, inner_end, end)
+        self._summarize_level(0, inner_begin, inner_end, total)
+        return total.summary()
+
+    def buckets(self, resolution: int, begin: int, end: int) -> List[Tuple[int, LatencySummary]]:
+        """
+        `resolution`秒ごとの区間の集計を、応答ログが存在する区間のみ開始時刻の昇順に求める
+
+        `resolution`を割り切る最も粗い段から集計するため、読み込む区間の数は可能な限り少なくなる。
+
+        Parameters
+        ----------
+        resolution : int
+            区間の幅(秒)。最も細かい段の幅の倍数
+        begin : int
+            期間の開始時刻(エポック秒、この時刻を含む区間から)
+        end : int
+            期間の終了時刻(エポック秒、この時刻を含まない区間まで)
+
+        Returns
+        -------
+        List[Tuple[int, LatencySummary]]
+            区間の開始時刻(エポック秒)と集計のペア
+        """
+
+        level = [level for level in self._levels if resolution % level.width == 0][-1]
+        lo, hi = level.index_range(begin - begin % resolution, -(-end // resolution) * resolution)
+        results: List[Tuple[int, LatencySummary]] = []
+        bucket: Optional[int] = None
+        total = _Accumulator()
+        for i in range(lo, hi):
+            current = level.starts[i] - level.starts[i] % resolution
+            if current != bucket:
+                if bucket is not None:
+                    results.append((bucket, total.summary()))
+                bucket, total = current, _Accumulator()
+            total.add_level(level, i, i + 1)
+        if bucket is not None:
+            results.append((bucket, total.summary()))
+        return results
+
+    def _summarize_level(self, index: int, begin: int, end: int, total: "_Accumulator") -> None:
+        """
+        `begin`・`end`が`index`段目の幅の倍数である期間を、端数をその段から、残りを粗い段から集計する
+        """
+
+        level = self._levels[index]
+        if index + 1 < len(self._levels):
+            width = self._levels[index + 1].width
+            inner_begin, inner_end = -(-begin // width) * width, end // width * width
+            if inner_begin < inner_end:
+                total.add_level(level, *level.index_range(begin, inner_begin))
+                total.add_level(level, *level.index_range(inner_end, end))
+                self._summarize_level(index + 1, inner_begin, inner_end, total)
+                return
+        total.add_level(level, *level.index_range(begin, end))
+
+
+class _Accumulator:
+    """
+    集計を足し合わせる
+    """
+
+    __slots__ = ("samples", "timeouts", "min_msec", "max_msec", "sum_msec")
+
+    def __init__(self) -> None:
+        self.samples: int = 0
+        self.timeouts: int = 0
+        self.min_msec: int = _NO_MIN
+        self.max_msec: int = _NO_MAX
+        self.sum_msec: int = 0
+
+    def add_level(self, level: _Level, lo: int, hi: int) -> None:
+        if not (lo < hi):
+            return
+        self.samples += sum(level.samples[lo:hi])
+        self.timeouts += sum(level.timeouts[lo:hi])
+        self.min_msec = min(self.min_msec, min(level.mins[lo:hi]))
+        self.max_msec = max(self.max_msec, max(level.maxs[lo:hi]))
+        self.sum_msec += sum(level.sums[lo:hi])
+
+    def add_rows(self, timestamps: Sequence[int], responses: Sequence[int], begin: int, end: int) -> None:
+        lo, hi = bisect.bisect_left(timestamps, begin), bisect.bisect_left(timestamps, end)
+        for response in responses[lo:hi]:
+            self.samples += 1
+            if response == _TIMEOUT:
+                self.timeouts += 1
+                continue
+            self.sum_msec += response
+            self.min_msec = min(self.min_msec, response)
+            self.max_msec = max(self.max_msec, response)
+
+    def summary(self) -> LatencySummary:
+        has_valid = self.samples != self.timeouts
+        return LatencySummary(
+            self.samples,
+            self.timeouts,
+            self.min_msec if has_valid else None,
+            self.max_msec if has_valid else None,
+            self.sum_msec,
+        )
+
+
+def _first_affected(level: _Level, timestamp: int) -> int:
+    """
+    `timestamp`以降の応答ログを追加した際に集計し直す必要のある、最初の区間の添字を求める
+    """
+
+    size = len(level)
+    if size != 0 and level.starts[-1] == timestamp - timestamp % level.width:
+        return size - 1
+    return size
+
+
+def _merge_into(finer: _Level, lo: int, hi: int, coarser: _Level) -> None:
+    """
+    細かい段の`[lo, hi)`の区間を、粗い段の区間にまとめて末尾に追加する
+    """
+
+    width = coarser.width
+    i = lo
+    while i < hi:
+        bucket = finer.starts[i] - finer.starts[i] % width
+        j = bisect.bisect_left(finer.starts, bucket + width, i, hi)
+        coarser.append(
+            bucket,
+            sum(finer.samples[i:j]),
+            sum(finer.timeouts[i:j]),
+            min(finer.mins[i:j]),
+            max(finer.maxs[i:j]),
+            sum(finer.sums[i:j]),
+        )
+        i = j
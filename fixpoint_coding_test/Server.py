@@ -1,26 +1,373 @@
+import bisect
 import copy
 import datetime as DT
+import functools
 import ipaddress
 import itertools
-from typing import Dict, List, Optional, Tuple
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from fixpoint_coding_test import Cache, Instrumentation
+from fixpoint_coding_test.Rollup import ROLLUP_WIDTHS, LatencySummary, Rollup, RollupBucket
+from fixpoint_coding_test.Sketch import DEFAULT_QUANTILES, LatencySketch
+
+
+_EPOCH: DT.datetime = DT.datetime(1970, 1, 1)
+_ONE_SECOND: DT.timedelta = DT.timedelta(seconds=1)
+
+# "YYYYMMDD" -> その日の 00:00:00 のエポック秒
+_DAY_EPOCH_CACHE: Dict[str, int] = {}
+_DAY_EPOCH_CACHE_SIZE: int = 4096
+# `parse_interface`でパース結果を保持するインターフェース文字列の最大件数
+INTERFACE_CACHE_SIZE: int = 16384
+
+# ログデータを読み込む際の1チャンクあたりの文字数
+READ_CHUNK_SIZE: int = 1 << 20
+# 並列読み込みの際に1タスクへ割り当てるバイト数
+PARALLEL_CHUNK_BYTES: int = 64 << 20
+# サーバー1台あたりに保持する解析結果の最大件数
+_MEMO_SIZE: int = 64
+# 保持ポリシーの上限を超えた際に、上限のこの割合(1 / _RETENTION_SLACK)だけ余分に破棄して破棄の回数を減らす
+_RETENTION_SLACK: int = 8
+# ログデータの説明文
+_LOG_HEADER: str = "datetime,server address,response time\n"
+
+DOWNTIME_LABEL: str = "server down"
+OVERLOAD_LABEL: str = "server overload"
+
+
+class Incident(NamedTuple):
+    """
+    サーバーもしくはネットワークで検出された、ダウンもしくは過負荷の区間
+
+    address : Union[ipaddress.IPv4Interface, ipaddress.IPv4Network]
+        区間が検出されたサーバーのIPアドレス、もしくはネットワークのサブネット
+    label : str
+        `DOWNTIME_LABEL`・`OVERLOAD_LABEL`・`Network.SWITCH_DOWN_LABEL`のいずれか
+    start : datetime.datetime
+        区間の開始日時
+    end : Optional[datetime.datetime]
+        区間の終了日時。ログの末尾まで継続している場合は`None`
+    """
+
+    address: Union[ipaddress.IPv4Interface, ipaddress.IPv4Network]
+    label: str
+    start: DT.datetime
+    end: Optional[DT.datetime]
+
+
+class ServerReport(NamedTuple):
+    """
+    `Server.analyze`が返す、1台のサーバーの解析結果
+
+    address : ipaddress.IPv4Interface
+        サーバーのIPアドレス
+    downtimes : Tuple[Incident, ...]
+        ダウンしている区間。開始日時の昇順に並ぶ
+    overloads : Tuple[Incident, ...]
+        過負荷状態の区間。開始日時の昇順に並ぶ
+    """
+
+    address: ipaddress.IPv4Interface
+    downtimes: Tuple[Incident, ...]
+    overloads: Tuple[Incident, ...]
+
+    @property
+    def incidents(self) -> List[Incident]:
+        """
+        ダウン・過負荷の区間を、開始日時、終了日時、種類の順に並べたもの
+        """
+
+        return sorted(
+            self.downtimes + self.overloads, key=lambda incident: (incident.start, incident.end, incident.label)
+        )
+
+
+class RetentionPolicy(NamedTuple):
+    """
+    `Server.set_retention`で指定する、サーバーが保持する応答ログの上限
+
+    max_samples : Optional[int]
+        保持する応答ログの最大件数。`None`の場合は件数で制限しない
+    max_age : Optional[int]
+        最新の応答ログから遡って保持する秒数。`None`の場合は経過時間で制限しない
+    spill_path : Optional[str]
+        破棄した応答ログを追記するファイルパス。ログデータと同じ形式で書き込むため、`load_data`で読み直せる。
+        `None`の場合は書き出さない
+    continuous : int
+        破棄した応答ログから過負荷状態の判定を引き継ぐための、移動平均の窓の大きさ
+    time_threshold : int
+        破棄した応答ログから過負荷状態の判定を引き継ぐための、応答時間閾値
+    """
+
+    max_samples: Optional[int] = None
+    max_age: Optional[int] = None
+    spill_path: Optional[str] = None
+    continuous: int = 3
+    time_threshold: int = 100
+
+
+class RetentionCarry(NamedTuple):
+    """
+    保持ポリシーで破棄した応答ログから、保持している先頭の行へ引き継ぐダウン・過負荷の判定の状態
+
+    responses : array
+        破棄した末尾の最大`continuous - 1`行の応答時間(`array('i')`形式)。移動平均の窓を埋めるために用いる
+    valid_sum : int
+        `responses`の有効な応答時間の合計
+    valid_count : int
+        `responses`の有効な応答時間の件数
+    run_start : int
+        破棄した末尾まで連続しているタイムアウトの開始日時(エポック秒)
+    run_length : int
+        破棄した末尾まで連続しているタイムアウトの回数。末尾が有効な応答の場合は0
+    overload_start : Optional[int]
+        破棄した末尾まで過負荷状態(判定を保留しているタイムアウトを含む)が継続している場合はその開始日時(エポック秒)、
+        そうでない場合は`None`
+    pending : bool
+        破棄した末尾まで連続しているタイムアウトの判定を保留しているか
+    continuous : int
+        過負荷状態の判定に用いた窓の大きさ
+    time_threshold : int
+        過負荷状態の判定に用いた応答時間閾値
+    """
+
+    responses: array
+    valid_sum: int
+    valid_count: int
+    run_start: int
+    run_length: int
+    overload_start: Optional[int]
+    pending: bool
+    continuous: int
+    time_threshold: int
 
 
 class Server:
     """
     ログデータから生成されるサーバー情報
 
+    応答ログは、エポック秒(`array('q')`)と応答時間(`array('i')`)の2つの配列に列指向で保持する。
+    キャッシュから読み込んだサーバーは読み取り専用の`memoryview`を保持し、初めて書き込む際に配列へ複製する。
+    日時順に並べた列は各検出処理で共有され、応答ログが日時順に登録されている限りソートは行わない。
+    IPアドレスとネットワークプレフィックス長は整数で保持し、`ipaddress`のオブジェクトは参照される度に生成する。
+
     TIMEOUT_SYMBOL: int = -1
         タイムアウトした際に記録される数値
     """
 
-    ip_address: ipaddress.IPv4Interface
-    ping_results: Dict[DT.datetime, int]
+    __slots__ = (
+        "_address",
+        "_prefixlen",
+        "_timestamps",
+        "_responses",
+        "_in_order",
+        "_sorted",
+        "_version",
+        "_memo",
+        "_memo_version",
+        "_rollup",
+        "_rollup_version",
+        "_sketch",
+        "_sketch_version",
+        "_retention",
+        "_carry",
+        "_evicted",
+    )
 
     TIMEOUT_SYMBOL: int = -1
 
-    def __init__(self, ip_address: str):
-        self.ip_address = ipaddress.IPv4Interface(ip_address)
-        self.ping_results = {}
+    def __init__(self, ip_address: Union[str, ipaddress.IPv4Interface]):
+        if isinstance(ip_address, str):
+            self._address, self._prefixlen, _ = parse_interface(ip_address)
+        else:
+            interface = ipaddress.IPv4Interface(ip_address)
+            self._address = int(interface.ip)
+            self._prefixlen = interface.network.prefixlen
+        self._timestamps: array = array("q")
+        self._responses: array = array("i")
+        # 登録順が日時の昇順(重複なし)になっているか。`None`の場合は未確認
+        self._in_order: Optional[bool] = True
+        # 登録順が日時順でない場合の、ソート済みの列のキャッシュ
+        self._sorted: Optional[Tuple[array, array]] = None
+        # 応答ログが登録されるたびに増加する版数
+        self._version: int = 0
+        # 解析結果のキャッシュと、キャッシュを作成した時点の版数
+        self._memo: Dict[Tuple[Any, ...], Any] = {}
+        self._memo_version: int = 0
+        # 応答時間の集計表と、集計表に反映済みの版数
+        self._rollup: Optional[Rollup] = None
+        self._rollup_version: int = 0
+        # 応答時間の分位点のスケッチと、スケッチに反映済みの版数
+        self._sketch: Optional[LatencySketch] = None
+        self._sketch_version: int = 0
+        # 応答ログの保持ポリシーと、破棄した応答ログから引き継ぐ判定の状態、破棄した件数
+        self._retention: Optional[RetentionPolicy] = None
+        self._carry: Optional[RetentionCarry] = None
+        self._evicted: int = 0
+
+    @classmethod
+    def from_columns(cls, ip_address: str, timestamps: Sequence[int], responses: Sequence[int]) -> "Server":
+        """
+        既存の列データをコピーせずに保持するサーバーを生成する
+
+        Parameters
+        ----------
+        ip_address : str
+            サーバーのIPアドレスとネットワークプレフィックス長のペア
+        timestamps : Sequence[int]
+            ログの日時情報(エポック秒)の列。`array('q')`もしくは同じ形式の`memoryview`
+        responses : Sequence[int]
+            `timestamps`と同じ順序で並んだ応答時間の列。`array('i')`もしくは同じ形式の`memoryview`
+
+        Returns
+        -------
+        Server
+            列データを保持したサーバー
+
+        Raises
+        ------
+        ValueError
+            `timestamps`と`responses`の長さが一致しない
+        """
+
+        if not (len(timestamps) == len(responses)):
+            raise ValueError(f"length mismatch (timestamps: {len(timestamps)}, responses: {len(responses)})")
+        server = cls(ip_address=ip_address)
+        server._timestamps = timestamps  # type: ignore[assignment]
+        server._responses = responses  # type: ignore[assignment]
+        server._in_order = None  # 並び順は最初に参照する際に確認する
+        return server
+
+    def _make_writable(self) -> None:
+        """
+        読み取り専用の列を保持している場合、書き込み可能な配列へ複製する
+        """
+
+        if isinstance(self._timestamps, array):
+            return
+        if isinstance(self._timestamps, memoryview):
+            timestamps, responses = array("q"), array("i")
+            timestamps.frombytes(self._timestamps.cast("B"))
+            responses.frombytes(self._responses.cast("B"))
+        else:
+            timestamps, responses = array("q", self._timestamps), array("i", self._responses)
+        self._timestamps, self._responses = timestamps, responses
+
+    @property
+    def ip_address(self) -> ipaddress.IPv4Interface:
+        """
+        サーバーのIPアドレスとネットワークプレフィックス長のペア。参照される度に生成する
+        """
+
+        return ipaddress.IPv4Interface((self._address, self._prefixlen))
+
+    @property
+    def address(self) -> int:
+        """
+        サーバーのIPアドレスの整数値
+        """
+
+        return self._address
+
+    @property
+    def prefixlen(self) -> int:
+        """
+        サーバーのネットワークプレフィックス長
+        """
+
+        return self._prefixlen
+
+    @property
+    def network_address(self) -> int:
+        """
+        サーバーが所属するネットワークのネットワークアドレスの整数値
+        """
+
+        return self._address & prefix_to_netmask(self._prefixlen)
+
+    @property
+    def version(self) -> int:
+        """
+        応答ログの版数。応答ログが登録されるたびに増加するため、解析結果の再利用可否の判定に用いる
+        """
+
+        return self._version
+
+    @property
+    def retention(self) -> Optional[RetentionPolicy]:
+        """
+        応答ログの保持ポリシー。制限しない場合は`None`
+        """
+
+        return self._retention
+
+    @property
+    def evicted_samples(self) -> int:
+        """
+        保持ポリシーによってこれまでに破棄した応答ログの件数
+        """
+
+        return self._evicted
+
+    @property
+    def retention_carry(self) -> Optional[RetentionCarry]:
+        """
+        保持ポリシーで破棄した応答ログから引き継いだ判定の状態。破棄していない場合は`None`
+        """
+
+        return self._carry
+
+    def set_retention(self, policy: Optional[RetentionPolicy]) -> None:
+        """
+        応答ログの保持ポリシーを設定し、上限を超えている古い応答ログを直ちに破棄する
+
+        以降は応答ログを登録する度に、上限を超えた時点で上限の`1 / _RETENTION_SLACK`の割合だけ余分にまとめて破棄するため、
+        保持する応答ログが上限を超えることはない。
+        保持する列は先頭から切り詰めるのみで連続した配列のままとなるため、各検出処理や二分探索はそのまま動作する。
+
+        破棄する応答ログは1度だけ判定し、その末尾での判定の状態(`RetentionCarry`)を引き継ぐ。
+        ダウンや過負荷が継続している間も上限どおりに破棄し、破棄した応答ログから継続している区間は本来の開始日時で求める。
+        保持している応答ログと重なるダウンタイムは`continuous`によらず、過負荷状態の期間は`policy`と同じパラメータであれば、
+        全ての応答ログを解析した場合と一致する。
+
+        集計表(`get_latency_summary`)・スケッチ(`get_latency_quantiles`)は、保持している応答ログのみを対象とする。
+
+        Parameters
+        ----------
+        policy : Optional[RetentionPolicy]
+            保持ポリシー。`None`の場合は制限を解除する
+
+        Raises
+        ------
+        ValueError
+            入力値の入力範囲外の値が入力された
+        """
+
+        if policy is not None:
+            if policy.max_samples is not None and not (policy.max_samples > 0):
+                raise ValueError(f"max_samples must over 0 (now {policy.max_samples})")
+            if policy.max_age is not None and not (policy.max_age > 0):
+                raise ValueError(f"max_age must over 0 (now {policy.max_age})")
+            if not (policy.continuous > 0):
+                raise ValueError(f"continuous must over 0 (now {policy.continuous})")
+            if not (policy.time_threshold > 0):
+                raise ValueError(f"time_threshold must over 0 (now {policy.time_threshold})")
+        self._retention = policy
+        if policy is not None:
+            self._enforce_retention(slack=False)
+
+    @property
+    def ping_results(self) -> "PingResultsView":
+        """
+        応答ログを`Dict[datetime.datetime, int]`と同様に参照するための読み取り専用ビュー
+
+        日時の昇順に列挙され、同一日時のログは後から登録されたものが優先される。
+        """
+
+        return PingResultsView(self)
 
     def append_ping_results(self, datetime_str: str, response_msec: int):
         """
@@ -36,18 +383,199 @@ class Server:
             タイムアウトの場合は、`Server.TIMEOUT_SYMBOL`を指定
         """
 
-        self.ping_results[parse_datetime(datetime_str=datetime_str)] = response_msec
+        self.append_ping_epoch(datetime_to_epoch(parse_datetime(datetime_str=datetime_str)), response_msec)
+
+    def append_ping_epoch(self, timestamp: int, response_msec: int) -> None:
+        """
+        エポック秒で表された日時の応答ログを新たに登録する
+
+        Parameters
+        ----------
+        timestamp : int
+            ログの日時情報(1970-01-01 00:00:00 からの経過秒数)
+        response_msec : int
+            サーバーの応答時間。
+            タイムアウトの場合は、`Server.TIMEOUT_SYMBOL`を指定
+        """
+
+        if self._in_order and len(self._timestamps) != 0 and timestamp <= self._timestamps[-1]:
+            self._in_order = False
+        self._sorted = None
+        self._version += 1
+        try:
+            self._timestamps.append(timestamp)
+        except AttributeError:
+            # キャッシュ由来の読み取り専用の列は、初めて書き込む際に複製する
+            self._make_writable()
+            self._timestamps.append(timestamp)
+        self._responses.append(response_msec)
+        if self._retention is not None:
+            self._enforce_retention()
+
+    def extend_ping_epochs(self, timestamps: Sequence[int], responses: Sequence[int]) -> None:
+        """
+        エポック秒で表された日時の応答ログをまとめて登録する
+
+        Parameters
+        ----------
+        timestamps : Sequence[int]
+            ログの日時情報(1970-01-01 00:00:00 からの経過秒数)の並び
+        responses : Sequence[int]
+            `timestamps`と同じ順序で並んだサーバーの応答時間
+
+        Raises
+        ------
+        ValueError
+            `timestamps`と`responses`の長さが一致しない
+        """
+
+        if not (len(timestamps) == len(responses)):
+            raise ValueError(f"length mismatch (timestamps: {len(timestamps)}, responses: {len(responses)})")
+        if self._in_order and len(timestamps) != 0:
+            previous = self._timestamps[-1] if len(self._timestamps) != 0 else None
+            self._in_order = _is_strictly_increasing(timestamps, previous)
+        self._sorted = None
+        self._version += 1
+        self._make_writable()
+        self._timestamps.extend(timestamps)
+        self._responses.extend(responses)
+        if self._retention is not None:
+            self._enforce_retention()
+
+    def _enforce_retention(self, slack: bool = True) -> None:
+        """
+        保持ポリシーの上限を超えた古い応答ログを破棄し、指定されていればファイルへ書き出す
+
+        `slack`が`True`の場合は、上限の`1 / _RETENTION_SLACK`の割合だけ余分に破棄する。
+        破棄する応答ログは`_carry_forward`で判定し、その状態を引き継ぐ。
+        """
+
+        policy = self._retention
+        assert policy is not None
+        if not self._in_order:
+            # 日時が前後した応答ログは並べ替えた列で置き換え、以降は先頭から切り詰められるようにする
+            timestamps, responses = self._sorted_columns()
+            if not self._in_order:
+                self._timestamps, self._responses = array("q", timestamps), array("i", responses)
+                self._in_order, self._sorted = True, None
+                # 集計表・スケッチは行番号で追加分を管理しているため、並べ替えた列から作り直す
+                self._rollup = None
+                self._sketch = None
+        timestamps, responses = self._timestamps, self._responses
+        size = len(timestamps)
+        if size == 0:
+            return
+
+        cut = 0
+        if policy.max_samples is not None and size > policy.max_samples:
+            margin = policy.max_samples // _RETENTION_SLACK if slack else 0
+            cut = size - policy.max_samples + margin
+        if policy.max_age is not None and timestamps[0] < timestamps[-1] - policy.max_age:
+            margin = policy.max_age // _RETENTION_SLACK if slack else 0
+            cut = max(cut, bisect.bisect_left(timestamps, timestamps[-1] - policy.max_age + margin))
+        if cut == 0:
+            return
+
+        if policy.spill_path is not None:
+            _spill(policy.spill_path, str(self.ip_address), timestamps[:cut], responses[:cut])
+        self._carry = _carry_forward(
+            self._carry, policy.continuous, policy.time_threshold, timestamps[:cut], responses[:cut]
+        )
+        self._make_writable()
+        del self._timestamps[:cut]
+        del self._responses[:cut]
+        self._evicted += cut
+        self._version += 1
+        self._sorted = None
+        # 集計表・スケッチは行番号で追加分を管理しているため、保持している応答ログから作り直す
+        self._rollup = None
+        self._sketch = None
+
+    def get_columns(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        日時の昇順に並び、同一日時のログを後勝ちで1つにまとめた列データを取得する
+
+        返される列は`Server`が内部で保持しているものであり、変更してはならない。
+
+        Returns
+        -------
+        Tuple[Sequence[int], Sequence[int]]
+            エポック秒の列(`array('q')`形式)と応答時間の列(`array('i')`形式)
+        """
+
+        return self._sorted_columns()
+
+    def _sorted_columns(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        日時の昇順に並べ、同一日時のログを後勝ちで1つにまとめた列を返す
+
+        応答ログが日時順に登録されている場合は、保持している列をそのまま返す。
+        そうでない場合はソートした列を作成し、次に応答ログが登録されるまで使い回す。
+        返された列は変更してはならない。
+
+        Returns
+        -------
+        Tuple[Sequence[int], Sequence[int]]
+            エポック秒の列と応答時間の列
+        """
+
+        if self._in_order is None:
+            with Instrumentation.stage("sort"):
+                self._in_order = _is_strictly_increasing(self._timestamps)
+        if self._in_order:
+            return self._timestamps, self._responses
+        if self._sorted is None:
+            with Instrumentation.stage("sort"):
+                self._sorted = _sort_columns(self._timestamps, self._responses)
+        return self._sorted
+
+    def _row_range(self, since: Optional[DT.datetime], until: Optional[DT.datetime]) -> Tuple[int, int]:
+        """
+        日時順の列のうち、`since`以降・`until`以前の行の範囲`[start, stop)`を二分探索で求める
+        """
+
+        timestamps, _ = self._sorted_columns()
+        start = bisect.bisect_left(timestamps, datetime_to_epoch(since)) if since is not None else 0
+        stop = bisect.bisect_right(timestamps, datetime_to_epoch(until)) if until is not None else len(timestamps)
+        return start, stop
+
+    def _memoized(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        """
+        パラメータをキーとして解析結果をキャッシュし、同じ版数の間は使い回す
+
+        応答ログが登録されて版数が変わった場合は、キャッシュを全て破棄してから計算し直す。
+        キャッシュされた値は共有されるため、変更不可能な形式で返すこと。
+        """
+
+        if self._memo_version != self._version or len(self._memo) >= _MEMO_SIZE:
+            self._memo.clear()
+            self._memo_version = self._version
+        result = self._memo.get(key)
+        if result is None:
+            result = self._memo[key] = compute()
+        return result
 
-    def get_downtimes(self, continuous: int = 1) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    def get_downtimes(
+        self, continuous: int = 1, since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+    ) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
         """
         サーバーのダウンタイム情報をすべて取得する
 
+        `since`・`until`を指定した場合は、その期間と重なるダウンタイムのみを取得する。
+        期間の境界は日時順の列を二分探索して求め、境界をまたぐ連続したタイムアウトの分だけ前後を読み足すため、
+        計算量は全体の行数ではなく期間内の行数に比例する。
+        ダウンタイムの開始時間と終了時間は、全期間を解析した場合と同じになる。
+
         Parameters
         ----------
         continuous : int, default=1
             サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値。
             デフォルトでは1回
             0以下を指定した場合、AssertionErrorとなる
+        since : Optional[datetime.datetime], default = None
+            解析する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            解析する期間の終了日時。`None`の場合は最後の記録まで
 
         Returns
         -------
@@ -58,52 +586,77 @@ class Server:
         Raises
         ------
         ValueError
-            `continuous` が 0以下に指定された
+            `continuous` が 0以下に指定された、もしくは`since`が`until`より後に指定された
         """
 
         if not (continuous > 0):
             raise ValueError(f"continuous must over 0 (now {continuous})")
+        _check_time_range(since, until)
+
+        def _compute() -> Tuple[Tuple[DT.datetime, Optional[DT.datetime]], ...]:
+            timestamps, responses = self._sorted_columns()
+            start, stop = _timeout_bounds(responses, *self._row_range(since, until))
+            with Instrumentation.stage("downtime"):
+                downtimes = _downtimes_by_threshold(
+                    timestamps[start:stop], _timeout_runs(responses[start:stop]), [continuous]
+                )[continuous]
+            if start == 0 and self._carry is not None:
+                downtimes = _join_carried_downtimes(self._carry, continuous, downtimes, timestamps, responses)
+            downtimes = _filter_time_range(downtimes, since, until)
+            Instrumentation.count("downtime_intervals", len(downtimes))
+            return tuple(downtimes)
+
+        return list(self._memoized(("downtimes", continuous, since, until), _compute))
+
+    def get_downtimes_multi(
+        self, continuous_values: Iterable[int]
+    ) -> Dict[int, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        複数の閾値についてのダウンタイム情報をまとめて取得する
 
-        sorted_ping_results: List[Tuple[DT.datetime, int]] = sorted(self.ping_results.items())
-        sorted_response: List[int] = [resp for _, resp in sorted_ping_results]
-        # ダウンした列番号を取得
-        down_recode: List[int] = [i for i, resp in enumerate(sorted_response) if resp == Server.TIMEOUT_SYMBOL]
-        properly_recode: List[int] = [i for i, resp in enumerate(sorted_response) if resp != Server.TIMEOUT_SYMBOL]
-        # 連続した番号をまとめる
-        down_recode_alt: List[List[int]] = [
-            list(g)
-            for _, g in itertools.groupby(
-                down_recode, key=(lambda n, c=itertools.count(): n - next(c))  # type: ignore
-            )
-        ]
-        properly_recode_alt: List[int] = [
-            list(g)[0]
-            for _, g in itertools.groupby(
-                properly_recode, key=(lambda n, c=itertools.count(): n - next(c))  # type: ignore
-            )
-        ]
-        # ペアを生成
-        result: List[Tuple[DT.datetime, Optional[DT.datetime]]] = []
-        for recodes in down_recode_alt:
-            if len(recodes) >= continuous:
-                target: int = recodes[0]
-                while True:
-                    if len(properly_recode_alt) != 0 and properly_recode_alt[0] < target:
-                        properly_recode_alt.pop(0)
-                    else:
-                        break
-                if len(properly_recode_alt) != 0:
-                    result.append((sorted_ping_results[target][0], sorted_ping_results[properly_recode_alt.pop(0)][0]))
-                else:
-                    result.append((sorted_ping_results[target][0], None))
-        return result
+        連続したタイムアウトの検出は1度だけ行い、その結果を全ての閾値で共有する。
+
+        Parameters
+        ----------
+        continuous_values : Iterable[int]
+            サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値の並び
+
+        Returns
+        -------
+        Dict[int, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]
+            閾値をキーとした、`get_downtimes`と同じ形式のダウンタイム情報
+
+        Raises
+        ------
+        ValueError
+            `continuous_values` に 0以下の値が含まれている
+        """
+
+        values = _continuous_values(continuous_values)
+        timestamps, responses = self._sorted_columns()
+        with Instrumentation.stage("downtime"):
+            results = _downtimes_by_threshold(timestamps, _timeout_runs(responses), values)
+        if self._carry is not None:
+            for value in values:
+                results[value] = _join_carried_downtimes(self._carry, value, results[value], timestamps, responses)
+        Instrumentation.count("downtime_intervals", sum(len(downtimes) for downtimes in results.values()))
+        return results
 
     def get_overload_times(
-        self, continuous: int = 3, time_threshold: int = 100
+        self,
+        continuous: int = 3,
+        time_threshold: int = 100,
+        since: Optional[DT.datetime] = None,
+        until: Optional[DT.datetime] = None,
     ) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
         """
         サーバーが過負荷になった期間を開始、終了日時のペアで取得する
 
+        `since`・`until`を指定した場合は、その期間と重なる過負荷状態の期間のみを取得する。
+        期間の境界は日時順の列を二分探索して求め、前後は判定の状態が初期状態に戻る行まで読み足すため、
+        計算量は全体の行数ではなく期間内の行数に比例する。
+        過負荷状態の開始時間と終了時間は、全期間を解析した場合と同じになる。
+
         Parameters
         ----------
         continuous : int, default = 3
@@ -111,76 +664,1063 @@ class Server:
             前方に対して平均を取り、サーバーの開始直後やタイムアウト時には、`continuous`以内の有効なデータを用いて平均を取る。
         time_threshold : int, default = 100
             過負荷状態と判定するための応答時間閾値
+        since : Optional[datetime.datetime], default = None
+            解析する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            解析する期間の終了日時。`None`の場合は最後の記録まで
+
+        Returns
+        -------
+        List[Tuple[datetime.datetime, datetime.datetime]]
+            サーバー上に存在する過負荷状態の開始時間と終了時間のペアをリストで返す。
+            最後の記録まで過負荷状態だった場合、終了時間は`None`となる。
+
+        Raises
+        ------
+        ValueError
+            入力値の入力範囲外の値が入力された
+        """
+
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        if not (time_threshold > 0):
+            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+        _check_time_range(since, until)
+
+        def _compute() -> Tuple[Tuple[DT.datetime, Optional[DT.datetime]], ...]:
+            timestamps, responses = self._sorted_columns()
+            carry = self._carry
+            prefix = carry.responses if carry is not None else array("i")
+            start, stop = self._row_range(since, until)
+            if carry is not None and start == 0:
+                # 破棄した応答ログから継続している区間を繋げるため、保持している先頭の行は必ず判定する
+                stop = max(stop, min(1, len(responses)))
+            start, stop = _overload_bounds(responses, continuous, time_threshold, start, stop, prefix)
+            # 移動平均の窓を埋めるため、開始行の直前の`continuous`行も与える。
+            # 保持している先頭の行より前は、保持ポリシーで破棄した末尾の行で補う
+            offset = max(0, start - continuous)
+            window = responses[offset:stop]
+            if start < continuous and len(prefix) != 0:
+                head = prefix[max(0, len(prefix) - (continuous - start)) :]
+                window = head + array("i", window)
+                offset -= len(head)
+            with Instrumentation.stage("overload"):
+                ranges = _overload_ranges(window, continuous, time_threshold, start - offset)
+            overloads = [
+                (
+                    epoch_to_datetime(timestamps[offset + range_start]),
+                    epoch_to_datetime(timestamps[offset + range_end]) if range_end is not None else None,
+                )
+                for range_start, range_end in ranges
+            ]
+            if (
+                start == 0
+                and carry is not None
+                and (carry.continuous, carry.time_threshold)
+                == (
+                    continuous,
+                    time_threshold,
+                )
+            ):
+                overloads = _join_carried_overloads(carry, overloads, timestamps, responses)
+            overloads = _filter_time_range(overloads, since, until)
+            Instrumentation.count("overload_intervals", len(overloads))
+            return tuple(overloads)
+
+        return list(self._memoized(("overload_times", continuous, time_threshold, since, until), _compute))
+
+    def analyze(
+        self,
+        continuous: int = 3,
+        time_threshold: int = 100,
+        with_downtime: bool = True,
+        with_overload: bool = True,
+        since: Optional[DT.datetime] = None,
+        until: Optional[DT.datetime] = None,
+    ) -> ServerReport:
+        """
+        サーバーのダウン情報と過負荷情報をまとめて解析する
+
+        解析結果はパラメータごとにキャッシュされ、応答ログが新たに登録されるまで再計算されない。
+        `since`・`until`を指定した場合は、その期間と重なる区間のみを解析する。
+
+        Parameters
+        ----------
+        continuous : int, default = 3
+            ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+        time_threshold : int, default = 100
+            過負荷状態と判定するための応答時間閾値
+        with_downtime : bool, default = True
+            ダウンしている区間を解析するかどうかを指定する。`False`の場合、`downtimes`は空となる
+        with_overload : bool, default = True
+            過負荷状態の区間を解析するかどうかを指定する。`False`の場合、`overloads`は空となる
+        since : Optional[datetime.datetime], default = None
+            解析する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            解析する期間の終了日時。`None`の場合は最後の記録まで
+
+        Returns
+        -------
+        ServerReport
+            サーバーの解析結果
+
+        Raises
+        ------
+        ValueError
+            入力値の入力範囲外の値が入力された
+        """
+
+        if not (continuous > 0):
+            raise ValueError(f"continuous must over 0 (now {continuous})")
+        if not (time_threshold > 0):
+            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+        _check_time_range(since, until)
+
+        def _compute() -> ServerReport:
+            downtimes: Tuple[Incident, ...] = ()
+            overloads: Tuple[Incident, ...] = ()
+            if with_downtime:
+                downtimes = tuple(
+                    Incident(self.ip_address, DOWNTIME_LABEL, start, end)
+                    for start, end in self.get_downtimes(continuous=continuous, since=since, until=until)
+                )
+            if with_overload:
+                overloads = tuple(
+                    Incident(self.ip_address, OVERLOAD_LABEL, start, end)
+                    for start, end in self.get_overload_times(
+                        continuous=continuous, time_threshold=time_threshold, since=since, until=until
+                    )
+                )
+            return ServerReport(self.ip_address, downtimes, overloads)
+
+        return self._memoized(
+            ("report", continuous, time_threshold, with_downtime, with_overload, since, until), _compute
+        )
+
+    def get_latency_summary(
+        self, since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+    ) -> LatencySummary:
+        """
+        期間内の応答ログの件数・タイムアウト数と、応答時間の最小値・最大値・合計を取得する
+
+        分・時・日単位の集計表(`Rollup`参照)を用い、期間に収まる最も粗い区間から集計する。
+        そのため、1か月分の集計でも応答ログを全て走査することはない。
+        集計表は参照する時点で、前回から追加された応答ログのみを反映する。
+
+        Parameters
+        ----------
+        since : Optional[datetime.datetime], default = None
+            集計する期間の開始日時。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            集計する期間の終了日時(この日時を含む)。`None`の場合は最後の記録まで
+
+        Returns
+        -------
+        LatencySummary
+            期間内の応答ログの集計
+
+        Raises
+        ------
+        ValueError
+            `since`が`until`より後に指定された
+        """
+
+        _check_time_range(since, until)
+        rollup = self._rolled_up()
+        timestamps, responses = self._sorted_columns()
+        if len(timestamps) == 0:
+            return rollup.summarize(0, 0, timestamps, responses)
+        begin = datetime_to_epoch(since) if since is not None else timestamps[0]
+        end = datetime_to_epoch(until) + 1 if until is not None else timestamps[-1] + 1
+        return rollup.summarize(begin, end, timestamps, responses)
+
+    def get_latency_rollup(
+        self, resolution: int = 3600, since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+    ) -> List[RollupBucket]:
+        """
+        `resolution`秒ごとの区間に分けた、応答ログの集計を取得する
+
+        区間は1970-01-01 00:00:00 を起点として`resolution`秒ごとに区切り、応答ログが存在する区間のみを返す。
+        `resolution`を割り切る最も粗い集計表(`Rollup.ROLLUP_WIDTHS`参照)から集計する。
+
+        Parameters
+        ----------
+        resolution : int, default = 3600
+            区間の幅(秒)。60の倍数
+        since : Optional[datetime.datetime], default = None
+            集計する期間の開始日時。この日時を含む区間から返す。`None`の場合は最初の記録から
+        until : Optional[datetime.datetime], default = None
+            集計する期間の終了日時。この日時を含む区間まで返す。`None`の場合は最後の記録まで
+
+        Returns
+        -------
+        List[RollupBucket]
+            区間の開始日時の昇順に並んだ集計
+
+        Raises
+        ------
+        ValueError
+            `resolution`が60の倍数でない、もしくは`since`が`until`より後に指定された
+        """
+
+        if not (resolution > 0 and resolution % ROLLUP_WIDTHS[0] == 0):
+            raise ValueError(f"resolution must be a multiple of {ROLLUP_WIDTHS[0]} (now {resolution})")
+        _check_time_range(since, until)
+        rollup = self._rolled_up()
+        timestamps, _ = self._sorted_columns()
+        if len(timestamps) == 0:
+            return []
+        begin = datetime_to_epoch(since) if since is not None else timestamps[0]
+        end = datetime_to_epoch(until) + 1 if until is not None else timestamps[-1] + 1
+        step = DT.timedelta(seconds=resolution)
+        return [
+            RollupBucket(epoch_to_datetime(start), epoch_to_datetime(start) + step, summary)
+            for start, summary in rollup.buckets(resolution, begin, end)
+        ]
+
+    def _rolled_up(self) -> Rollup:
+        """
+        前回参照した時点から追加された応答ログを反映した集計表を返す
+
+        応答ログが日時順に追加されている間は追加分のみを集計し、そうでない場合は作り直す。
+        """
+
+        if self._rollup is not None and self._rollup_version == self._version:
+            return self._rollup
+        timestamps, responses = self._sorted_columns()
+        if self._rollup is None or not self._in_order:
+            self._rollup = Rollup()
+        self._rollup.extend(timestamps, responses, self._rollup.rows)
+        self._rollup_version = self._version
+        return self._rollup
+
+    def get_latency_sketch(self) -> LatencySketch:
+        """
+        応答時間の分位点を求めるためのスケッチ(`Sketch.LatencySketch`参照)を取得する
+
+        スケッチは参照する時点で、前回から追加された応答ログのみを反映する。
+        返されるスケッチは複製であり、他のスケッチを併合しても`Server`には影響しない。
+
+        Returns
+        -------
+        LatencySketch
+            全ての応答ログを反映したスケッチ
+        """
+
+        return self._sketched().copy()
+
+    def get_latency_quantiles(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[float, Optional[float]]:
+        """
+        有効な応答時間の分位点を、相対誤差`Sketch.RELATIVE_ACCURACY`以下で求める
+
+        Parameters
+        ----------
+        quantiles : Iterable[float], default = DEFAULT_QUANTILES
+            求める分位点の並び。それぞれ0以上1以下
+
+        Returns
+        -------
+        Dict[float, Optional[float]]
+            分位点をキーとした応答時間の近似値。有効な応答が無い場合は`None`
+
+        Raises
+        ------
+        ValueError
+            0以上1以下でない分位点が含まれている
+        """
+
+        values = list(quantiles)
+        return dict(zip(values, self._sketched().quantiles(values)))
+
+    def _sketched(self) -> LatencySketch:
+        """
+        前回参照した時点から追加された応答ログを反映したスケッチを返す
+
+        応答ログが日時順に追加されている間は追加分のみを反映し、そうでない場合は作り直す。
+        """
+
+        if self._sketch is not None and self._sketch_version == self._version:
+            return self._sketch
+        _, responses = self._sorted_columns()
+        if self._sketch is None or not self._in_order:
+            self._sketch = LatencySketch()
+        self._sketch.extend(responses[self._sketch.count + self._sketch.timeouts :])
+        self._sketch_version = self._version
+        return self._sketch
+
+    def get_overload_grid(
+        self, continuous_values: Iterable[int], time_thresholds: Iterable[int]
+    ) -> Dict[Tuple[int, int], List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        `continuous`と`time_threshold`の全ての組み合わせについて、過負荷になった期間をまとめて取得する
+
+        連続したタイムアウトの検出は1度だけ行い、窓の大きさごとに移動平均を1度だけ求める。
+        各行の移動平均を満たす閾値は昇順に並べた閾値の先頭からの連続となるため、
+        その個数の変化から全ての閾値の区間を1度の走査で求める。
+
+        Parameters
+        ----------
+        continuous_values : Iterable[int]
+            過負荷状態と判定するために、何応答用いて平均化処理を行うかの指定の並び
+        time_thresholds : Iterable[int]
+            過負荷状態と判定するための応答時間閾値の並び
+
+        Returns
+        -------
+        Dict[Tuple[int, int], List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]
+            `(continuous, time_threshold)`をキーとした、`get_overload_times`と同じ形式の過負荷状態の期間
+
+        Raises
+        ------
+        ValueError
+            入力値の入力範囲外の値が入力された
+        """
+
+        values = _continuous_values(continuous_values)
+        thresholds = _time_threshold_values(time_thresholds)
+        timestamps, responses = self._sorted_columns()
+        datetimes: Dict[int, DT.datetime] = {}
+
+        def _to_datetime(row: int) -> DT.datetime:
+            datetime = datetimes.get(row)
+            if datetime is None:
+                datetime = datetimes[row] = epoch_to_datetime(timestamps[row])
+            return datetime
+
+        # 保持ポリシーで破棄した末尾の行は、移動平均の窓を埋めるためにのみ用いる
+        carry = self._carry
+        base = 0
+        window = responses
+        if carry is not None and len(carry.responses) != 0:
+            base = len(carry.responses)
+            window = carry.responses + array("i", responses)
+        with Instrumentation.stage("overload"):
+            grid = _overload_grid(window, values, thresholds, base)
+        Instrumentation.count("overload_intervals", sum(len(ranges) for ranges in grid.values()))
+        results = {
+            key: [
+                (_to_datetime(start - base), _to_datetime(end - base) if end is not None else None)
+                for start, end in ranges
+            ]
+            for key, ranges in grid.items()
+        }
+        # 破棄した応答ログから継続している過負荷状態は、引き継いだ判定と同じパラメータの場合のみ繋げる
+        if carry is not None and (carry.continuous, carry.time_threshold) in results:
+            key = (carry.continuous, carry.time_threshold)
+            results[key] = _join_carried_overloads(carry, results[key], timestamps, responses)
+        return results
+
+
+def _timeout_runs(responses: Sequence[int]) -> List[Tuple[int, Optional[int], int]]:
+    """
+    日時順に並んだ応答時間の列から、連続したタイムアウトを`(開始行, 終了行, 長さ)`で求める。
+    連続が最後の行まで続く場合、終了行は`None`となる
+    """
+
+    runs: List[Tuple[int, Optional[int], int]] = []
+    run_start: int = 0
+    run_length: int = 0
+    for i, resp in enumerate(responses):
+        if resp == Server.TIMEOUT_SYMBOL:
+            if run_length == 0:
+                run_start = i
+            run_length += 1
+            continue
+        if run_length != 0:
+            runs.append((run_start, i, run_length))
+        run_length = 0
+    if run_length != 0:
+        runs.append((run_start, None, run_length))
+    return runs
+
+
+def _downtimes_by_threshold(
+    timestamps: Sequence[int], runs: List[Tuple[int, Optional[int], int]], values: List[int]
+) -> Dict[int, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+    """
+    連続したタイムアウトを、昇順に並んだ閾値ごとのダウンタイム情報に振り分ける。
+    各連続は長さ以下の全ての閾値で共有され、日時への変換は1度だけ行う
+    """
+
+    results: Dict[int, List[Tuple[DT.datetime, Optional[DT.datetime]]]] = {value: [] for value in values}
+    for start, end, length in runs:
+        count = bisect.bisect_right(values, length)
+        if count == 0:
+            continue
+        interval = (
+            epoch_to_datetime(timestamps[start]),
+            epoch_to_datetime(timestamps[end]) if end is not None else None,
+        )
+        for value in values[:count]:
+            results[value].append(interval)
+    return results
+
+
+def _continuous_values(continuous_values: Iterable[int]) -> List[int]:
+    """
+    閾値の並びを検査し、重複を除いて昇順に並べる
+
+    Raises
+    ------
+    ValueError
+        0以下の値が含まれている
+    """
+
+    values = sorted(set(continuous_values))
+    if len(values) != 0 and not (values[0] > 0):
+        raise ValueError(f"continuous must over 0 (now {values[0]})")
+    return values
+
+
+def _time_threshold_values(time_thresholds: Iterable[int]) -> List[int]:
+    """
+    応答時間閾値の並びを検査し、重複を除いて昇順に並べる
+
+    Raises
+    ------
+    ValueError
+        0以下の値が含まれている
+    """
+
+    thresholds = sorted(set(time_thresholds))
+    if len(thresholds) != 0 and not (thresholds[0] > 0):
+        raise ValueError(f"time_threshold must over 0 (now {thresholds[0]})")
+    return thresholds
+
+
+def _overload_ranges(
+    responses: Sequence[int], continuous: int, time_threshold: int, start: int = 0
+) -> List[Tuple[int, Optional[int]]]:
+    """
+    日時順に並んだ応答時間の列から、過負荷状態の区間を行番号の`[start, end)`で求める
+
+    `start`を指定した場合、それより前の行は移動平均の窓を埋めるためにのみ用い、判定は`start`行から行う。
+    `start`は`continuous`以下でなければならない。
+
+    各行について直近`continuous`行の有効な応答時間の平均を取り、閾値以上であれば過負荷とする。
+    窓内の有効な応答時間の合計と件数は、窓に入る行と窓から出る行の差分のみで更新するため、
+    計算量は`continuous`によらず行数に比例する。
+
+    タイムアウトの行は、窓内に有効な応答が残っていれば過負荷とする。
+    ただし、有効な応答の後にタイムアウトが`continuous`回以上連続した場合はダウン扱いとし、
+    その連続したタイムアウトはすべて過負荷から除外する。
+    判定が確定するまでの間、タイムアウトの開始行を保留として保持する。
+
+    Returns
+    -------
+    List[Tuple[int, Optional[int]]]
+        過負荷状態の開始行と終了行のペア。最後の行まで過負荷状態だった場合、終了行は`None`となる
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    result: List[Tuple[int, Optional[int]]] = []
+    valid_sum: int = 0
+    valid_count: int = 0
+    open_start: int = -1  # 過負荷状態の開始行。過負荷状態でなければ -1
+    pending_start: int = -1  # 判定を保留しているタイムアウトの開始行。保留していなければ -1
+    for resp in itertools.islice(responses, start):
+        if resp != timeout:
+            valid_sum += resp
+            valid_count += 1
+    for i, resp in enumerate(itertools.islice(responses, start, None), start):
+        if i >= continuous:
+            # 窓から出る行を取り除く
+            old = responses[i - continuous]
+            if old != timeout:
+                valid_sum -= old
+                valid_count -= 1
+
+        if resp != timeout:
+            valid_sum += resp
+            valid_count += 1
+            if pending_start >= 0:
+                # 保留中のタイムアウトはダウンに至らなかったため、過負荷として確定する
+                if open_start < 0:
+                    open_start = pending_start
+                pending_start = -1
+            if (valid_sum / valid_count) >= time_threshold:
+                if open_start < 0:
+                    open_start = i
+            elif open_start >= 0:
+                result.append((open_start, i))
+                open_start = -1
+        elif valid_count != 0:
+            # 窓内に有効な応答が残っている間のタイムアウトは、判定を保留する
+            if pending_start < 0:
+                pending_start = i
+        else:
+            # 窓内が全てタイムアウトとなりダウン扱いとなったため、保留中のタイムアウトも含めて過負荷ではない
+            if open_start >= 0:
+                result.append((open_start, pending_start if pending_start >= 0 else i))
+                open_start = -1
+            pending_start = -1
+
+    if pending_start >= 0 and open_start < 0:
+        open_start = pending_start  # 最後の行まで保留されたタイムアウトは過負荷として扱う
+    if open_start >= 0:
+        result.append((open_start, None))
+    return result
+
+
+def _timeout_bounds(responses: Sequence[int], start: int, stop: int) -> Tuple[int, int]:
+    """
+    `[start, stop)`の行のダウンタイムを求めるために読み込む行の範囲を求める
+
+    境界をまたいで連続したタイムアウトは、開始側は連続の先頭まで遡り、
+    終了側は連続が途切れた行(ダウンタイムの終了行)まで読み進める。
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    while start > 0 and responses[start - 1] == timeout:
+        start -= 1
+    while 0 < stop < len(responses) and responses[stop - 1] == timeout:
+        stop += 1
+    return start, stop
+
+
+def _overload_bounds(
+    responses: Sequence[int], continuous: int, time_threshold: int, start: int, stop: int, prefix: Sequence[int] = ()
+) -> Tuple[int, int]:
+    """
+    `[start, stop)`の行の過負荷状態の区間を求めるために`_overload_ranges`で判定する行の範囲を求める
+
+    `_overload_ranges`の判定は、有効な応答の移動平均が閾値未満となった行と、窓内が全てタイムアウトとなった行で
+    初期状態(過負荷でなく、保留中のタイムアウトも無い状態)に戻る。
+    開始側はそのような行の直後まで遡り、終了側はそのような行まで読み進めるため、
+    範囲内で求めた区間は全ての行を判定した場合と一致する。
+    `prefix`には先頭の行より前の応答時間を与え、先頭付近の行の移動平均の窓を埋めるために用いる。
+
+    窓内の有効な応答時間の合計と件数は1行ずらす度に差分で更新するため、
+    計算量は`continuous`によらず読み足す行数に比例する。
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    if start > 0:
+        i = start - 1
+        valid_sum, valid_count = _overload_window(responses, i, continuous, prefix)
+        while True:
+            resp = responses[i]
+            if resp == timeout:
+                if valid_count == 0:
+                    break
+            elif (valid_sum / valid_count) < time_threshold:
+                break
+            if i == 0:
+                i = -1
+                break
+            # 窓を1行前へずらす
+            if resp != timeout:
+                valid_sum -= resp
+                valid_count -= 1
+            j = i - continuous
+            old = responses[j] if j >= 0 else _row_response(responses, j, prefix)
+            if old != timeout:
+                valid_sum += old
+                valid_count += 1
+            i -= 1
+        start = i + 1
+    if 0 < stop < len(responses):
+        i = stop - 1
+        valid_sum, valid_count = _overload_window(responses, i, continuous, prefix)
+        last = len(responses) - 1
+        while i < last:
+            resp = responses[i]
+            if resp == timeout:
+                if valid_count == 0:
+                    break
+            elif (valid_sum / valid_count) < time_threshold:
+                break
+            # 窓を1行後へずらす
+            i += 1
+            j = i - continuous
+            old = responses[j] if j >= 0 else _row_response(responses, j, prefix)
+            if old != timeout:
+                valid_sum -= old
+                valid_count -= 1
+            resp = responses[i]
+            if resp != timeout:
+                valid_sum += resp
+                valid_count += 1
+        stop = i + 1
+    return start, stop
+
+
+def _row_response(responses: Sequence[int], i: int, prefix: Sequence[int]) -> int:
+    """
+    `i`行目の応答時間を返す。負の行は`prefix`の末尾から数え、`prefix`より前の行はタイムアウトとみなす
+    """
+
+    if i >= 0:
+        return responses[i]
+    if -i <= len(prefix):
+        return prefix[i]
+    return Server.TIMEOUT_SYMBOL
+
+
+def _overload_window(responses: Sequence[int], i: int, continuous: int, prefix: Sequence[int]) -> Tuple[int, int]:
+    """
+    `i`行目を末尾とする`continuous`行の窓の、有効な応答時間の合計と件数を求める
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    valid = [
+        resp
+        for resp in (_row_response(responses, j, prefix) for j in range(i - continuous + 1, i + 1))
+        if resp != timeout
+    ]
+    return sum(valid), len(valid)
+
+
+def _carry_forward(
+    carry: Optional[RetentionCarry],
+    continuous: int,
+    time_threshold: int,
+    timestamps: Sequence[int],
+    responses: Sequence[int],
+) -> RetentionCarry:
+    """
+    破棄する応答ログを`carry`の状態から続けて判定し、その末尾での判定の状態を求める
+
+    過負荷状態の判定は`_overload_ranges`と同じ規則で行い、区間の開始行の代わりに開始日時を保持する。
+    各行は破棄する際に1度だけ判定するため、計算量は破棄する行数に比例する。
+    `carry`と判定のパラメータが異なる場合は、移動平均の窓とタイムアウトの連続のみを引き継ぐ。
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    history: array = array("i")
+    run_start: int = 0
+    run_length: int = 0
+    open_start: Optional[int] = None  # 過負荷状態の開始日時
+    pending_start: Optional[int] = None  # 判定を保留しているタイムアウトの開始日時
+    if carry is not None:
+        history = carry.responses[max(0, len(carry.responses) - (continuous - 1)) :]
+        run_start, run_length = carry.run_start, carry.run_length
+        if (carry.continuous, carry.time_threshold) == (continuous, time_threshold):
+            # 保留中のタイムアウトの開始日時は、その前から継続している過負荷状態の開始日時と同じ区間にまとまる
+            if carry.pending:
+                pending_start = carry.overload_start
+            else:
+                open_start = carry.overload_start
+    if carry is not None and len(history) == len(carry.responses):
+        valid_sum, valid_count = carry.valid_sum, carry.valid_count
+    else:
+        valid_sum = sum(resp for resp in history if resp != timeout)
+        valid_count = sum(1 for resp in history if resp != timeout)
+
+    base = len(history)
+    history.extend(responses)
+    for i, timestamp in enumerate(timestamps):
+        k = base + i
+        if k >= continuous:
+            # 窓から出る行を取り除く
+            old = history[k - continuous]
+            if old != timeout:
+                valid_sum -= old
+                valid_count -= 1
+
+        resp = history[k]
+        if resp != timeout:
+            valid_sum += resp
+            valid_count += 1
+            run_length = 0
+            if pending_start is not None:
+                # 保留中のタイムアウトはダウンに至らなかったため、過負荷として確定する
+                if open_start is None:
+                    open_start = pending_start
+                pending_start = None
+            if (valid_sum / valid_count) >= time_threshold:
+                if open_start is None:
+                    open_start = timestamp
+            else:
+                open_start = None
+            continue
+
+        if run_length == 0:
+            run_start = timestamp
+        run_length += 1
+        if valid_count != 0:
+            # 窓内に有効な応答が残っている間のタイムアウトは、判定を保留する
+            if pending_start is None:
+                pending_start = timestamp
+        else:
+            # 窓内が全てタイムアウトとなりダウン扱いとなったため、保留中のタイムアウトも含めて過負荷ではない
+            open_start = None
+            pending_start = None
+
+    # 次に破棄する行と合わせて窓となる、末尾の`continuous - 1`行を残す
+    if len(history) >= continuous:
+        old = history[len(history) - continuous]
+        if old != timeout:
+            valid_sum -= old
+            valid_count -= 1
+    return RetentionCarry(
+        responses=history[max(0, len(history) - (continuous - 1)) :],
+        valid_sum=valid_sum,
+        valid_count=valid_count,
+        run_start=run_start,
+        run_length=run_length,
+        overload_start=open_start if open_start is not None else pending_start,
+        pending=pending_start is not None,
+        continuous=continuous,
+        time_threshold=time_threshold,
+    )
+
+
+def _join_carried_downtimes(
+    carry: RetentionCarry,
+    continuous: int,
+    downtimes: List[Tuple[DT.datetime, Optional[DT.datetime]]],
+    timestamps: Sequence[int],
+    responses: Sequence[int],
+) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    """
+    保持している応答ログから求めたダウンタイムに、破棄した応答ログから継続しているタイムアウトの連続を繋げる
+
+    `downtimes`は保持している先頭の行から判定したものでなければならない。
+    """
+
+    if carry.run_length == 0 or len(timestamps) == 0:
+        return downtimes
+    start = epoch_to_datetime(carry.run_start)
+    first = epoch_to_datetime(timestamps[0])
+    if responses[0] == Server.TIMEOUT_SYMBOL and len(downtimes) != 0 and downtimes[0][0] == first:
+        # 保持している先頭の連続のみで閾値に達しているため、開始日時のみを置き換える
+        return [(start, downtimes[0][1])] + downtimes[1:]
+
+    length = 0
+    while length < len(responses) and responses[length] == Server.TIMEOUT_SYMBOL:
+        length += 1
+    if carry.run_length + length < continuous:
+        return downtimes
+    end = epoch_to_datetime(timestamps[length]) if length < len(timestamps) else None
+    return [(start, end)] + downtimes
+
+
+def _join_carried_overloads(
+    carry: RetentionCarry,
+    overloads: List[Tuple[DT.datetime, Optional[DT.datetime]]],
+    timestamps: Sequence[int],
+    responses: Sequence[int],
+) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    """
+    保持している応答ログから求めた過負荷状態の期間に、破棄した応答ログから継続している過負荷状態を繋げる
+
+    `overloads`は保持している先頭の行から、`carry`と同じパラメータで判定したものでなければならない。
+    """
+
+    if carry.overload_start is None or len(timestamps) == 0:
+        return overloads
+    start = epoch_to_datetime(carry.overload_start)
+    first = epoch_to_datetime(timestamps[0])
+    if len(overloads) != 0 and overloads[0][0] == first:
+        return [(start, overloads[0][1])] + overloads[1:]
+    if carry.pending and responses[0] == Server.TIMEOUT_SYMBOL:
+        # 保留していたタイムアウトはダウン扱いとなったため、過負荷状態は破棄した応答ログの中で終了している
+        return overloads
+    return [(start, first)] + overloads
+
+
+def _spill(file_path: str, address: str, timestamps: Sequence[int], responses: Sequence[int]) -> None:
+    """
+    破棄した応答ログをログデータと同じ形式でファイルに追記する。ファイルが空の場合は説明文から書き込む
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    with open(file_path, "a") as f:
+        if f.tell() == 0:
+            f.write(_LOG_HEADER)
+        f.writelines(
+            f"{epoch_to_datetime(timestamp):%Y%m%d%H%M%S},{address},{'-' if response == timeout else response}\n"
+            for timestamp, response in zip(timestamps, responses)
+        )
+
+
+def _check_time_range(since: Optional[DT.datetime], until: Optional[DT.datetime]) -> None:
+    """
+    解析する期間を検査する
+
+    Raises
+    ------
+    ValueError
+        `since`が`until`より後に指定された
+    """
+
+    if since is not None and until is not None and not (since <= until):
+        raise ValueError(f"since must not be after until (since: {since}, until: {until})")
+
+
+def _filter_time_range(
+    intervals: Iterable[Tuple[DT.datetime, Optional[DT.datetime]]],
+    since: Optional[DT.datetime],
+    until: Optional[DT.datetime],
+) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    """
+    区間のうち、`since`以降・`until`以前の期間と重なるもののみを取り出す。区間の端点は両端を含む
+    """
+
+    return [
+        (start, end)
+        for start, end in intervals
+        if (until is None or start <= until) and (since is None or end is None or end >= since)
+    ]
+
+
+def _overload_grid(
+    responses: Sequence[int], values: List[int], thresholds: List[int], start: int = 0
+) -> Dict[Tuple[int, int], List[Tuple[int, Optional[int]]]]:
+    """
+    昇順に並んだ窓の大きさと閾値の全ての組み合わせについて、`_overload_ranges`と同じ区間を求める
+
+    `start`を指定した場合、それより前の行は移動平均の窓を埋めるためにのみ用い、判定は`start`行から行う。
+
+    有効な応答の行は、移動平均以下の閾値(昇順に並べた閾値の先頭から`k`個)で過負荷となる。
+    タイムアウトの行は、窓内に有効な応答が残っており、かつ連続したタイムアウトが窓の大きさ未満であれば
+    全ての閾値で過負荷となる。前の行から`k`が増えた閾値では区間が開始し、減った閾値では区間が終了する。
+    """
+
+    timeout = Server.TIMEOUT_SYMBOL
+    run_lengths = array("q", bytes(8 * len(responses)))
+    for run_start, _, length in _timeout_runs(responses):
+        run_lengths[run_start : run_start + length] = array("q", [length]) * length
+
+    total = len(thresholds)
+    results: Dict[Tuple[int, int], List[Tuple[int, Optional[int]]]] = {}
+    for continuous in values:
+        ranges: List[List[Tuple[int, Optional[int]]]] = [[] for _ in thresholds]
+        open_starts: List[int] = [-1] * total
+        valid_sum: int = 0
+        valid_count: int = 0
+        previous: int = 0  # 前の行で過負荷となった閾値の個数
+        for i, resp in enumerate(responses):
+            if i >= continuous:
+                # 窓から出る行を取り除く
+                old = responses[i - continuous]
+                if old != timeout:
+                    valid_sum -= old
+                    valid_count -= 1
+
+            if resp != timeout:
+                valid_sum += resp
+                valid_count += 1
+                current = bisect.bisect_right(thresholds, valid_sum / valid_count)
+            elif valid_count != 0 and run_lengths[i] < continuous:
+                current = total
+            else:
+                current = 0
+            if i < start:
+                continue
+
+            if current > previous:
+                for j in range(previous, current):
+                    open_starts[j] = i
+            elif current < previous:
+                for j in range(current, previous):
+                    ranges[j].append((open_starts[j], i))
+            previous = current
+
+        for j in range(previous):
+            ranges[j].append((open_starts[j], None))
+        for time_threshold, threshold_ranges in zip(thresholds, ranges):
+            results[(continuous, time_threshold)] = threshold_ranges
+    return results
+
+
+def _sort_columns(timestamps: Sequence[int], responses: Sequence[int]) -> Tuple[array, array]:
+    """
+    列を日時の昇順に並べ替え、同一日時のログを後勝ちで1つにまとめる
+    """
+
+    order: List[int] = sorted(range(len(timestamps)), key=timestamps.__getitem__)  # 安定ソート
+    sorted_timestamps: array = array("q")
+    sorted_responses: array = array("i")
+    for i in order:
+        if len(sorted_timestamps) != 0 and sorted_timestamps[-1] == timestamps[i]:
+            sorted_responses[-1] = responses[i]  # 同一日時は後から登録されたものを優先する
+        else:
+            sorted_timestamps.append(timestamps[i])
+            sorted_responses.append(responses[i])
+    return sorted_timestamps, sorted_responses
+
+
+def _is_strictly_increasing(timestamps: Sequence[int], previous: Optional[int] = None) -> bool:
+    """
+    列が狭義単調増加であるかを判定する。`previous`を指定した場合は、その値より大きい値から始まるかも判定する
+    """
+
+    if previous is not None and len(timestamps) != 0 and not (timestamps[0] > previous):
+        return False
+    return all(a < b for a, b in zip(timestamps, itertools.islice(timestamps, 1, None)))
+
+
+class ServerRegistry:
+    """
+    IPアドレスの整数値からサーバーを引く登録簿
+
+    サーバー群全体やネットワーク内のサーバーの索引として用いる。
+    同じIPアドレスのサーバーが複数登録された場合は、先に登録されたサーバーを優先する。
+    """
+
+    __slots__ = ("_servers",)
+
+    def __init__(self, servers: Iterable[Server] = ()) -> None:
+        self._servers: Dict[int, Server] = {}
+        for server in servers:
+            self.add(server)
+
+    def add(self, server: Server) -> None:
+        """
+        サーバーを登録する
+        """
+
+        self._servers.setdefault(server.address, server)
+
+    def get(self, ip_address: Union[int, str, ipaddress.IPv4Address, ipaddress.IPv4Interface]) -> Optional[Server]:
+        """
+        IPアドレスに対応するサーバーを取得する。存在しない場合は`None`
+
+        Parameters
+        ----------
+        ip_address : Union[int, str, ipaddress.IPv4Address, ipaddress.IPv4Interface]
+            探索するサーバーのIPアドレス、もしくはその整数値。ネットワークプレフィックス長は付いていてもよい
+        """
+
+        return self._servers.get(address_to_int(ip_address))
+
+    def __contains__(self, ip_address: object) -> bool:
+        if not isinstance(ip_address, (int, str, ipaddress.IPv4Address)):
+            return False
+        return address_to_int(ip_address) in self._servers
+
+    def __len__(self) -> int:
+        return len(self._servers)
+
+    def __iter__(self) -> Iterator[Server]:
+        return iter(self._servers.values())
+
+
+def address_to_int(ip_address: Union[int, str, ipaddress.IPv4Address, ipaddress.IPv4Interface]) -> int:
+    """
+    IPアドレスを整数値に変換する。ネットワークプレフィックス長が付いている場合は無視する
+    """
+
+    if isinstance(ip_address, int):
+        return ip_address
+    if isinstance(ip_address, str):
+        return parse_interface(ip_address)[0]
+    if isinstance(ip_address, ipaddress.IPv4Interface):
+        return int(ip_address.ip)
+    return int(ip_address)
+
+
+def prefix_to_netmask(prefixlen: int) -> int:
+    """
+    ネットワークプレフィックス長をネットマスクの整数値に変換する
+    """
+
+    return (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+
+
+@functools.lru_cache(maxsize=INTERFACE_CACHE_SIZE)
+def parse_interface(address: str) -> Tuple[int, int, int]:
+    """
+    インターフェース文字列をIPアドレス・ネットワークプレフィックス長・ネットワークアドレスの整数値に変換する
+
+    ログデータに現れるインターフェース文字列の種類は行数に比べて非常に少ないため、
+    パース結果は最近使用したものから`INTERFACE_CACHE_SIZE`件まで保持し、同じ文字列は2度パースしない。
+    "a.b.c.d/n"の形式は`ipaddress`のオブジェクトを生成せずに変換し、
+    それ以外の形式は`ipaddress.IPv4Interface`と同様に解釈する。
+
+    Parameters
+    ----------
+    address : str
+        "IPv4アドレス/ネットワークプレフィックス長"の形式のインターフェース文字列
+
+    Returns
+    -------
+    Tuple[int, int, int]
+        IPアドレスの整数値、ネットワークプレフィックス長、ネットワークアドレスの整数値
+
+    Raises
+    ------
+    ValueError
+        IPv4のインターフェースとして解釈できない文字列が入力された
+    """
+
+    ip_str, _, prefix_str = address.partition("/")
+    octets = ip_str.split(".")
+    if (
+        len(octets) == 4
+        and all(_is_decimal(octet, 3) and int(octet) <= 255 for octet in octets)
+        and _is_decimal(prefix_str, 2)
+        and int(prefix_str) <= 32
+    ):
+        ip_int = (int(octets[0]) << 24) | (int(octets[1]) << 16) | (int(octets[2]) << 8) | int(octets[3])
+        prefixlen = int(prefix_str)
+        return ip_int, prefixlen, ip_int & prefix_to_netmask(prefixlen)
+
+    # 高速に処理できない入力は、エラーメッセージも含めて`ipaddress`に任せる
+    interface = ipaddress.IPv4Interface(address)
+    return int(interface.ip), interface.network.prefixlen, int(interface.network.network_address)
+
+
+def _is_decimal(text: str, max_digits: int) -> bool:
+    """
+    先頭が0でない(0自身は除く)、`max_digits`桁以下の10進数の文字列であるかを判定する
+    """
+
+    return 0 < len(text) <= max_digits and text.isdigit() and text.isascii() and (text[0] != "0" or len(text) == 1)
+
+
+class PingResultsView(Mapping[DT.datetime, int]):
+    """
+    `Server`の列指向な応答ログを`Dict[datetime.datetime, int]`として参照する読み取り専用ビュー
+
+    旧来の`Server.ping_results`との後方互換のために提供する。
+    要素へのアクセスの度に`datetime`オブジェクトを生成するため、大量のログを走査する用途には向かない。
+    """
+
+    def __init__(self, server: Server) -> None:
+        self._server = server
+
+    def __getitem__(self, key: DT.datetime) -> int:
+        timestamps, responses = self._server._sorted_columns()
+        try:
+            timestamp = datetime_to_epoch(key)
+        except TypeError:
+            raise KeyError(key) from None
+        i = bisect.bisect_left(timestamps, timestamp)
+        if i < len(timestamps) and timestamps[i] == timestamp:
+            return responses[i]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[DT.datetime]:
+        timestamps, _ = self._server._sorted_columns()
+        return (epoch_to_datetime(timestamp) for timestamp in timestamps)
+
+    def __len__(self) -> int:
+        timestamps, _ = self._server._sorted_columns()
+        return len(timestamps)
 
-        Returns
-        -------
-        List[Tuple[datetime.datetime, datetime.datetime]]
-            サーバー上に存在する過負荷状態の開始時間と終了時間のペアをリストで返す。
-            最後の記録まで過負荷状態だった場合、終了時間は`None`となる。
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
 
-        Raises
-        ------
-        ValueError
-            入力値の入力範囲外の値が入力された
-        """
 
-        if not (continuous > 0):
-            raise ValueError(f"continuous must over 0 (now {continuous})")
-        if not (time_threshold > 0):
-            raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+def datetime_to_epoch(datetime: DT.datetime) -> int:
+    """
+    `datetime`オブジェクトをエポック秒に変換する
 
-        sorted_ping_results: List[Tuple[DT.datetime, int]] = sorted(self.ping_results.items())
-        sorted_response: List[int] = [resp for _, resp in sorted_ping_results]
-
-        # 過負荷状態の行番号を得る
-        overload_list_pre: List[int] = []
-        non_overload_list_pre: List[int] = []
-        _is_timeout_now: bool = True
-        for i in range(len(sorted_response)):
-            _tmp = sorted_response[(i - continuous + 1 if i >= continuous else 0) : (i + 1)]
-            _frame_timeout: bool = _tmp[-1] == Server.TIMEOUT_SYMBOL
-            while Server.TIMEOUT_SYMBOL in _tmp:
-                _tmp.remove(Server.TIMEOUT_SYMBOL)
-            if len(_tmp) != 0:
-                if (sum(_tmp) / len(_tmp)) >= time_threshold or _frame_timeout:
-                    overload_list_pre.append(i)
-                else:
-                    non_overload_list_pre.append(i)
-                _is_timeout_now = False
-            else:
-                if not _is_timeout_now:  # タイムアウトを検出したため、一部データのロールバックを行う
-                    non_overload_list_pre.extend(overload_list_pre[-min(continuous, i) + 1 :])
-                    del overload_list_pre[-min(continuous, i) + 1 :]
-                    _is_timeout_now = True
-                non_overload_list_pre.append(i)
-
-        # 連続した番号をまとめる
-        overload_list: List[List[int]] = [
-            list(g)
-            for _, g in itertools.groupby(
-                overload_list_pre, key=(lambda n, c=itertools.count(): n - next(c))  # type: ignore
-            )
-        ]
-        non_overload_list: List[int] = [
-            list(g)[0]
-            for _, g in itertools.groupby(
-                non_overload_list_pre, key=(lambda n, c=itertools.count(): n - next(c))  # type: ignore
-            )
-        ]
+    タイムゾーンは考慮せず、ログに記録された日時をそのまま1970-01-01 00:00:00からの経過秒数とみなす。
+    """
 
-        result: List[Tuple[DT.datetime, Optional[DT.datetime]]] = []
-        for recodes in overload_list:
-            target: int = recodes[0]
-            while True:
-                if len(non_overload_list) != 0 and non_overload_list[0] < target:
-                    non_overload_list.pop(0)
-                else:
-                    break
-            if len(non_overload_list) != 0:
-                result.append((sorted_ping_results[target][0], sorted_ping_results[non_overload_list.pop(0)][0]))
-            else:
-                result.append((sorted_ping_results[target][0], None))
-        return result
+    return (datetime - _EPOCH) // _ONE_SECOND
+
+
+def epoch_to_datetime(timestamp: int) -> DT.datetime:
+    """
+    エポック秒を`datetime`オブジェクトに変換する。`datetime_to_epoch`の逆変換。
+    """
+
+    return _EPOCH + DT.timedelta(seconds=timestamp)
 
 
 def csv_to_params(csv_text: str) -> Tuple[str, str, int]:
@@ -237,10 +1777,234 @@ def parse_datetime(datetime_str: str) -> DT.datetime:
     return datetime
 
 
-def load_data(file_path: str, servers: Dict[str, Server] = {}) -> Dict[str, Server]:
+def parse_epoch(datetime_str: str) -> int:
+    """
+    日時情報を`datetime`オブジェクトを経由せずにエポック秒へ変換する
+
+    "YYYYMMDDhhmmss"の固定長形式であれば、日付部分のエポック秒をキャッシュから引き、
+    時分秒は文字列のスライスから直接計算する。
+    固定長形式に当てはまらない入力は`parse_datetime`と同じ規則で解釈する。
+
+    Parameters
+    ----------
+    datetime_str : str
+        "YYYYMMDDhhmmss"の文字列
+
+    Returns
+    -------
+    int
+        1970-01-01 00:00:00 からの経過秒数
+
+    Raises
+    ------
+    ValueError
+        `datetime_str` が有効な日時ではない
+    """
+
+    if len(datetime_str) == 14 and datetime_str.isdigit() and datetime_str.isascii():
+        day_epoch: Optional[int] = _DAY_EPOCH_CACHE.get(datetime_str[:8])
+        if day_epoch is None:
+            day_epoch = _cache_day_epoch(datetime_str[:8])
+        hour, minute, second = int(datetime_str[8:10]), int(datetime_str[10:12]), int(datetime_str[12:14])
+        if day_epoch is not None and hour < 24 and minute < 60 and second < 60:
+            return day_epoch + hour * 3600 + minute * 60 + second
+    # 高速に処理できない入力は、エラーメッセージも含めて`parse_datetime`に任せる
+    return datetime_to_epoch(parse_datetime(datetime_str=datetime_str))
+
+
+def _cache_day_epoch(day_str: str) -> Optional[int]:
+    """
+    "YYYYMMDD"の日付のエポック秒を計算してキャッシュに登録する。有効な日付でなければ`None`を返す。
+    """
+
+    try:
+        day = DT.date(int(day_str[:4]), int(day_str[4:6]), int(day_str[6:8]))
+    except ValueError:
+        return None
+    if len(_DAY_EPOCH_CACHE) >= _DAY_EPOCH_CACHE_SIZE:
+        _DAY_EPOCH_CACHE.clear()
+    day_epoch: int = (day - _EPOCH.date()).days * 86400
+    _DAY_EPOCH_CACHE[day_str] = day_epoch
+    return day_epoch
+
+
+def csv_block_to_params(lines: Iterable[str]) -> List[Tuple[int, str, int]]:
+    """
+    CSVの複数行をまとめてパラメータに分解する
+
+    `csv_to_params`と`parse_epoch`を1行ずつ呼び出す場合と同じ結果を返すが、
+    日時の`datetime`オブジェクトを生成せずにエポック秒へ変換する。空行は読み飛ばす。
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        CSVの行の並び。行末の改行は含まれていてもよい
+
+    Returns
+    -------
+    List[Tuple[int, str, int]]
+        日時のエポック秒、サーバーのIPアドレスとネットワークプレフィックス長のペア、応答時間(ミリ秒)の組の並び
+
+    Raises
+    ------
+    ValueError
+        正しくない入力がされた
+    """
+
+    rows: List[Tuple[int, str, int]] = []
+    append = rows.append
+    skipped = 0
+    with Instrumentation.stage("parse"):
+        for line in lines:
+            line_strip = line.strip()
+            if len(line_strip) == 0:  # 入力が空の場合は処理をスキップ
+                skipped += 1
+                continue
+            params = line_strip.split(",")
+            if len(params) != 3:
+                Instrumentation.count("rows_rejected")
+                raise ValueError(f"'{line_strip}' is invalid format")
+            datetime_str, server_address, response_str = params
+            response_msec: int = int(response_str) if response_str.isdigit() else Server.TIMEOUT_SYMBOL
+            try:
+                timestamp = parse_epoch(datetime_str)
+            except ValueError:
+                Instrumentation.count("rows_rejected")
+                raise
+            append((timestamp, server_address, response_msec))
+    Instrumentation.count("rows_parsed", len(rows))
+    Instrumentation.count("rows_skipped", skipped)
+    return rows
+
+
+def iter_csv_blocks(file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[List[Tuple[int, str, int]]]:
+    """
+    ログデータを固定サイズのチャンク単位で読み込み、パース済みの行をチャンクごとに返す
+
+    ファイル全体や全行のリストをメモリ上に展開しないため、
+    ピークメモリはファイルサイズによらずチャンクサイズ程度に抑えられる。
+
+    Parameters
+    ----------
+    file_path : str
+        ログデータのファイルパス
+    chunk_size : int, default = READ_CHUNK_SIZE
+        1度に読み込む文字数
+
+    Yields
+    ------
+    List[Tuple[int, str, int]]
+        チャンク内に含まれる行を`csv_block_to_params`でパースした結果
+
+    Raises
+    ------
+    ValueError
+        `chunk_size` が 0以下に指定された、もしくは正しくない行が含まれていた
+    """
+
+    if not (chunk_size > 0):
+        raise ValueError(f"chunk_size must over 0 (now {chunk_size})")
+
+    with open(file_path) as f:
+        _ = f.readline()  # ファイルの先頭は説明文なので読み飛ばす
+        remainder = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if len(chunk) == 0:
+                break
+            lines = (remainder + chunk).split("\n")
+            remainder = lines.pop()  # 末尾の行はチャンクの境界で途切れている可能性があるため持ち越す
+            yield csv_block_to_params(lines)
+        if len(remainder) != 0:
+            yield csv_block_to_params([remainder])
+
+
+def iter_rows(file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[int, str, int]]:
+    """
+    ログデータをストリーミングで読み込み、パース済みの行を1行ずつ返す
+
+    Parameters
+    ----------
+    file_path : str
+        ログデータのファイルパス
+    chunk_size : int, default = READ_CHUNK_SIZE
+        1度に読み込む文字数
+
+    Yields
+    ------
+    Tuple[int, str, int]
+        日時のエポック秒、サーバーのIPアドレスとネットワークプレフィックス長のペア、応答時間(ミリ秒)
+    """
+
+    for rows in iter_csv_blocks(file_path=file_path, chunk_size=chunk_size):
+        yield from rows
+
+
+def _group_rows(rows: Iterable[Tuple[int, str, int]], columns: Dict[str, Tuple[array, array]]) -> None:
+    """
+    パース済みの行を、インターフェース文字列ごとの列データに追加する
+    """
+
+    for timestamp, server_address, response_msec in rows:
+        column = columns.get(server_address)
+        if column is None:
+            column = columns[server_address] = (array("q"), array("i"))
+        column[0].append(timestamp)
+        column[1].append(response_msec)
+
+
+def load_columns(
+    file_path: str, chunk_size: int = READ_CHUNK_SIZE, cache: bool = False
+) -> Mapping[str, Tuple[Sequence[int], Sequence[int]]]:
+    """
+    ログデータを読み込み、インターフェース文字列ごとの列データにまとめる
+
+    Parameters
+    ----------
+    file_path : str
+        ログデータのファイルパス
+    chunk_size : int, default = READ_CHUNK_SIZE
+        1度に読み込む文字数
+    cache : bool, default = False
+        `True`の場合、ログデータと同じディレクトリのバイナリキャッシュ(`Cache`参照)を用いる。
+        有効なキャッシュがあれば`mmap`で開いてパースを省略し、無ければパース結果をキャッシュに書き込む。
+        キャッシュを書き込めなかった場合(書き込み権限が無い、容量不足など)は、パース結果をそのまま返す
+
+    Returns
+    -------
+    Mapping[str, Tuple[Sequence[int], Sequence[int]]]
+        インターフェース文字列をキーとした、エポック秒の列と応答時間の列のペア
+    """
+
+    if cache:
+        cached_columns = Cache.read_cache(file_path)
+        if cached_columns is not None:
+            return cached_columns
+
+    columns: Dict[str, Tuple[array, array]] = {}
+    for rows in iter_csv_blocks(file_path=file_path, chunk_size=chunk_size):
+        _group_rows(rows, columns)
+
+    if cache:
+        try:
+            Cache.write_cache(file_path, columns)
+        except OSError:
+            return columns
+        # 書き込んだキャッシュを開き直し、パース結果の配列を解放する
+        cached_columns = Cache.read_cache(file_path)
+        if cached_columns is not None:
+            return cached_columns
+    return columns
+
+
+def load_data(
+    file_path: str, servers: Dict[str, Server] = {}, chunk_size: int = READ_CHUNK_SIZE, cache: bool = False
+) -> Dict[str, Server]:
     """
     ログデータからサーバーデータを生成する
 
+    ログデータはチャンク単位で読み込み、パースした行から順にサーバーデータへ登録する。
+
     Parameters
     ----------
     file_path : str
@@ -248,6 +2012,11 @@ def load_data(file_path: str, servers: Dict[str, Server] = {}) -> Dict[str, Serv
     servers : Dict[str, Server], optional
         既存のサーバーデータがある場合のみ指定。
         追記形式でデータを読み込む
+    chunk_size : int, default = READ_CHUNK_SIZE
+        1度に読み込む文字数
+    cache : bool, default = False
+        `True`の場合、ログデータと同じディレクトリのバイナリキャッシュ(`Cache`参照)を用いる。
+        キャッシュから読み込んだ応答ログは`mmap`した領域をコピーせずに参照する
 
     Returns
     -------
@@ -256,21 +2025,352 @@ def load_data(file_path: str, servers: Dict[str, Server] = {}) -> Dict[str, Serv
     """
 
     _servers = copy.copy(servers)  # copyを行い、既存のserversを参照しないようにする
-    with open(file_path) as f:
+    with Instrumentation.stage("load"):
+        if cache:
+            columns = load_columns(file_path=file_path, cache=True)
+            with Instrumentation.stage("register"):
+                for server_address, (timestamps, responses) in columns.items():
+                    ip_address = _server_key(server_address)
+                    if ip_address not in _servers.keys():
+                        _servers[ip_address] = Server.from_columns(server_address, timestamps, responses)
+                    else:
+                        _servers[ip_address].extend_ping_epochs(timestamps, responses)
+            return _servers
+
+        # インターフェース文字列ごとに登録先のサーバーを覚え、行ごとにIPアドレスを取り出さないようにする
+        servers_by_address: Dict[str, Server] = {}
+        for rows in iter_csv_blocks(file_path=file_path, chunk_size=chunk_size):
+            with Instrumentation.stage("register"):
+                for timestamp, server_address, response_msec in rows:
+                    server = servers_by_address.get(server_address)
+                    if server is None:
+                        ip_address = _server_key(server_address)
+                        if ip_address not in _servers.keys():
+                            _servers[ip_address] = Server(ip_address=server_address)
+                        server = servers_by_address[server_address] = _servers[ip_address]
+                    server.append_ping_epoch(timestamp, response_msec)
+    return _servers
+
+
+def _server_key(server_address: str) -> str:
+    """
+    インターフェース文字列から、サーバーデータのキーとなるIPアドレスの文字列を取り出す
+    """
+
+    return server_address.partition("/")[0]
+
+
+def split_byte_ranges(file_path: str, chunk_bytes: int = PARALLEL_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    ログデータの先頭行を除いた部分を、行の境界に揃えたバイト範囲に分割する
+
+    Parameters
+    ----------
+    file_path : str
+        ログデータのファイルパス
+    chunk_bytes : int, default = PARALLEL_CHUNK_BYTES
+        1範囲あたりのおおよそのバイト数。範囲の終端は次の行頭まで延長される
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        ファイル先頭からのバイト位置で表した`[start, end)`の範囲の並び
+
+    Raises
+    ------
+    ValueError
+        `chunk_bytes` が 0以下に指定された
+    """
+
+    if not (chunk_bytes > 0):
+        raise ValueError(f"chunk_bytes must over 0 (now {chunk_bytes})")
+
+    ranges: List[Tuple[int, int]] = []
+    with open(file_path, "rb") as f:
         _ = f.readline()  # ファイルの先頭は説明文なので読み飛ばす
-        for line in f.readlines():
-            line_strip = line.strip()
-            if len(line_strip) == 0:  # 入力が空の場合は処理をスキップ
-                continue
-            datetime, server_address, result_msec = csv_to_params(line_strip)
-            ip_address, _ = server_address.split("/")
-            if ip_address not in _servers.keys():
-                _servers[ip_address] = Server(ip_address=server_address)
-            _servers[ip_address].append_ping_results(datetime, result_msec)
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            end = start + chunk_bytes
+            if end < size:
+                f.seek(end)
+                _ = f.readline()  # 行の途中で分割しないように、範囲の終端を次の行頭まで延長する
+                end = f.tell()
+            else:
+                end = size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _load_byte_range(file_path: str, start: int, end: int) -> Dict[str, Tuple[array, array]]:
+    """
+    ログデータの`[start, end)`の範囲を読み込み、インターフェース文字列ごとの列データにまとめる。
+    `load_columns_parallel`のワーカープロセスで実行される。
+    """
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode()
+
+    columns: Dict[str, Tuple[array, array]] = {}
+    _group_rows(csv_block_to_params(text.split("\n")), columns)
+    return columns
+
+
+def load_columns_parallel(
+    file_paths: List[str], max_workers: Optional[int] = None, chunk_bytes: int = PARALLEL_CHUNK_BYTES
+) -> Dict[str, Tuple[array, array]]:
+    """
+    複数のログデータを複数プロセスで並列に読み込み、インターフェース文字列ごとの列データにまとめる
+
+    各ファイルは行の境界に揃えたバイト範囲に分割され、範囲ごとに`ProcessPoolExecutor`上でパースされる。
+    パース結果はファイル・範囲の順に結合するため、逐次読み込みと同じ順序で応答ログが並ぶ。
+
+    Parameters
+    ----------
+    file_paths : List[str]
+        ログデータのファイルパスの並び
+    max_workers : Optional[int], default = None
+        ワーカープロセス数。`None`の場合はCPUコア数
+    chunk_bytes : int, default = PARALLEL_CHUNK_BYTES
+        1タスクあたりのおおよそのバイト数
+
+    Returns
+    -------
+    Dict[str, Tuple[array.array, array.array]]
+        インターフェース文字列をキーとした、エポック秒の列と応答時間の列のペア
+
+    Raises
+    ------
+    ValueError
+        `chunk_bytes` が 0以下に指定された、もしくは正しくない行が含まれていた
+    """
+
+    tasks: List[Tuple[str, int, int]] = [
+        (file_path, start, end) for file_path in file_paths for start, end in split_byte_ranges(file_path, chunk_bytes)
+    ]
+    merged: Dict[str, Tuple[array, array]] = {}
+    if len(tasks) == 0:
+        return merged
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # mapは投入順に結果を返すため、ファイル・範囲の順序が保たれる
+        for columns in executor.map(_load_byte_range, *zip(*tasks)):
+            for server_address, (timestamps, responses) in columns.items():
+                column = merged.get(server_address)
+                if column is None:
+                    merged[server_address] = (timestamps, responses)
+                else:
+                    column[0].extend(timestamps)
+                    column[1].extend(responses)
+    return merged
+
+
+def load_data_parallel(
+    file_paths: List[str],
+    servers: Dict[str, Server] = {},
+    max_workers: Optional[int] = None,
+    chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+) -> Dict[str, Server]:
+    """
+    複数のログデータを複数プロセスで並列に読み込み、サーバーデータを生成する
+
+    `file_paths`の順に`load_data`で追記読み込みした場合と同じ結果となる。
+
+    Parameters
+    ----------
+    file_paths : List[str]
+        ログデータのファイルパスの並び
+    servers : Dict[str, Server], optional
+        既存のサーバーデータがある場合のみ指定。
+        追記形式でデータを読み込む
+    max_workers : Optional[int], default = None
+        ワーカープロセス数。`None`の場合はCPUコア数
+    chunk_bytes : int, default = PARALLEL_CHUNK_BYTES
+        1タスクあたりのおおよそのバイト数
+
+    Returns
+    -------
+    Dict[str, Server]
+        IPアドレスに紐づいたサーバーデータ
+    """
+
+    _servers = copy.copy(servers)  # copyを行い、既存のserversを参照しないようにする
+    with Instrumentation.stage("load"):
+        columns = load_columns_parallel(file_paths=file_paths, max_workers=max_workers, chunk_bytes=chunk_bytes)
+        with Instrumentation.stage("register"):
+            for server_address, (timestamps, responses) in columns.items():
+                ip_address = _server_key(server_address)
+                if ip_address not in _servers.keys():
+                    _servers[ip_address] = Server(ip_address=server_address)
+                _servers[ip_address].extend_ping_epochs(timestamps, responses)
     return _servers
 
 
-def print_server_downtime(servers: Dict[str, Server], continuous: int = 1):
+def get_downtimes_multi(
+    servers: Mapping[str, Server], continuous_values: Iterable[int]
+) -> Dict[int, Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]]:
+    """
+    サーバー群について、複数の閾値でのダウンタイム情報をまとめて取得する
+
+    各サーバーの連続したタイムアウトの検出は1度だけ行うため、閾値の数によらずおおよそ1回分の計算量となる。
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous_values : Iterable[int]
+        サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値の並び
+
+    Returns
+    -------
+    Dict[int, Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]]
+        閾値をキーとし、`servers`と同じキーに紐づいた`Server.get_downtimes`と同じ形式のダウンタイム情報
+
+    Raises
+    ------
+    ValueError
+        `continuous_values` に 0以下の値が含まれている
+    """
+
+    values = _continuous_values(continuous_values)
+    results: Dict[int, Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]] = {value: {} for value in values}
+    for key, server in servers.items():
+        for value, downtimes in server.get_downtimes_multi(values).items():
+            results[value][key] = downtimes
+    return results
+
+
+def get_overload_grid(
+    servers: Mapping[str, Server], continuous_values: Iterable[int], time_thresholds: Iterable[int]
+) -> Dict[Tuple[int, int], Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]]:
+    """
+    サーバー群について、`continuous`と`time_threshold`の全ての組み合わせでの過負荷になった期間をまとめて取得する
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous_values : Iterable[int]
+        過負荷状態と判定するために、何応答用いて平均化処理を行うかの指定の並び
+    time_thresholds : Iterable[int]
+        過負荷状態と判定するための応答時間閾値の並び
+
+    Returns
+    -------
+    Dict[Tuple[int, int], Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]]
+        `(continuous, time_threshold)`をキーとし、`servers`と同じキーに紐づいた
+        `Server.get_overload_times`と同じ形式の過負荷状態の期間
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    values = _continuous_values(continuous_values)
+    thresholds = _time_threshold_values(time_thresholds)
+    results: Dict[Tuple[int, int], Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]] = {
+        (continuous, time_threshold): {} for continuous in values for time_threshold in thresholds
+    }
+    for key, server in servers.items():
+        for pair, overload_times in server.get_overload_grid(values, thresholds).items():
+            results[pair][key] = overload_times
+    return results
+
+
+def analyze(
+    servers: Mapping[str, Server],
+    continuous: int = 3,
+    time_threshold: int = 100,
+    with_downtime: bool = True,
+    with_overload: bool = True,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+) -> Dict[str, ServerReport]:
+    """
+    サーバー群のダウン情報と過負荷情報をまとめて解析する
+
+    各サーバーの解析結果は`Server.analyze`によってキャッシュされるため、
+    応答ログが変化していないサーバーは再計算されない。
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        解析を行うサーバーリスト
+    continuous : int, default = 3
+        ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+    with_downtime : bool, default = True
+        ダウンしている区間を解析するかどうかを指定する
+    with_overload : bool, default = True
+        過負荷状態の区間を解析するかどうかを指定する
+    since : Optional[datetime.datetime], default = None
+        解析する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        解析する期間の終了日時。`None`の場合は最後の記録まで
+
+    Returns
+    -------
+    Dict[str, ServerReport]
+        `servers`と同じキーに紐づいた解析結果
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    return {
+        key: server.analyze(
+            continuous=continuous,
+            time_threshold=time_threshold,
+            with_downtime=with_downtime,
+            with_overload=with_overload,
+            since=since,
+            until=until,
+        )
+        for key, server in servers.items()
+    }
+
+
+def get_latency_summaries(
+    servers: Mapping[str, Server], since: Optional[DT.datetime] = None, until: Optional[DT.datetime] = None
+) -> Dict[str, LatencySummary]:
+    """
+    サーバー群の期間内の応答ログの集計を取得する(`Server.get_latency_summary`参照)
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        集計を行うサーバーリスト
+    since : Optional[datetime.datetime], default = None
+        集計する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        集計する期間の終了日時(この日時を含む)。`None`の場合は最後の記録まで
+
+    Returns
+    -------
+    Dict[str, LatencySummary]
+        `servers`と同じキーに紐づいた集計
+
+    Raises
+    ------
+    ValueError
+        `since`が`until`より後に指定された
+    """
+
+    return {key: server.get_latency_summary(since=since, until=until) for key, server in servers.items()}
+
+
+def print_server_downtime(
+    servers: Dict[str, Server],
+    continuous: int = 1,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+):
     """
     サーバー群のダウン情報を表示する
 
@@ -282,12 +2382,10 @@ def print_server_downtime(servers: Dict[str, Server], continuous: int = 1):
         サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値。
         デフォルトでは1回
         0以下を指定した場合、ValueErrorとなる
-
-    Returns
-    -------
-    List[Tuple[datetime.datetime, datetime.datetime]]
-        サーバー上に存在するダウンタイムの開始時間と終了時間のペアを返す。
-        記録された最後の記録がダウン状態だった場合、終了時間は`None`となる。
+    since : Optional[datetime.datetime], default = None
+        表示する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        表示する期間の終了日時。`None`の場合は最後の記録まで
 
     Raises
     ------
@@ -295,17 +2393,22 @@ def print_server_downtime(servers: Dict[str, Server], continuous: int = 1):
         `threshold` が 0以下に指定された
     """
 
-    for server in servers.values():
-        downtime_list = server.get_downtimes(continuous=continuous)
-        if len(downtime_list) != 0:
-            print(f"{server.ip_address.ip} has downtime")
-            for start, end in downtime_list:
-                print(f"    {start} ~ {end if end is not None else ''}")
+    for report in analyze(servers, continuous=continuous, with_overload=False, since=since, until=until).values():
+        if len(report.downtimes) != 0:
+            print(f"{report.address.ip} has downtime")
+            for incident in report.downtimes:
+                print(f"    {incident.start} ~ {incident.end if incident.end is not None else ''}")
         else:
-            print(f"{server.ip_address.ip} has no downtime")
+            print(f"{report.address.ip} has no downtime")
 
 
-def print_server_overload(servers: Dict[str, Server], continuous: int = 3, time_threshold: int = 100):
+def print_server_overload(
+    servers: Dict[str, Server],
+    continuous: int = 3,
+    time_threshold: int = 100,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+):
     """
     サーバー群の過負荷情報を表示する
 
@@ -318,6 +2421,10 @@ def print_server_overload(servers: Dict[str, Server], continuous: int = 3, time_
         前方に対して平均を取り、サイバーの開始直後はすでにあるデータのみを用いて平均を取る。
     time_threshold : int, default = 100
         過負荷状態と判定するための応答時間閾値。
+    since : Optional[datetime.datetime], default = None
+        表示する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        表示する期間の終了日時。`None`の場合は最後の記録まで
 
     Raises
     ------
@@ -325,17 +2432,25 @@ def print_server_overload(servers: Dict[str, Server], continuous: int = 3, time_
         `continuous`か`time_threshold` が0以下に指定された。
     """
 
-    for server in servers.values():
-        overload_list = server.get_overload_times(continuous=continuous, time_threshold=time_threshold)
-        if len(overload_list) != 0:
-            print(f"{server.ip_address.ip} has overload")
-            for start, end in overload_list:
-                print(f"    {start} ~ {end if end is not None else ''}")
+    reports = analyze(
+        servers, continuous=continuous, time_threshold=time_threshold, with_downtime=False, since=since, until=until
+    )
+    for report in reports.values():
+        if len(report.overloads) != 0:
+            print(f"{report.address.ip} has overload")
+            for incident in report.overloads:
+                print(f"    {incident.start} ~ {incident.end if incident.end is not None else ''}")
         else:
-            print(f"{server.ip_address.ip} has no overload")
+            print(f"{report.address.ip} has no overload")
 
 
-def print_server_error(servers: Dict[str, Server], continuous: int = 3, time_threshold: int = 100):
+def print_server_error(
+    servers: Dict[str, Server],
+    continuous: int = 3,
+    time_threshold: int = 100,
+    since: Optional[DT.datetime] = None,
+    until: Optional[DT.datetime] = None,
+):
     """
     サーバー群のダウン情報と過負荷情報を表示する
 
@@ -347,6 +2462,10 @@ def print_server_error(servers: Dict[str, Server], continuous: int = 3, time_thr
         ダウン/過負荷状態と判定するために、何応答分まとめて処理を行うかの指定。
     time_threshold : int, default = 100
         過負荷状態と判定するための応答時間閾値。
+    since : Optional[datetime.datetime], default = None
+        表示する期間の開始日時。`None`の場合は最初の記録から
+    until : Optional[datetime.datetime], default = None
+        表示する期間の終了日時。`None`の場合は最後の記録まで
 
     Raises
     ------
@@ -354,24 +2473,16 @@ def print_server_error(servers: Dict[str, Server], continuous: int = 3, time_thr
         `continuous`か`time_threshold` が0以下に指定された。
     """
 
-    def _add_label(
-        time_pair: Tuple[DT.datetime, Optional[DT.datetime]], label: str
-    ) -> Tuple[DT.datetime, Optional[DT.datetime], str]:
-        return (time_pair[0], time_pair[1], label)
-
-    for server in servers.values():
-        downtime_list_pre = server.get_downtimes(continuous=continuous)
-        downtime_list = [_add_label(data, "server down") for data in downtime_list_pre]
-        overload_list_pre = server.get_overload_times(continuous=continuous, time_threshold=time_threshold)
-        overload_list = [_add_label(data, "server overload") for data in overload_list_pre]
-        errors_list = sorted(downtime_list + overload_list)
-
-        if len(errors_list) != 0:
-            print(f"{server.ip_address.ip} has error")
-            for start, end, label in errors_list:
-                print(f"    {label} {start} ~ {end if end is not None else ''}")
+    for report in analyze(
+        servers, continuous=continuous, time_threshold=time_threshold, since=since, until=until
+    ).values():
+        incidents = report.incidents
+        if len(incidents) != 0:
+            print(f"{report.address.ip} has error")
+            for incident in incidents:
+                print(f"    {incident.label} {incident.start} ~ {incident.end if incident.end is not None else ''}")
         else:
-            print(f"{server.ip_address.ip} has no error")
+            print(f"{report.address.ip} has no error")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,247 @@
+"""
+応答時間の分位点を一定のメモリで近似するスケッチ
+
+応答時間を対数幅の区間に振り分けて件数のみを数える(DDSketch と同様の方式)。
+区間`i`は`(gamma ** (i - 1), gamma ** i]`の応答時間を受け持ち、`gamma = (1 + a) / (1 - a)`とすると、
+求めた分位点の相対誤差は`a`(`relative_accuracy`)以下となる。
+区間の数は応答時間の桁数に比例するのみで、応答ログの件数によらない。
+
+同じ`relative_accuracy`のスケッチ同士は区間ごとの件数を足し合わせるだけで併合でき、
+併合したスケッチは全ての応答ログから作成したものと一致する。
+そのため、サーバーごとのスケッチからネットワーク単位やサーバー群全体の分位点を求めたり、
+並列に読み込んだ結果をまとめたりする処理は、応答ログの件数によらず区間の数に比例する時間で済む。
+"""
+
+import collections
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+# 分位点の相対誤差の既定値
+RELATIVE_ACCURACY: float = 0.01
+# 分位点の既定値
+DEFAULT_QUANTILES: Sequence[float] = (0.5, 0.95, 0.99)
+
+# `Server.TIMEOUT_SYMBOL`と同じ値
+_TIMEOUT: int = -1
+
+
+class LatencySketch:
+    """
+    応答時間の分位点を相対誤差`relative_accuracy`以下で求めるための、併合可能なスケッチ
+
+    タイムアウトは分位点の計算には含めず、件数のみを数える。
+
+    Parameters
+    ----------
+    relative_accuracy : float, default = RELATIVE_ACCURACY
+        分位点の相対誤差の上限。0より大きく1未満
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    __slots__ = ("relative_accuracy", "_gamma", "_log_gamma", "_bins", "_zeros", "count", "timeouts", "_min", "_max")
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY) -> None:
+        if not (0 < relative_accuracy < 1):
+            raise ValueError(f"relative_accuracy must be between 0 and 1 (now {relative_accuracy})")
+        self.relative_accuracy = relative_accuracy
+        self._gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma: float = math.log(self._gamma)
+        # 区間の番号 -> 件数。0ミリ秒の応答は区間に含めず`_zeros`で数える
+        self._bins: Dict[int, int] = {}
+        self._zeros: int = 0
+        # 有効な応答の件数と、タイムアウトの件数
+        self.count: int = 0
+        self.timeouts: int = 0
+        self._min: int = 0
+        self._max: int = 0
+
+    @property
+    def min_msec(self) -> Optional[int]:
+        """
+        有効な応答時間の最小値。有効な応答が無い場合は`None`
+        """
+
+        return self._min if self.count != 0 else None
+
+    @property
+    def max_msec(self) -> Optional[int]:
+        """
+        有効な応答時間の最大値。有効な応答が無い場合は`None`
+        """
+
+        return self._max if self.count != 0 else None
+
+    def add(self, response_msec: int, times: int = 1) -> None:
+        """
+        応答時間を`times`件追加する
+
+        Parameters
+        ----------
+        response_msec : int
+            応答時間。タイムアウトの場合は`Server.TIMEOUT_SYMBOL`
+        times : int, default = 1
+            追加する件数
+        """
+
+        if response_msec == _TIMEOUT:
+            self.timeouts += times
+            return
+        if response_msec == 0:
+            self._zeros += times
+        else:
+            index = math.ceil(math.log(response_msec) / self._log_gamma)
+            self._bins[index] = self._bins.get(index, 0) + times
+        if self.count == 0 or response_msec < self._min:
+            self._min = response_msec
+        if self.count == 0 or response_msec > self._max:
+            self._max = response_msec
+        self.count += times
+
+    def extend(self, responses: Iterable[int]) -> None:
+        """
+        応答時間の並びをまとめて追加する。同じ応答時間は区間の番号を1度だけ計算する
+        """
+
+        for response_msec, times in collections.Counter(responses).items():
+            self.add(response_msec, times)
+
+    def merge(self, other: "LatencySketch") -> None:
+        """
+        他のスケッチの内容をこのスケッチに併合する
+
+        Parameters
+        ----------
+        other : LatencySketch
+            併合するスケッチ。`relative_accuracy`が一致していなければならない
+
+        Raises
+        ------
+        ValueError
+            `relative_accuracy`が一致しない
+        """
+
+        if not (other.relative_accuracy == self.relative_accuracy):
+            raise ValueError(
+                f"relative_accuracy mismatch (self: {self.relative_accuracy}, other: {other.relative_accuracy})"
+            )
+        for index, times in other._bins.items():
+            self._bins[index] = self._bins.get(index, 0) + times
+        self._zeros += other._zeros
+        if other.count != 0:
+            self._min = other._min if self.count == 0 else min(self._min, other._min)
+            self._max = other._max if self.count == 0 else max(self._max, other._max)
+        self.count += other.count
+        self.timeouts += other.timeouts
+
+    def copy(self) -> "LatencySketch":
+        """
+        スケッチの複製を返す
+        """
+
+        sketch = LatencySketch(self.relative_accuracy)
+        sketch.merge(self)
+        return sketch
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """
+        有効な応答時間の分位点を求める
+
+        Parameters
+        ----------
+        quantile : float
+            求める分位点。0以上1以下
+
+        Returns
+        -------
+        Optional[float]
+            分位点の近似値。有効な応答が無い場合は`None`
+
+        Raises
+        ------
+        ValueError
+            `quantile`が0以上1以下でない
+        """
+
+        return self.quantiles([quantile])[0]
+
+    def quantiles(self, quantiles: Iterable[float]) -> List[Optional[float]]:
+        """
+        有効な応答時間の複数の分位点をまとめて求める。区間の走査は1度だけ行う
+
+        Parameters
+        ----------
+        quantiles : Iterable[float]
+            求める分位点の並び。それぞれ0以上1以下
+
+        Returns
+        -------
+        List[Optional[float]]
+            `quantiles`と同じ順序で並んだ分位点の近似値。有効な応答が無い場合は`None`
+
+        Raises
+        ------
+        ValueError
+            0以上1以下でない分位点が含まれている
+        """
+
+        values = list(quantiles)
+        for quantile in values:
+            if not (0 <= quantile <= 1):
+                raise ValueError(f"quantile must be between 0 and 1 (now {quantile})")
+        if self.count == 0:
+            return [None for _ in values]
+
+        # 昇順に並べた分位点について、順位に達した区間の代表値を求める
+        order = sorted(range(len(values)), key=values.__getitem__)
+        results: List[Optional[float]] = [None] * len(values)
+        cumulative = self._zeros
+        bins = iter(sorted(self._bins.items()))
+        value = 0.0
+        for position in order:
+            rank = values[position] * (self.count - 1)
+            while cumulative <= rank:
+                index, times = next(bins)
+                cumulative += times
+                value = 2 * self._gamma**index / (self._gamma + 1)
+            # 区間の代表値は実際の最小値・最大値の範囲に収める
+            results[position] = float(min(max(value, self._min), self._max))
+        # 0・1の分位点は、記録している最小値・最大値そのものとなる
+        for position, quantile in enumerate(values):
+            if quantile == 0:
+                results[position] = float(self._min)
+            elif quantile == 1:
+                results[position] = float(self._max)
+        return results
+
+
+def merge_sketches(sketches: Iterable[LatencySketch], relative_accuracy: float = RELATIVE_ACCURACY) -> LatencySketch:
+    """
+    複数のスケッチを併合した新たなスケッチを返す
+
+    Parameters
+    ----------
+    sketches : Iterable[LatencySketch]
+        併合するスケッチの並び。`relative_accuracy`が一致していなければならない
+    relative_accuracy : float, default = RELATIVE_ACCURACY
+        併合先のスケッチの相対誤差の上限
+
+    Returns
+    -------
+    LatencySketch
+        併合したスケッチ
+
+    Raises
+    ------
+    ValueError
+        `relative_accuracy`が一致しない
+    """
+
+    merged = LatencySketch(relative_accuracy)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
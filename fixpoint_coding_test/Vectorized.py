@@ -0,0 +1,374 @@
+"""
+サーバー群のダウン・過負荷検出を、NumPyの配列演算でまとめて行うバックエンド
+
+NumPyがインストールされている場合のみ有効となり、インストールされていない場合は
+`Server.get_downtimes`・`Server.get_overload_times`をサーバーごとに呼び出す実装に切り替わる。
+どちらの場合も、サーバーごとに呼び出した場合と同じ結果を返す。
+
+全サーバーの応答ログを1本の配列に連結し、サーバーの境界をまたがないように区切りを付けた上で、
+タイムアウトのランレングス符号化、累積和による移動平均(全要素1のカーネルとの畳み込みに相当)、
+区間の境界の抽出をすべて配列演算で行う。
+保持ポリシーで応答ログを破棄したサーバーは、`Server.get_overload_grid`と同様に破棄した末尾の行を先頭に補い、
+破棄した応答ログから継続している区間を繋げる。
+"""
+
+import datetime as DT
+import importlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from fixpoint_coding_test.Server import (
+    Server,
+    _continuous_values,
+    _join_carried_downtimes,
+    _join_carried_overloads,
+    _time_threshold_values,
+    epoch_to_datetime,
+)
+from fixpoint_coding_test.Server import get_downtimes_multi as _get_downtimes_multi
+from fixpoint_coding_test.Server import get_overload_grid as _get_overload_grid
+
+
+try:
+    np: Any = importlib.import_module("numpy")
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def has_numpy() -> bool:
+    """
+    NumPyによるバックエンドが有効かどうかを返す
+    """
+
+    return np is not None
+
+
+def get_downtimes(
+    servers: Mapping[str, Server], continuous: int = 1
+) -> Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+    """
+    サーバー群のダウンタイム情報をまとめて取得する
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous : int, default=1
+        サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値。
+
+    Returns
+    -------
+    Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]
+        `servers`と同じキーに紐づいた、`Server.get_downtimes`と同じ形式のダウンタイム情報
+
+    Raises
+    ------
+    ValueError
+        `continuous` が 0以下に指定された
+    """
+
+    if not (continuous > 0):
+        raise ValueError(f"continuous must over 0 (now {continuous})")
+    if np is None:
+        return {key: server.get_downtimes(continuous=continuous) for key, server in servers.items()}
+
+    fleet = _Fleet(servers)
+    starts, ends = fleet.runs(fleet.responses == Server.TIMEOUT_SYMBOL)
+    keep = (ends - starts) >= continuous
+    return fleet.join_carried_downtimes(fleet.to_intervals(starts[keep], ends[keep]), continuous)
+
+
+def get_downtimes_multi(
+    servers: Mapping[str, Server], continuous_values: Iterable[int]
+) -> Dict[int, Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]]:
+    """
+    サーバー群について、複数の閾値でのダウンタイム情報をまとめて取得する
+
+    連続したタイムアウトの抽出は1度だけ行い、閾値ごとには長さによる絞り込みのみを行う。
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous_values : Iterable[int]
+        サーバーがダウンしていると判断するために何度連続でタイム・アウトする必要があるかを決める閾値の並び
+
+    Returns
+    -------
+    Dict[int, Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]]
+        閾値をキーとした、`Server.get_downtimes_multi`と同じ形式のダウンタイム情報
+
+    Raises
+    ------
+    ValueError
+        `continuous_values` に 0以下の値が含まれている
+    """
+
+    values = _continuous_values(continuous_values)
+    if np is None:
+        return _get_downtimes_multi(servers, values)
+
+    fleet = _Fleet(servers)
+    starts, ends = fleet.runs(fleet.responses == Server.TIMEOUT_SYMBOL)
+    lengths = ends - starts
+    return {
+        value: fleet.join_carried_downtimes(
+            fleet.to_intervals(starts[lengths >= value], ends[lengths >= value]), value
+        )
+        for value in values
+    }
+
+
+def get_overload_times(
+    servers: Mapping[str, Server], continuous: int = 3, time_threshold: int = 100
+) -> Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+    """
+    サーバー群の過負荷状態の期間をまとめて取得する
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous : int, default = 3
+        過負荷状態と判定するために、何応答用いて平均化処理を行うかの指定。
+    time_threshold : int, default = 100
+        過負荷状態と判定するための応答時間閾値
+
+    Returns
+    -------
+    Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]
+        `servers`と同じキーに紐づいた、`Server.get_overload_times`と同じ形式の過負荷状態の期間
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    if not (continuous > 0):
+        raise ValueError(f"continuous must over 0 (now {continuous})")
+    if not (time_threshold > 0):
+        raise ValueError(f"time_threshold must over 0 (now {time_threshold})")
+    if np is None:
+        return {
+            key: server.get_overload_times(continuous=continuous, time_threshold=time_threshold)
+            for key, server in servers.items()
+        }
+
+    fleet = _Fleet(servers, with_carry=True)
+    valid = fleet.responses != Server.TIMEOUT_SYMBOL
+
+    # 窓内の有効な応答時間の合計と件数を、累積和の差分から求める。窓はサーバーの境界で打ち切る
+    valid_sum = np.concatenate(([0], np.cumsum(np.where(valid, fleet.responses, 0), dtype=np.int64)))
+    valid_count = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+    index = np.arange(len(fleet.responses))
+    lower = np.maximum(np.repeat(fleet.offsets[:-1], fleet.lengths), index - continuous + 1)
+    window_sum = valid_sum[index + 1] - valid_sum[lower]
+    window_count = valid_count[index + 1] - valid_count[lower]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        overload = valid & ((window_sum / window_count) >= time_threshold)
+
+    # タイムアウトは窓内に有効な応答が残っていれば過負荷とするが、
+    # `continuous`回以上連続した場合はダウン扱いとして連続したタイムアウトすべてを除外する
+    timeout_starts, timeout_ends = fleet.runs(~valid)
+    timeout_lengths = timeout_ends - timeout_starts
+    run_length = np.zeros(len(fleet.responses), dtype=np.int64)
+    run_length[~valid] = np.repeat(timeout_lengths, timeout_lengths)
+    overload |= ~valid & (window_count > 0) & (run_length < continuous)
+    overload &= ~fleet.carried
+
+    starts, ends = fleet.runs(overload)
+    return fleet.join_carried_overloads(fleet.to_intervals(starts, ends), continuous, time_threshold)
+
+
+def get_overload_grid(
+    servers: Mapping[str, Server], continuous_values: Iterable[int], time_thresholds: Iterable[int]
+) -> Dict[Tuple[int, int], Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]]:
+    """
+    サーバー群について、`continuous`と`time_threshold`の全ての組み合わせでの過負荷になった期間をまとめて取得する
+
+    窓の大きさごとに移動平均を1度だけ求め、各行を満たす閾値の個数(昇順に並べた閾値の先頭からの個数)に変換する。
+    前後の行でこの個数が変化した箇所を、閾値ごとの区間の開始・終了として展開する。
+
+    Parameters
+    ----------
+    servers : Mapping[str, Server]
+        確認を行うサーバーリスト
+    continuous_values : Iterable[int]
+        過負荷状態と判定するために、何応答用いて平均化処理を行うかの指定の並び
+    time_thresholds : Iterable[int]
+        過負荷状態と判定するための応答時間閾値の並び
+
+    Returns
+    -------
+    Dict[Tuple[int, int], Dict[str, List[Tuple[datetime.datetime, Optional[datetime.datetime]]]]]
+        `(continuous, time_threshold)`をキーとした、`Server.get_overload_grid`と同じ形式の過負荷状態の期間
+
+    Raises
+    ------
+    ValueError
+        入力値の入力範囲外の値が入力された
+    """
+
+    values = _continuous_values(continuous_values)
+    thresholds = _time_threshold_values(time_thresholds)
+    if np is None:
+        return _get_overload_grid(servers, values, thresholds)
+
+    fleet = _Fleet(servers, with_carry=True)
+    valid = fleet.responses != Server.TIMEOUT_SYMBOL
+    valid_sum = np.concatenate(([0], np.cumsum(np.where(valid, fleet.responses, 0), dtype=np.int64)))
+    valid_count = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+    index = np.arange(len(fleet.responses))
+    server_start = np.repeat(fleet.offsets[:-1], fleet.lengths)
+    timeout_starts, timeout_ends = fleet.runs(~valid)
+    timeout_lengths = timeout_ends - timeout_starts
+    run_length = np.zeros(len(fleet.responses), dtype=np.int64)
+    run_length[~valid] = np.repeat(timeout_lengths, timeout_lengths)
+    threshold_array = np.array(thresholds, dtype=np.float64)
+
+    results: Dict[Tuple[int, int], Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]] = {}
+    for continuous in values:
+        lower = np.maximum(server_start, index - continuous + 1)
+        window_sum = valid_sum[index + 1] - valid_sum[lower]
+        window_count = valid_count[index + 1] - valid_count[lower]
+
+        # 各行で過負荷となる閾値の個数
+        counts = np.zeros(len(fleet.responses), dtype=np.int64)
+        counts[valid] = np.searchsorted(threshold_array, window_sum[valid] / window_count[valid], side="right")
+        counts[~valid & (window_count > 0) & (run_length < continuous)] = len(thresholds)
+        counts[fleet.carried] = 0
+
+        # サーバーの境界では、前後の行の個数を 0 とみなす
+        previous = np.zeros_like(counts)
+        previous[1:] = counts[:-1]
+        previous[fleet.first] = 0
+        following = np.zeros_like(counts)
+        following[:-1] = counts[1:]
+        following[fleet.last] = 0
+
+        start_rows, start_levels = _expand(index, previous, counts)
+        end_rows, end_levels = _expand(index + 1, following, counts)
+        start_order = np.lexsort((start_rows, start_levels))
+        end_order = np.lexsort((end_rows, end_levels))
+        start_rows, start_levels = start_rows[start_order], start_levels[start_order]
+        end_rows = end_rows[end_order]
+        bounds = np.searchsorted(start_levels, np.arange(len(thresholds) + 1))
+        for level, time_threshold in enumerate(thresholds):
+            first, last = bounds[level], bounds[level + 1]
+            results[(continuous, time_threshold)] = fleet.join_carried_overloads(
+                fleet.to_intervals(start_rows[first:last], end_rows[first:last]), continuous, time_threshold
+            )
+    return results
+
+
+def _expand(rows, lower, upper):
+    """
+    各行について`lower <= level < upper`を満たす`level`を展開し、行と`level`の配列の組で返す
+    """
+
+    repeats = np.maximum(upper - lower, 0)
+    expanded_rows = np.repeat(rows, repeats)
+    offsets = np.arange(len(expanded_rows)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    return expanded_rows, np.repeat(lower, repeats) + offsets
+
+
+class _Fleet:
+    """
+    サーバー群の日時順の列データを連結した配列と、サーバーの境界の情報
+
+    `with_carry`が`True`の場合、保持ポリシーで応答ログを破棄したサーバーは、移動平均の窓を埋めるために
+    破棄した末尾の行(`RetentionCarry.responses`)を先頭に補う。補った行は`carried`で印を付け、区間には含めない。
+    """
+
+    def __init__(self, servers: Mapping[str, Server], with_carry: bool = False) -> None:
+        self.keys: List[str] = list(servers.keys())
+        self.servers: List[Server] = list(servers.values())
+        timestamps_list = []
+        responses_list = []
+        carried_list = []
+        for server in self.servers:
+            timestamps, responses = server.get_columns()
+            carry = server.retention_carry
+            prefix = carry.responses if with_carry and carry is not None else ()
+            timestamps_list.append(
+                np.concatenate((np.zeros(len(prefix), np.int64), np.frombuffer(timestamps, dtype=np.int64)))
+            )
+            responses_list.append(
+                np.concatenate((np.array(prefix, dtype=np.intc), np.frombuffer(responses, dtype=np.intc)))
+            )
+            carried_list.append(np.arange(len(prefix) + len(responses)) < len(prefix))
+        self.lengths = np.array([len(timestamps) for timestamps in timestamps_list], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.lengths))).astype(np.int64)
+        self.timestamps = np.concatenate(timestamps_list) if len(timestamps_list) != 0 else np.zeros(0, np.int64)
+        self.responses = (
+            np.concatenate(responses_list).astype(np.int64) if len(responses_list) != 0 else np.zeros(0, np.int64)
+        )
+        # 破棄した応答ログから補った行の印
+        self.carried = np.concatenate(carried_list) if len(carried_list) != 0 else np.zeros(0, dtype=bool)
+
+        # 各サーバーの先頭行と末尾行の印
+        size = len(self.responses)
+        non_empty = self.lengths > 0
+        self.first = np.zeros(size, dtype=bool)
+        self.first[self.offsets[:-1][non_empty]] = True
+        self.last = np.zeros(size, dtype=bool)
+        self.last[self.offsets[1:][non_empty] - 1] = True
+
+    def runs(self, mask):
+        """
+        `mask`が`True`である行の連続を、サーバーの境界で区切って`[start, end)`の配列の組で返す
+        """
+
+        previous = np.zeros_like(mask)
+        previous[1:] = mask[:-1]
+        following = np.zeros_like(mask)
+        following[:-1] = mask[1:]
+        starts = np.flatnonzero(mask & (~previous | self.first))
+        ends = np.flatnonzero(mask & (~following | self.last)) + 1
+        return starts, ends
+
+    def to_intervals(self, starts, ends) -> Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        連結した配列上の行番号の区間を、サーバーごとの日時の区間に変換する。
+        区間がサーバーの最後の行まで続く場合、終了日時は`None`となる
+        """
+
+        results: Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]] = {key: [] for key in self.keys}
+        if len(starts) == 0:
+            return results
+        owners = np.searchsorted(self.offsets, starts, side="right") - 1
+        has_end = ends < self.offsets[owners + 1]
+        start_times = self.timestamps[starts].tolist()
+        end_times = self.timestamps[np.where(has_end, ends, starts)].tolist()
+        for start_time, end_time, is_closed, owner in zip(start_times, end_times, has_end.tolist(), owners.tolist()):
+            results[self.keys[owner]].append(
+                (epoch_to_datetime(start_time), epoch_to_datetime(end_time) if is_closed else None)
+            )
+        return results
+
+    def join_carried_downtimes(
+        self, results: Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]], continuous: int
+    ) -> Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        保持ポリシーで応答ログを破棄したサーバーのダウンタイムに、破棄した応答ログから継続している連続を繋げる
+        """
+
+        for key, server in zip(self.keys, self.servers):
+            carry = server.retention_carry
+            if carry is not None:
+                results[key] = _join_carried_downtimes(carry, continuous, results[key], *server.get_columns())
+        return results
+
+    def join_carried_overloads(
+        self, results: Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]], continuous: int, time_threshold: int
+    ) -> Dict[str, List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+        """
+        保持ポリシーで応答ログを破棄したサーバーの過負荷状態の期間に、破棄した応答ログから継続している過負荷状態を繋げる。
+        過負荷状態は、引き継いだ判定と同じパラメータの場合のみ繋げる
+        """
+
+        for key, server in zip(self.keys, self.servers):
+            carry = server.retention_carry
+            if carry is not None and (carry.continuous, carry.time_threshold) == (continuous, time_threshold):
+                results[key] = _join_carried_overloads(carry, results[key], *server.get_columns())
+        return results
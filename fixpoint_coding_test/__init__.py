@@ -1 +1 @@
-from . import Network, Server
+from . import Cache, Detector, Follower, Instrumentation, IntervalIndex, Network, Rollup, Server, Sketch, Vectorized
@@ -1,6 +1,8 @@
 import datetime as DT
 import ipaddress
 
+import pytest
+
 from fixpoint_coding_test import Server
 
 
@@ -63,3 +65,84 @@ def test_load_data_03():
     }
     assert servers["10.20.30.2"].ip_address == ipaddress.IPv4Interface("10.20.30.2/16")
     assert servers["10.20.30.2"].ping_results == {DT.datetime(2020, 10, 19, 13, 31, 26): 2}
+
+
+def test_parse_epoch_01():
+    text = "20201019133124"
+    assert Server.parse_epoch(text) == Server.datetime_to_epoch(DT.datetime(2020, 10, 19, 13, 31, 24))
+    assert Server.epoch_to_datetime(Server.parse_epoch(text)) == Server.parse_datetime(text)
+
+
+def test_parse_epoch_02():
+    for text in ["20200229235959", "19991231000000", "20210101000000"]:
+        assert Server.epoch_to_datetime(Server.parse_epoch(text)) == Server.parse_datetime(text)
+
+
+def test_parse_epoch_error_01():
+    for text in ["20201319133124", "20201019243124", "20201019133160", "2020101913312a", ""]:
+        with pytest.raises(ValueError):
+            Server.parse_epoch(text)
+
+
+def test_csv_block_to_params_01():
+    lines = ["20201019133124,10.20.30.1/16,2\n", "\n", "20201019133125,10.20.30.2/16,-\n"]
+    rows = Server.csv_block_to_params(lines)
+    assert rows == [
+        (Server.parse_epoch("20201019133124"), "10.20.30.1/16", 2),
+        (Server.parse_epoch("20201019133125"), "10.20.30.2/16", Server.Server.TIMEOUT_SYMBOL),
+    ]
+
+
+def test_csv_block_to_params_error_01():
+    with pytest.raises(ValueError):
+        Server.csv_block_to_params(["20201019133124,10.20.30.1/16"])
+
+
+def test_iter_rows_01():
+    file_path = "test_case/002.csv"
+    with open(file_path) as f:
+        _ = f.readline()
+        expected = Server.csv_block_to_params(f.readlines())
+    # チャンクの境界が行の途中になる場合も同じ結果となる
+    for chunk_size in [1, 7, 31, 1 << 20]:
+        assert list(Server.iter_rows(file_path, chunk_size=chunk_size)) == expected
+
+
+def test_load_data_chunked_01():
+    file_path = "test_case/003_03.csv"
+    servers = Server.load_data(file_path)
+    servers_chunked = Server.load_data(file_path, chunk_size=5)
+    assert servers.keys() == servers_chunked.keys()
+    for ip_address, server in servers.items():
+        assert servers_chunked[ip_address].ping_results == server.ping_results
+
+
+def test_iter_rows_error_01():
+    with pytest.raises(ValueError):
+        list(Server.iter_rows("test_case/002.csv", chunk_size=0))
+
+
+def test_split_byte_ranges_01():
+    file_path = "test_case/002.csv"
+    ranges = Server.split_byte_ranges(file_path, chunk_bytes=40)
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == len(header) + len(body)
+    with open(file_path, "rb") as f:
+        for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+            assert end == next_start
+            f.seek(end - 1)
+            assert f.read(1) == b"\n"  # 範囲の境界は行頭に揃う
+
+
+def test_load_data_parallel_01():
+    file_paths = ["test_case/003_03.csv", "test_case/002.csv"]
+    servers = Server.load_data(file_paths[0])
+    servers = Server.load_data(file_paths[1], servers=servers)
+    servers_parallel = Server.load_data_parallel(file_paths, max_workers=2, chunk_bytes=64)
+    assert list(servers_parallel.keys()) == list(servers.keys())
+    for ip_address, server in servers.items():
+        assert servers_parallel[ip_address].ip_address == server.ip_address
+        assert servers_parallel[ip_address].ping_results == server.ping_results
@@ -1,6 +1,8 @@
 import datetime as DT
 import ipaddress
 
+import pytest
+
 from fixpoint_coding_test import Server
 
 
@@ -113,3 +115,298 @@ def test_get_overload_06():
         (DT.datetime(2020, 10, 19, 13, 32, 3), DT.datetime(2020, 10, 19, 13, 32, 6)),
         (DT.datetime(2020, 10, 19, 13, 32, 11), None),
     ]
+
+
+def test_append_ping_epoch_01():
+    ip_address = "10.20.30.1/16"
+    server = Server.Server(ip_address=ip_address)
+    server.append_ping_epoch(Server.datetime_to_epoch(DT.datetime(2020, 10, 19, 13, 31, 24)), 2)
+    server.append_ping_epoch(Server.datetime_to_epoch(DT.datetime(2020, 10, 19, 13, 31, 25)), -1)
+    assert server.ping_results == {
+        DT.datetime(2020, 10, 19, 13, 31, 24): 2,
+        DT.datetime(2020, 10, 19, 13, 31, 25): -1,
+    }
+    assert server.ping_results[DT.datetime(2020, 10, 19, 13, 31, 25)] == Server.Server.TIMEOUT_SYMBOL
+    assert DT.datetime(2020, 10, 19, 13, 31, 26) not in server.ping_results
+
+
+def test_append_ping_results_duplicate_01():
+    ip_address = "10.20.30.1/16"
+    server = Server.Server(ip_address=ip_address)
+    server.append_ping_results("20201019133125", 5)
+    server.append_ping_results("20201019133124", 2)
+    server.append_ping_results("20201019133125", -1)
+    assert list(server.ping_results.items()) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 24), 2),
+        (DT.datetime(2020, 10, 19, 13, 31, 25), -1),
+    ]
+    assert server.get_downtimes() == [(DT.datetime(2020, 10, 19, 13, 31, 25), None)]
+
+
+def test_epoch_conversion_01():
+    datetime = DT.datetime(2020, 10, 19, 13, 31, 24)
+    assert Server.datetime_to_epoch(datetime) == 1603114284
+    assert Server.epoch_to_datetime(1603114284) == datetime
+
+
+def test_sorted_columns_cache_01():
+    file_path = "test_case/003_03.csv"
+    servers = Server.load_data(file_path=file_path)
+    server = servers["10.20.30.1"]
+    # 日時順に登録されている場合は、ソートせずに保持している列をそのまま使う
+    assert server._sorted_columns()[0] is server._sorted_columns()[0]
+    downtimes = server.get_downtimes(5)
+
+    # 日時順でない登録があった場合は、ソート結果を作成して使い回す
+    server.append_ping_results("20201019133000", Server.Server.TIMEOUT_SYMBOL)
+    timestamps, _ = server._sorted_columns()
+    assert server._sorted_columns()[0] is timestamps
+    assert list(timestamps) == sorted(timestamps)
+    assert server.get_downtimes(5) == downtimes
+    assert server.get_downtimes(1)[0] == (DT.datetime(2020, 10, 19, 13, 30, 0), DT.datetime(2020, 10, 19, 13, 31, 24))
+
+    # 追記されるとソート結果は作り直される
+    server.append_ping_results("20201019133001", 10)
+    assert server._sorted_columns()[0] is not timestamps
+    assert server.get_downtimes(1)[0] == (DT.datetime(2020, 10, 19, 13, 30, 0), DT.datetime(2020, 10, 19, 13, 30, 1))
+
+
+def test_get_overload_continuous_one_01():
+    ip_address = "10.20.30.1/16"
+    server = Server.Server(ip_address=ip_address)
+    for datetime_str, result_msec in [
+        ("20201019133124", 200),
+        ("20201019133125", 50),
+        ("20201019133126", 150),
+        ("20201019133127", Server.Server.TIMEOUT_SYMBOL),
+        ("20201019133128", 120),
+    ]:
+        server.append_ping_results(datetime_str, result_msec)
+    # continuous=1 の場合、タイムアウトはダウン扱いとなり過負荷には含まれない
+    assert server.get_overload_times(continuous=1) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 24), DT.datetime(2020, 10, 19, 13, 31, 25)),
+        (DT.datetime(2020, 10, 19, 13, 31, 26), DT.datetime(2020, 10, 19, 13, 31, 27)),
+        (DT.datetime(2020, 10, 19, 13, 31, 28), None),
+    ]
+
+
+def test_get_overload_large_window_01():
+    ip_address = "10.20.30.1/16"
+    server = Server.Server(ip_address=ip_address)
+    base = Server.parse_epoch("20201019000000")
+    for i in range(10000):
+        server.append_ping_epoch(base + i, 150 if 5000 <= i < 5100 else 10)
+    # 窓の大きさによらず、有効な応答時間の平均で判定される
+    assert server.get_overload_times(continuous=2000, time_threshold=15) == [
+        (Server.epoch_to_datetime(base + 5071), Server.epoch_to_datetime(base + 7028)),
+    ]
+
+
+@pytest.mark.parametrize("file_path", ["test_case/002.csv", "test_case/003_03.csv", "test_case/004_01_01.csv"])
+def test_get_downtimes_multi_01(file_path):
+    servers = Server.load_data(file_path=file_path)
+    for server in servers.values():
+        assert server.get_downtimes_multi(range(1, 8)) == {
+            continuous: server.get_downtimes(continuous=continuous) for continuous in range(1, 8)
+        }
+
+    # サーバー群に対してまとめて取得する
+    assert Server.get_downtimes_multi(servers, [3, 1, 3]) == {
+        continuous: {key: server.get_downtimes(continuous=continuous) for key, server in servers.items()}
+        for continuous in [1, 3]
+    }
+
+
+def test_get_downtimes_multi_error_01():
+    server = Server.Server(ip_address="10.20.30.1/16")
+    with pytest.raises(ValueError) as e:
+        server.get_downtimes_multi([3, 0, 1])
+    assert str(e.value) == "continuous must over 0 (now 0)"
+    assert server.get_downtimes_multi([]) == {}
+
+
+@pytest.mark.parametrize("file_path", ["test_case/003_01.csv", "test_case/003_03.csv", "test_case/004_01_01.csv"])
+def test_get_overload_grid_01(file_path):
+    servers = Server.load_data(file_path=file_path)
+    continuous_values = range(1, 6)
+    time_thresholds = [1, 50, 100, 150, 400]
+    for server in servers.values():
+        assert server.get_overload_grid(continuous_values, time_thresholds) == {
+            (continuous, time_threshold): server.get_overload_times(continuous, time_threshold)
+            for continuous in continuous_values
+            for time_threshold in time_thresholds
+        }
+
+    # サーバー群に対してまとめて取得する
+    assert Server.get_overload_grid(servers, [3, 1, 3], [100, 50]) == {
+        (continuous, time_threshold): {
+            key: server.get_overload_times(continuous, time_threshold) for key, server in servers.items()
+        }
+        for continuous in [1, 3]
+        for time_threshold in [50, 100]
+    }
+
+
+def test_get_overload_grid_error_01():
+    server = Server.Server(ip_address="10.20.30.1/16")
+    with pytest.raises(ValueError) as e:
+        server.get_overload_grid([3, 0], [100])
+    assert str(e.value) == "continuous must over 0 (now 0)"
+    with pytest.raises(ValueError) as e:
+        server.get_overload_grid([3], [100, -1])
+    assert str(e.value) == "time_threshold must over 0 (now -1)"
+    assert server.get_overload_grid([], [100]) == {}
+    assert server.get_overload_grid([3], []) == {}
+
+
+def test_analyze_01():
+    file_path = "test_case/003_03.csv"
+    servers = Server.load_data(file_path=file_path)
+    reports = Server.analyze(servers, continuous=3, time_threshold=100)
+    assert list(reports.keys()) == list(servers.keys())
+    for key, server in servers.items():
+        report = reports[key]
+        assert report.address == server.ip_address
+        assert [(incident.start, incident.end) for incident in report.downtimes] == server.get_downtimes(3)
+        assert [(incident.start, incident.end) for incident in report.overloads] == server.get_overload_times(3, 100)
+        assert all(incident.label == Server.DOWNTIME_LABEL for incident in report.downtimes)
+        assert all(incident.label == Server.OVERLOAD_LABEL for incident in report.overloads)
+        assert report.incidents == sorted(
+            report.downtimes + report.overloads, key=lambda incident: (incident.start, incident.end)
+        )
+
+    # 区間の種類を絞り込む
+    report = Server.analyze(servers, continuous=3, with_overload=False)["10.20.30.1"]
+    assert report.overloads == ()
+    assert report.downtimes == reports["10.20.30.1"].downtimes
+
+    with pytest.raises(ValueError) as e:
+        Server.analyze(servers, time_threshold=0)
+    assert str(e.value) == "time_threshold must over 0 (now 0)"
+
+
+def test_analyze_memoize_01():
+    file_path = "test_case/003_03.csv"
+    servers = Server.load_data(file_path=file_path)
+    server = servers["10.20.30.1"]
+    # 同じパラメータであれば、応答ログが変化するまで同じ解析結果を返す
+    report = server.analyze(continuous=2)
+    assert server.analyze(continuous=2) is report
+    assert server.analyze(continuous=3) is not report
+
+    # 返されたリストを変更しても、キャッシュには影響しない
+    downtimes = server.get_downtimes(2)
+    downtimes.clear()
+    assert server.get_downtimes(2) != []
+
+    # 追記されると解析し直す
+    server.append_ping_results("20201019140000", Server.Server.TIMEOUT_SYMBOL)
+    server.append_ping_results("20201019140001", Server.Server.TIMEOUT_SYMBOL)
+    updated = server.analyze(continuous=2)
+    assert updated is not report
+    assert updated.downtimes[:-1] == report.downtimes
+    assert updated.downtimes[-1] == Server.Incident(
+        server.ip_address, Server.DOWNTIME_LABEL, DT.datetime(2020, 10, 19, 14, 0, 0), None
+    )
+
+
+def test_compact_server_01():
+    server = Server.Server("10.20.30.1/16")
+    # IPアドレスは整数で保持し、インスタンス辞書を持たない
+    assert not hasattr(server, "__dict__")
+    with pytest.raises(AttributeError):
+        server.unknown = 1
+    assert server.address == int(ipaddress.IPv4Address("10.20.30.1"))
+    assert server.prefixlen == 16
+    assert server.network_address == int(ipaddress.IPv4Address("10.20.0.0"))
+    assert server.ip_address == ipaddress.IPv4Interface("10.20.30.1/16")
+    assert Server.Server(ipaddress.IPv4Interface("10.20.30.1/16")).address == server.address
+    assert Server.address_to_int("10.20.30.1/16") == server.address
+    assert Server.prefix_to_netmask(16) == int(ipaddress.IPv4Address("255.255.0.0"))
+    assert Server.prefix_to_netmask(0) == 0
+
+
+def test_server_registry_01():
+    registry = Server.ServerRegistry()
+    server = Server.Server("10.20.30.1/16")
+    registry.add(server)
+    # 同じIPアドレスのサーバーは、先に登録したものを優先する
+    registry.add(Server.Server("10.20.30.1/24"))
+    assert len(registry) == 1
+    assert list(registry) == [server]
+    for key in [server.address, "10.20.30.1", "10.20.30.1/16", ipaddress.IPv4Address("10.20.30.1"), server.ip_address]:
+        assert key in registry
+        assert registry.get(key) is server
+    assert registry.get("10.20.30.2") is None
+    assert "10.20.30.2" not in registry
+
+
+def test_parse_interface_01():
+    for address in ["10.20.30.1/16", "0.0.0.0/0", "255.255.255.255/32", "192.168.1.1/255.255.255.0", "10.20.30.1"]:
+        interface = ipaddress.IPv4Interface(address)
+        assert Server.parse_interface(address) == (
+            int(interface.ip),
+            interface.network.prefixlen,
+            int(interface.network.network_address),
+        )
+
+    # 同じ文字列は2度パースしない
+    Server.parse_interface.cache_clear()
+    Server.parse_interface("10.20.30.1/16")
+    Server.parse_interface("10.20.30.1/16")
+    assert Server.parse_interface.cache_info().hits == 1
+
+    for address in ["10.20.30.256/16", "10.20.30.1/33", "010.20.30.1/16", "10.20.30/16", "server/16"]:
+        with pytest.raises(ValueError):
+            Server.parse_interface(address)
+
+
+def test_time_range_01():
+    file_path = "test_case/003_03.csv"
+    server = Server.load_data(file_path=file_path)["10.20.30.1"]
+    since = DT.datetime(2020, 10, 19, 13, 31, 28)
+    until = DT.datetime(2020, 10, 19, 13, 31, 45)
+    # 期間と重なる区間のみを、全期間を解析した場合と同じ開始・終了日時で返す
+    assert server.get_downtimes(2, since=since, until=until) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 26), DT.datetime(2020, 10, 19, 13, 31, 31)),
+        (DT.datetime(2020, 10, 19, 13, 31, 39), DT.datetime(2020, 10, 19, 13, 31, 43)),
+    ]
+    assert server.get_overload_times(3, 100, since=since, until=until) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 36), DT.datetime(2020, 10, 19, 13, 31, 39)),
+        (DT.datetime(2020, 10, 19, 13, 31, 43), DT.datetime(2020, 10, 19, 13, 31, 53)),
+    ]
+    # 片側のみの指定
+    assert server.get_downtimes(2, since=DT.datetime(2020, 10, 19, 13, 32, 0)) == server.get_downtimes(2)[-1:]
+    assert server.get_overload_times(3, 100, until=DT.datetime(2020, 10, 19, 13, 31, 40)) == (
+        server.get_overload_times(3, 100)[:1]
+    )
+    report = server.analyze(since=since, until=until)
+    assert [(incident.start, incident.end) for incident in report.downtimes] == server.get_downtimes(3, since, until)
+
+    with pytest.raises(ValueError) as e:
+        server.get_downtimes(2, since=until, until=since)
+    assert str(e.value) == f"since must not be after until (since: {until}, until: {since})"
+
+
+def test_time_range_02():
+    # 期間の前後をまたぐ区間も、全期間を解析した結果と一致する
+    server = Server.Server("10.20.30.1/16")
+    responses = [10, -1, -1, -1, 200, 150, -1, -1, 20, 300, 300, -1, 10, 10, 10, -1, -1, -1, -1, 5]
+    for i, response in enumerate(responses):
+        server.append_ping_epoch(1603114284 + i, response)
+    start = Server.epoch_to_datetime(1603114284)
+    for since_offset in range(len(responses)):
+        for until_offset in range(since_offset, len(responses)):
+            since = start + DT.timedelta(seconds=since_offset)
+            until = start + DT.timedelta(seconds=until_offset)
+            for continuous in [1, 2, 3]:
+                expected = [
+                    (s, e) for s, e in server.get_downtimes(continuous) if s <= until and (e is None or e >= since)
+                ]
+                assert server.get_downtimes(continuous, since, until) == expected
+                expected = [
+                    (s, e)
+                    for s, e in server.get_overload_times(continuous, 100)
+                    if s <= until and (e is None or e >= since)
+                ]
+                assert server.get_overload_times(continuous, 100, since, until) == expected
@@ -1,5 +1,6 @@
 import datetime as DT
 import ipaddress
+import random
 
 import pytest
 
@@ -276,3 +277,288 @@ def test_get_network_downtime_02():
     assert network.get_network_downtime(continuous=1) == [
         (DT.datetime(2020, 10, 19, 13, 31, 25), DT.datetime(2020, 10, 19, 13, 31, 29))
     ]
+
+
+def _t(second):
+    return DT.datetime(2020, 10, 19, 0, 0, second)
+
+
+def test_intersect_intervals_01():
+    # 複数の区間が共通する場合、それぞれの共通期間を返す
+    interval_lists = [
+        [(_t(1), _t(3)), (_t(5), _t(7)), (_t(9), _t(12))],
+        [(_t(1), _t(3)), (_t(8), _t(10)), (_t(11), None)],
+        [(_t(0), _t(4)), (_t(5), _t(9)), (_t(10), _t(13)), (_t(18), _t(21))],
+        [(_t(1), _t(5)), (_t(10), _t(12)), (_t(16), _t(19))],
+    ]
+    # 同じ日時に終了・開始した区間は共通期間とならない
+    assert Network.intersect_intervals(interval_lists) == [(_t(1), _t(3)), (_t(11), _t(12))]
+
+
+def test_intersect_intervals_02():
+    # 1つのサーバーの区間が、他のサーバーの複数の区間と重なる場合
+    interval_lists = [
+        [(_t(0), _t(4)), (_t(7), _t(8)), (_t(17), None)],
+        [(_t(1), _t(5)), (_t(16), _t(21)), (_t(22), _t(23))],
+        [(_t(0), _t(2)), (_t(3), None)],
+    ]
+    assert Network.intersect_intervals(interval_lists) == [
+        (_t(1), _t(2)),
+        (_t(3), _t(4)),
+        (_t(17), _t(21)),
+        (_t(22), _t(23)),
+    ]
+
+
+def _pairwise_intersect(interval_lists):
+    """
+    走査線法を導入する前の`Network.get_network_downtime`と同じ、区間を総当たりで突き合わせる実装
+    """
+
+    results_set = set()
+    for k, outer_list in enumerate(interval_lists):
+        for outer_start, outer_end in outer_list:
+            if any(Network.is_overlap_time(outer_start, outer_end, start, end) for start, end in results_set):
+                continue
+            for j, inner_list in enumerate(interval_lists):
+                if j == k:
+                    continue
+                for inner_start, inner_end in inner_list:
+                    if Network.is_overlap_time(outer_start, outer_end, inner_start, inner_end):
+                        outer_start = max(outer_start, inner_start)
+                        if inner_end is not None:
+                            outer_end = inner_end if outer_end is None else min(outer_end, inner_end)
+                        break
+                else:
+                    break
+            else:
+                results_set.add((outer_start, outer_end))
+    return sorted(results_set)
+
+
+def _overlaps_at_most_one(interval_lists):
+    return all(
+        sum(Network.is_overlap_time(start, end, other_start, other_end) for other_start, other_end in others) <= 1
+        for i, intervals in enumerate(interval_lists)
+        for j, others in enumerate(interval_lists)
+        if i != j
+        for start, end in intervals
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_intersect_intervals_pairwise_01(seed):
+    # 総当たりの実装が正しく扱える入力(各区間が他のサーバーの区間と高々1つしか重ならない)では、
+    # 長さ0の区間を除いて総当たりの実装と一致する
+    rng = random.Random(seed)
+    compared = 0
+    for _ in range(200):
+        servers = [Server.Server(f"10.20.30.{i + 1}/16") for i in range(rng.randint(1, 3))]
+        for second in range(40):
+            for server in servers:
+                server.append_ping_epoch(1_600_000_000 + second, -1 if rng.random() < 0.6 else 10)
+        interval_lists = [server.get_downtimes(rng.randint(1, 2)) for server in servers]
+        if not _overlaps_at_most_one(interval_lists):
+            continue
+        compared += 1
+        expected = [(start, end) for start, end in _pairwise_intersect(interval_lists) if start != end]
+        assert Network.intersect_intervals(interval_lists) == expected
+    assert compared != 0
+
+
+def test_intersect_intervals_None_01():
+    interval_lists = [[(_t(1), None)], [(_t(3), None)], [(_t(0), _t(2)), (_t(5), None)]]
+    assert Network.intersect_intervals(interval_lists) == [(_t(5), None)]
+
+
+def test_intersect_intervals_empty_01():
+    assert Network.intersect_intervals([]) == []
+    assert Network.intersect_intervals([[(_t(1), _t(3))], []]) == []
+    assert Network.intersect_intervals([[(_t(1), _t(3))], [(_t(4), _t(5))]]) == []
+
+
+def test_get_server_01():
+    ip_subnet = ipaddress.IPv4Network("10.20.30.1/16", strict=False)
+    network = Network.Network(ip_subnet)
+    server_01 = Server.Server(ip_address="10.20.30.1/16")
+    server_02 = Server.Server(ip_address="10.20.30.2/16")
+    network.add_server(server_01)
+    network.add_server(server_02)
+
+    assert network.get_server("10.20.30.1") is server_01
+    assert network.get_server("10.20.30.2/16") is server_02
+    assert network.get_server(ipaddress.IPv4Address("10.20.30.2")) is server_02
+    assert network.get_server(ipaddress.IPv4Interface("10.20.30.1/16")) is server_01
+    assert network.get_server("10.20.30.3") is None
+
+
+def test_load_network_index_01():
+    file_path = "test_case/004_01_01.csv"
+    networks = Network.load_data(file_path=file_path)
+    server = networks[0].get_server("10.20.30.1")
+    assert server is not None
+
+    # 追記読み込み時は、既存のネットワークに記録される
+    file_path = "test_case/004_01_02.csv"
+    networks = Network.load_data(file_path=file_path, networks=networks)
+    assert len(networks) == 1
+    assert len(networks[0].servers) == 2
+    assert networks[0].get_server("10.20.30.1") is server
+    assert networks[0].get_server("10.20.30.2") is networks[0].servers[1]
+
+    # 同じファイルを再度読み込むと、既存のサーバーに追記される
+    networks = Network.load_data(file_path=file_path, networks=networks)
+    assert len(networks[0].servers) == 2
+
+
+def test_load_network_parallel_01():
+    file_paths = ["test_case/004_02_01.csv", "test_case/004_02_02.csv"]
+    networks = Network.load_data(file_path=file_paths[0])
+    networks = Network.load_data(file_path=file_paths[1], networks=networks)
+    networks_parallel = Network.load_data_parallel(file_paths, max_workers=2, chunk_bytes=64)
+
+    assert [network.subnet_ipaddress for network in networks_parallel] == [
+        network.subnet_ipaddress for network in networks
+    ]
+    for network, network_parallel in zip(networks, networks_parallel):
+        assert [server.ip_address for server in network_parallel.servers] == [
+            server.ip_address for server in network.servers
+        ]
+        for server, server_parallel in zip(network.servers, network_parallel.servers):
+            assert server_parallel.ping_results == server.ping_results
+
+
+def test_network_tree_01():
+    file_path = "test_case/004_03_01.csv"
+    networks = Network.load_data(file_path=file_path)
+    tree = Network.NetworkTree(networks)
+
+    parent, child_01, child_02 = networks
+    assert tree.roots == [parent]
+    assert tree.get_parent(parent) is None
+    assert tree.get_parent(child_01) is parent
+    assert tree.get_children(parent) == [child_01, child_02]
+    assert tree.get_children(child_01) == []
+
+    # 最長一致するネットワークを取得する
+    assert tree.find_network("10.20.10.5") is child_01
+    assert tree.find_network(ipaddress.IPv4Interface("10.20.20.5/24")) is child_02
+    assert tree.find_network(ipaddress.IPv4Address("10.20.30.5")) is parent
+    assert tree.find_network("10.21.0.1") is None
+
+
+def test_network_tree_switch_downtime_01():
+    file_path = "test_case/004_03_01.csv"
+    networks = Network.load_data(file_path=file_path)
+    tree = Network.NetworkTree(networks)
+
+    # 親ネットワークは、配下のネットワークのサーバーも含めて全てダウンしている期間となる
+    assert tree.get_switch_downtimes(continuous=2) == {
+        ipaddress.IPv4Network("10.20.0.0/16"): [
+            (DT.datetime(2020, 10, 19, 13, 31, 26), DT.datetime(2020, 10, 19, 13, 31, 28))
+        ],
+        ipaddress.IPv4Network("10.20.10.0/24"): [
+            (DT.datetime(2020, 10, 19, 13, 31, 25), DT.datetime(2020, 10, 19, 13, 31, 29))
+        ],
+        ipaddress.IPv4Network("10.20.20.0/24"): [
+            (DT.datetime(2020, 10, 19, 13, 31, 26), DT.datetime(2020, 10, 19, 13, 31, 30))
+        ],
+    }
+    assert tree.get_switch_downtimes(continuous=4)[ipaddress.IPv4Network("10.20.0.0/16")] == []
+
+    with pytest.raises(ValueError) as e:
+        tree.get_switch_downtimes(continuous=0)
+    assert str(e.value) == "continuous must over 0 (now 0)"
+
+
+def test_print_networks_error_nested_01(capfd: pytest.CaptureFixture):
+    file_path = "test_case/004_03_01.csv"
+    networks = Network.load_data(file_path=file_path)
+
+    Network.print_networks_error(
+        networks=networks, continuous=2, with_server_timeout=False, with_server_overload=False
+    )
+    out, _ = capfd.readouterr()
+    assert out.splitlines()[:2] == [
+        "10.20.0.0/16 has error",
+        "    10.20.0.0/16 switch down 2020-10-19 13:31:25 ~ 2020-10-19 13:31:28",
+    ]
+
+    # 配下のネットワークのサーバーも含めて判定する
+    Network.print_networks_error(
+        networks=networks, continuous=2, with_server_timeout=False, with_server_overload=False, nested=True
+    )
+    out, _ = capfd.readouterr()
+    assert (
+        out
+        == """\
+10.20.0.0/16 has error
+    10.20.0.0/16 switch down 2020-10-19 13:31:26 ~ 2020-10-19 13:31:28
+10.20.10.0/24 has error
+    10.20.10.0/24 switch down 2020-10-19 13:31:25 ~ 2020-10-19 13:31:29
+10.20.20.0/24 has error
+    10.20.20.0/24 switch down 2020-10-19 13:31:26 ~ 2020-10-19 13:31:30
+"""
+    )
+
+
+def test_analyze_01():
+    file_path = "test_case/004_03_01.csv"
+    networks = Network.load_data(file_path=file_path)
+    reports = Network.analyze(networks, continuous=2, with_server_overload=False, nested=True)
+    assert [report.subnet for report in reports] == [network.subnet_ipaddress for network in networks]
+    assert reports[0].switch_downtimes == (
+        Server.Incident(
+            ipaddress.IPv4Network("10.20.0.0/16"),
+            Network.SWITCH_DOWN_LABEL,
+            DT.datetime(2020, 10, 19, 13, 31, 26),
+            DT.datetime(2020, 10, 19, 13, 31, 28),
+        ),
+    )
+    for report, network in zip(reports, networks):
+        assert report.servers == tuple(server.analyze(2, with_overload=False) for server in network.servers)
+        assert all(server_report.overloads == () for server_report in report.servers)
+        assert report.incidents[0].start == min(
+            incident.start for incident in report.switch_downtimes + report.servers[0].downtimes
+        )
+
+    with pytest.raises(ValueError) as e:
+        Network.analyze(networks, continuous=0)
+    assert str(e.value) == "continuous must over 0 (now 0)"
+
+
+def test_compact_network_01():
+    network = Network.Network(ipaddress.IPv4Network("10.20.0.0/16"))
+    # サブネットは整数で保持し、インスタンス辞書を持たない
+    assert not hasattr(network, "__dict__")
+    with pytest.raises(AttributeError):
+        network.unknown = 1
+    assert network.network_address == int(ipaddress.IPv4Address("10.20.0.0"))
+    assert network.prefixlen == 16
+    assert Network.Network.from_int(int(ipaddress.IPv4Address("10.20.30.1")), 16).subnet_ipaddress == (
+        network.subnet_ipaddress
+    )
+
+    server = Server.Server("10.20.30.1/16")
+    assert network.is_inside_network_ip(server)
+    assert not network.is_inside_network_ip(Server.Server("10.21.30.1/16"))
+    network.add_server(server)
+    assert network.get_server(server.address) is server
+    assert network.get_server("10.20.30.1") is server
+    assert network.get_server("10.20.30.2") is None
+
+
+def test_time_range_01():
+    file_path = "test_case/003_03.csv"
+    networks = Network.load_data(file_path=file_path)
+    since = DT.datetime(2020, 10, 19, 13, 31, 50)
+    until = DT.datetime(2020, 10, 19, 13, 32, 0)
+    assert networks[0].get_network_downtime(2, since=since, until=until) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 55), DT.datetime(2020, 10, 19, 13, 31, 59)),
+    ]
+    downtimes = Network.NetworkTree(networks).get_switch_downtimes(2, since=since, until=until)
+    assert downtimes[networks[0].subnet_ipaddress] == networks[0].get_network_downtime(2, since=since, until=until)
+
+    report = Network.analyze(networks, continuous=2, since=since, until=until)[0]
+    assert all(incident.start <= until for incident in report.incidents)
+    assert all(incident.end is None or incident.end >= since for incident in report.incidents)
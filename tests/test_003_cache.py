@@ -0,0 +1,120 @@
+import os
+import shutil
+
+import pytest
+
+from fixpoint_coding_test import Cache, Network, Server
+
+
+def test_cache_roundtrip_01(tmp_path):
+    file_path = str(tmp_path / "003_03.csv")
+    shutil.copyfile("test_case/003_03.csv", file_path)
+
+    columns = Server.load_columns(file_path)
+    Cache.write_cache(file_path, columns)
+    cached_columns = Cache.read_cache(file_path)
+
+    assert cached_columns is not None
+    assert list(cached_columns.keys()) == list(columns.keys())
+    for address, (timestamps, responses) in columns.items():
+        cached_timestamps, cached_responses = cached_columns[address]
+        assert isinstance(cached_timestamps, memoryview)
+        assert list(cached_timestamps) == list(timestamps)
+        assert list(cached_responses) == list(responses)
+
+
+def test_cache_invalidate_01(tmp_path):
+    file_path = str(tmp_path / "000_00.csv")
+    shutil.copyfile("test_case/000_00.csv", file_path)
+    assert Cache.read_cache(file_path) is None
+
+    Server.load_data(file_path, cache=True)
+    assert os.path.exists(Cache.cache_path(file_path))
+    assert Cache.read_cache(file_path) is not None
+
+    # ログデータが更新された場合、キャッシュは無効となる
+    with open(file_path, "a") as f:
+        f.write("\n20201019133125,10.20.30.1/16,-\n")
+    assert Cache.read_cache(file_path) is None
+
+    servers = Server.load_data(file_path, cache=True)
+    assert len(servers["10.20.30.1"].ping_results) == 2
+
+
+def test_load_data_cache_01(tmp_path):
+    file_path = str(tmp_path / "003_03.csv")
+    shutil.copyfile("test_case/003_03.csv", file_path)
+    servers = Server.load_data(file_path)
+
+    for _ in range(2):  # 1度目はキャッシュの作成、2度目はキャッシュからの読み込み
+        servers_cached = Server.load_data(file_path, cache=True)
+        assert servers_cached.keys() == servers.keys()
+        for ip_address, server in servers.items():
+            assert servers_cached[ip_address].ping_results == server.ping_results
+            assert servers_cached[ip_address].get_downtimes(2) == server.get_downtimes(2)
+            assert servers_cached[ip_address].get_overload_times(5, 60) == server.get_overload_times(5, 60)
+
+    # キャッシュから読み込んだサーバーにも追記できる
+    servers_cached["10.20.30.1"].append_ping_results("20201019140000", 10)
+    assert len(servers_cached["10.20.30.1"].ping_results) == len(servers["10.20.30.1"].ping_results) + 1
+
+
+def test_load_network_cache_01(tmp_path):
+    file_paths = []
+    for name in ["004_02_01.csv", "004_02_02.csv"]:
+        file_paths.append(str(tmp_path / name))
+        shutil.copyfile(f"test_case/{name}", file_paths[-1])
+    networks = Network.load_data(file_paths[0])
+    networks = Network.load_data(file_paths[1], networks=networks)
+
+    for _ in range(2):
+        networks_cached = Network.load_data(file_paths[0], cache=True)
+        networks_cached = Network.load_data(file_paths[1], networks=networks_cached, cache=True)
+        assert [network.subnet_ipaddress for network in networks_cached] == [
+            network.subnet_ipaddress for network in networks
+        ]
+        for network, network_cached in zip(networks, networks_cached):
+            assert [server.ip_address for server in network_cached.servers] == [
+                server.ip_address for server in network.servers
+            ]
+            assert network_cached.get_network_downtime() == network.get_network_downtime()
+
+
+def test_load_data_cache_unwritable_01(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "003_03.csv")
+    shutil.copyfile("test_case/003_03.csv", file_path)
+    servers = Server.load_data(file_path)
+
+    def _open(path, mode="r", *args, **kwargs):
+        if "w" in mode:
+            raise OSError(28, "No space left on device")
+        return open(path, mode, *args, **kwargs)
+
+    # キャッシュを書き込めない場合も、パース結果から読み込む
+    monkeypatch.setattr(Cache, "open", _open, raising=False)
+    with pytest.raises(OSError):
+        Cache.write_cache(file_path, Server.load_columns(file_path))
+    servers_cached = Server.load_data(file_path, cache=True)
+    assert servers_cached.keys() == servers.keys()
+    for ip_address, server in servers.items():
+        assert servers_cached[ip_address].ping_results == server.ping_results
+    assert not os.path.exists(Cache.cache_path(file_path))
+    assert os.listdir(tmp_path) == ["003_03.csv"]
+
+
+def test_cache_non_ascii_01(tmp_path):
+    file_path = str(tmp_path / "non_ascii.csv")
+    with open(file_path, "w") as f:
+        f.write("datetime,server address,response time\n")
+        f.write("20201019133125,１0.20.30.1/16,2\n")
+        f.write("20201019133126,10.20.30.2/16,-\n")
+
+    # ASCII以外の文字を含むインターフェース文字列も、キャッシュに書き込んで読み直せる
+    columns = Server.load_columns(file_path)
+    for _ in range(2):
+        cached_columns = Server.load_columns(file_path, cache=True)
+        assert cached_columns.keys() == columns.keys()
+        for address, (timestamps, responses) in columns.items():
+            assert list(cached_columns[address][0]) == list(timestamps)
+            assert list(cached_columns[address][1]) == list(responses)
+    assert os.path.exists(Cache.cache_path(file_path))
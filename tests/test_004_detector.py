@@ -0,0 +1,82 @@
+import datetime as DT
+from typing import List, Optional, Tuple
+
+import pytest
+
+from fixpoint_coding_test import Detector, Server
+
+
+def _replay(detector, server: Server.Server) -> List[Tuple[DT.datetime, Optional[DT.datetime]]]:
+    """
+    サーバーの応答ログを検出器に順に与え、出力されたイベントを区間に変換する
+    """
+
+    events = []
+    for datetime, response_msec in server.ping_results.items():
+        events.extend(detector.feed(Server.datetime_to_epoch(datetime), response_msec))
+    events.extend(detector.pending_events())
+
+    intervals: List[Tuple[DT.datetime, Optional[DT.datetime]]] = []
+    for event in events:
+        assert event.label == detector.label
+        if event.kind == Detector.EVENT_OPEN:
+            intervals.append((event.time, None))
+        else:
+            assert intervals[-1][1] is None
+            intervals[-1] = (intervals[-1][0], event.time)
+    return intervals
+
+
+@pytest.mark.parametrize("file_path", ["test_case/002.csv", "test_case/003_03.csv", "test_case/004_01_01.csv"])
+def test_downtime_detector_01(file_path):
+    servers = Server.load_data(file_path=file_path)
+    for server in servers.values():
+        for continuous in range(1, 8):
+            detector = Detector.DowntimeDetector(continuous=continuous)
+            assert _replay(detector, server) == server.get_downtimes(continuous=continuous)
+
+
+@pytest.mark.parametrize("file_path", ["test_case/003_01.csv", "test_case/003_03.csv", "test_case/004_02_01.csv"])
+def test_overload_detector_01(file_path):
+    servers = Server.load_data(file_path=file_path)
+    for server in servers.values():
+        for continuous in range(1, 8):
+            for time_threshold in [1, 60, 80, 100, 150]:
+                detector = Detector.OverloadDetector(continuous=continuous, time_threshold=time_threshold)
+                assert _replay(detector, server) == server.get_overload_times(
+                    continuous=continuous, time_threshold=time_threshold
+                )
+
+
+def test_overload_detector_pending_01():
+    detector = Detector.OverloadDetector(continuous=3, time_threshold=100)
+    assert detector.feed(0, 10) == []
+    # タイムアウトは、ダウン扱いになるかどうかが決まるまで判定を保留する
+    assert detector.feed(1, Server.Server.TIMEOUT_SYMBOL) == []
+    assert detector.pending_events() == [
+        Detector.DetectorEvent(Detector.EVENT_OPEN, Detector.OVERLOAD_LABEL, Server.epoch_to_datetime(1))
+    ]
+    assert detector.feed(2, 10) == [
+        Detector.DetectorEvent(Detector.EVENT_OPEN, Detector.OVERLOAD_LABEL, Server.epoch_to_datetime(1)),
+        Detector.DetectorEvent(Detector.EVENT_CLOSE, Detector.OVERLOAD_LABEL, Server.epoch_to_datetime(2)),
+    ]
+    assert detector.open_since is None
+
+
+def test_detector_error_01():
+    with pytest.raises(ValueError):
+        Detector.DowntimeDetector(continuous=0)
+    with pytest.raises(ValueError):
+        Detector.OverloadDetector(time_threshold=0)
+
+    detector = Detector.DowntimeDetector()
+    detector.feed(10, 1)
+    with pytest.raises(ValueError):
+        detector.feed(10, 1)
+
+    # `_feed`を実装していない検出器は生成できない
+    class _Incomplete(Detector._Detector):
+        label = "incomplete"
+
+    with pytest.raises(TypeError):
+        _Incomplete()
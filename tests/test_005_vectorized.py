@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from fixpoint_coding_test import Server, Vectorized
+
+
+def _random_servers(seed: int):
+    generator = random.Random(seed)
+    servers = {}
+    base = Server.parse_epoch("20201019000000")
+    for n in range(30):
+        server = Server.Server(ip_address=f"10.20.0.{n + 1}/16")
+        timeout_rate = generator.choice([0.0, 0.1, 0.4, 0.8])
+        for i in range(generator.randint(0, 60)):
+            response = Server.Server.TIMEOUT_SYMBOL if generator.random() < timeout_rate else generator.randint(1, 200)
+            server.append_ping_epoch(base + i, response)
+        servers[str(server.ip_address.ip)] = server
+    return servers
+
+
+@pytest.mark.parametrize("file_path", ["test_case/002.csv", "test_case/003_03.csv", "test_case/004_02_01.csv"])
+def test_vectorized_downtimes_01(file_path):
+    pytest.importorskip("numpy")
+    servers = Server.load_data(file_path=file_path)
+    for continuous in range(1, 8):
+        assert Vectorized.get_downtimes(servers, continuous=continuous) == {
+            key: server.get_downtimes(continuous=continuous) for key, server in servers.items()
+        }
+
+
+def test_vectorized_random_01():
+    pytest.importorskip("numpy")
+    for seed in range(10):
+        servers = _random_servers(seed)
+        for continuous in range(1, 6):
+            assert Vectorized.get_downtimes(servers, continuous=continuous) == {
+                key: server.get_downtimes(continuous=continuous) for key, server in servers.items()
+            }
+            for time_threshold in [50, 100, 150]:
+                assert Vectorized.get_overload_times(servers, continuous, time_threshold) == {
+                    key: server.get_overload_times(continuous, time_threshold) for key, server in servers.items()
+                }
+
+
+def test_vectorized_downtimes_multi_01():
+    pytest.importorskip("numpy")
+    for seed in range(5):
+        servers = _random_servers(seed)
+        assert Vectorized.get_downtimes_multi(servers, range(1, 8)) == Server.get_downtimes_multi(servers, range(1, 8))
+
+
+def test_vectorized_overload_grid_01():
+    pytest.importorskip("numpy")
+    for seed in range(5):
+        servers = _random_servers(seed)
+        assert Vectorized.get_overload_grid(servers, range(1, 6), [30, 50, 100, 150]) == Server.get_overload_grid(
+            servers, range(1, 6), [30, 50, 100, 150]
+        )
+
+
+def test_vectorized_retention_01():
+    pytest.importorskip("numpy")
+    for seed in range(5):
+        servers = _random_servers(seed)
+        for n, server in enumerate(servers.values()):
+            server.set_retention(Server.RetentionPolicy(max_samples=5 + n, continuous=3, time_threshold=100))
+        assert any(server.retention_carry is not None for server in servers.values())
+        for continuous in range(1, 6):
+            assert Vectorized.get_downtimes(servers, continuous=continuous) == {
+                key: server.get_downtimes(continuous=continuous) for key, server in servers.items()
+            }
+            for time_threshold in [50, 100, 150]:
+                assert Vectorized.get_overload_times(servers, continuous, time_threshold) == {
+                    key: server.get_overload_times(continuous, time_threshold) for key, server in servers.items()
+                }
+        assert Vectorized.get_downtimes_multi(servers, range(1, 8)) == Server.get_downtimes_multi(servers, range(1, 8))
+        assert Vectorized.get_overload_grid(servers, range(1, 6), [30, 50, 100, 150]) == Server.get_overload_grid(
+            servers, range(1, 6), [30, 50, 100, 150]
+        )
+
+
+def test_vectorized_fallback_01(monkeypatch: pytest.MonkeyPatch):
+    servers = Server.load_data(file_path="test_case/003_01.csv")
+    monkeypatch.setattr(Vectorized, "np", None)
+    assert not Vectorized.has_numpy()
+    assert Vectorized.get_overload_times(servers, continuous=5, time_threshold=80) == {
+        key: server.get_overload_times(continuous=5, time_threshold=80) for key, server in servers.items()
+    }
+    assert Vectorized.get_downtimes_multi(servers, [1, 2]) == Server.get_downtimes_multi(servers, [1, 2])
+    assert Vectorized.get_overload_grid(servers, [1, 5], [80]) == Server.get_overload_grid(servers, [1, 5], [80])
+
+
+def test_vectorized_error_01():
+    with pytest.raises(ValueError):
+        Vectorized.get_downtimes({}, continuous=0)
+    with pytest.raises(ValueError):
+        Vectorized.get_overload_times({}, time_threshold=0)
+    assert Vectorized.get_downtimes({}) == {}
+    # 閾値の並びの検査はサーバーごとの処理と共通で、同じメッセージを返す
+    with pytest.raises(ValueError) as e:
+        Vectorized.get_downtimes_multi({}, [3, 0])
+    assert str(e.value) == "continuous must over 0 (now 0)"
+    with pytest.raises(ValueError) as e:
+        Vectorized.get_overload_grid({}, [3], [100, -1])
+    assert str(e.value) == "time_threshold must over 0 (now -1)"
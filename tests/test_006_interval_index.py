@@ -0,0 +1,110 @@
+import datetime as DT
+import ipaddress
+import random
+
+import pytest
+
+from fixpoint_coding_test import Detector, IntervalIndex, Network, Server
+
+
+def _t(minute: int, second: int) -> DT.datetime:
+    return DT.datetime(2020, 10, 19, 13, minute, second)
+
+
+@pytest.mark.parametrize("file_path", ["test_case/003_03.csv", "test_case/004_01_01.csv", "test_case/004_02_01.csv"])
+def test_interval_index_at_01(file_path):
+    servers = Server.load_data(file_path=file_path)
+    index = IntervalIndex.IntervalIndex(servers.values(), continuous=2, time_threshold=100)
+
+    incidents = []
+    for server in servers.values():
+        incidents.extend(
+            (server.ip_address, Detector.DOWNTIME_LABEL, start, end) for start, end in server.get_downtimes(2)
+        )
+        incidents.extend(
+            (server.ip_address, Detector.OVERLOAD_LABEL, start, end)
+            for start, end in server.get_overload_times(2, 100)
+        )
+    assert len(index) == len(incidents)
+
+    # 全ての日時について、各サーバーの区間を直接調べた結果と一致する
+    for second in range(-5, 120):
+        time = _t(31, 0) + DT.timedelta(seconds=second)
+        expected = sorted(incident for incident in incidents if Network.is_overlap_time(time, time, *incident[2:]))
+        assert sorted(index.at(time)) == expected
+
+
+def test_interval_index_between_01():
+    servers = Server.load_data(file_path="test_case/004_01_01.csv")
+    index = IntervalIndex.IntervalIndex(servers.values(), continuous=3, with_overload=False)
+    address = ipaddress.IPv4Interface("10.20.30.1/16")
+
+    assert index.between(_t(31, 30), _t(31, 40)) == [
+        IntervalIndex.Incident(address, Detector.DOWNTIME_LABEL, _t(31, 26), _t(31, 31)),
+        IntervalIndex.Incident(address, Detector.DOWNTIME_LABEL, _t(31, 39), _t(31, 43)),
+    ]
+    assert index.between(_t(31, 32), _t(31, 38)) == []
+    # 終了日時が`None`の区間は、ログの末尾以降も継続しているものとして扱う
+    assert index.at(_t(59, 59)) == [IntervalIndex.Incident(address, Detector.DOWNTIME_LABEL, _t(32, 15), None)]
+
+    with pytest.raises(ValueError) as e:
+        index.between(_t(31, 40), _t(31, 30))
+    assert str(e.value) == "end must be after start (start: 2020-10-19 13:31:40, end: 2020-10-19 13:31:30)"
+
+
+def test_interval_index_refresh_01():
+    server_01 = Server.Server("10.20.30.1/16")
+    server_02 = Server.Server("10.20.30.2/16")
+    for second in range(10):
+        server_01.append_ping_results(f"2020101913310{second}", Server.Server.TIMEOUT_SYMBOL)
+        server_02.append_ping_results(f"2020101913310{second}", 1)
+    index = IntervalIndex.IntervalIndex([server_01, server_02], continuous=3, with_overload=False)
+    assert [incident.address for incident in index.at(_t(31, 5))] == [server_01.ip_address]
+
+    # 応答ログが追加されたサーバーのみ、区間を再検出する
+    for second in range(10, 13):
+        server_02.append_ping_results(f"202010191331{second}", Server.Server.TIMEOUT_SYMBOL)
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+    assert [incident.address for incident in index.at(_t(31, 12))] == [server_01.ip_address, server_02.ip_address]
+    assert index.at(_t(31, 12))[1].start == _t(31, 10)
+
+
+def test_interval_index_refresh_02():
+    rng = random.Random(0)
+    servers = [Server.Server(f"10.20.30.{i + 1}/16") for i in range(5)]
+    index = IntervalIndex.IntervalIndex(servers, continuous=2, time_threshold=100)
+    epoch = Server.datetime_to_epoch(_t(0, 0))
+    rebuilds = 0
+    for second in range(300):
+        for server in servers:
+            response = Server.Server.TIMEOUT_SYMBOL if rng.random() < 0.3 else rng.randint(0, 200)
+            server.append_ping_epoch(epoch + second, response)
+        if second % 20 != 19:
+            continue
+        tree = index._tree
+        index.refresh()
+        # 増減した区間のみを反映した索引は、初めから構築した索引と一致する
+        expected = IntervalIndex.IntervalIndex(servers, continuous=2, time_threshold=100)
+        assert len(index) == len(expected)
+        rebuilds += index._tree is not tree
+        for probe in range(0, second + 2, 3):
+            time = _t(0, 0) + DT.timedelta(seconds=probe)
+            assert index.at(time) == expected.at(time)
+            assert index.between(time, time + DT.timedelta(seconds=7)) == expected.between(
+                time, time + DT.timedelta(seconds=7)
+            )
+    # 区間木を構築し直すのは、追加した区間の数が総数を超えた場合のみとなる
+    assert rebuilds <= 5
+
+
+def test_interval_index_error_01():
+    with pytest.raises(ValueError) as e:
+        IntervalIndex.IntervalIndex([], continuous=0)
+    assert str(e.value) == "continuous must over 0 (now 0)"
+
+    with pytest.raises(ValueError) as e:
+        IntervalIndex.IntervalIndex([], time_threshold=0)
+    assert str(e.value) == "time_threshold must over 0 (now 0)"
+
+    assert IntervalIndex.IntervalIndex([]).at(_t(31, 0)) == []
@@ -0,0 +1,204 @@
+import asyncio
+import datetime as DT
+import ipaddress
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from fixpoint_coding_test import Detector, Follower, Network, Server
+
+
+def _to_intervals(
+    events: List[Follower.IncidentEvent],
+) -> Dict[Tuple[object, str], List[Tuple[DT.datetime, Optional[DT.datetime]]]]:
+    """
+    イベントを、IPアドレスと種類ごとの区間に変換する
+    """
+
+    intervals: Dict[Tuple[object, str], List[Tuple[DT.datetime, Optional[DT.datetime]]]] = {}
+    for event in events:
+        key = (event.address, event.label)
+        if event.kind == Detector.EVENT_OPEN:
+            intervals.setdefault(key, []).append((event.time, None))
+        else:
+            assert intervals[key][-1][1] is None
+            intervals[key][-1] = (intervals[key][-1][0], event.time)
+    return intervals
+
+
+@pytest.mark.parametrize("file_path", ["test_case/003_03.csv", "test_case/004_01_01.csv", "test_case/004_02_02.csv"])
+def test_read_available_01(tmp_path, file_path):
+    with open(file_path, "rb") as f:
+        data = f.read()
+    log_path = tmp_path / "ping.csv"
+    follower = Follower.LogFollower([str(log_path)], continuous=2, time_threshold=100)
+    # ファイルが作成されるまでは何も読み込まない
+    assert follower.read_available() == []
+
+    # 行の途中で区切りながら追記する
+    events: List[Follower.IncidentEvent] = []
+    for start in range(0, len(data), 37):
+        with open(log_path, "ab") as f:
+            f.write(data[start : start + 37])
+        events.extend(follower.read_available())
+
+    intervals = _to_intervals(events)
+    for network in Network.load_data(file_path=file_path):
+        assert intervals.get((network.subnet_ipaddress, Network.SWITCH_DOWN_LABEL), []) == (
+            network.get_network_downtime(continuous=2)
+        )
+        for server in network.servers:
+            assert intervals.get((server.ip_address, Server.DOWNTIME_LABEL), []) == server.get_downtimes(2)
+            assert intervals.get((server.ip_address, Server.OVERLOAD_LABEL), []) == server.get_overload_times(2, 100)
+
+    # 読み込んだログはネットワークのデータに登録される
+    def _dump(networks: List[Network.Network]):
+        return [
+            [(server.ip_address, list(server.ping_results.items())) for server in network.servers]
+            for network in networks
+        ]
+
+    assert _dump(follower.networks) == _dump(Network.load_data(file_path=file_path))
+
+
+def test_read_available_partial_line_01(tmp_path):
+    log_path = tmp_path / "ping.csv"
+    log_path.write_text("datetime,server address,response time\n20201019133124,10.20.30.1/16,-")
+    follower = Follower.LogFollower([str(log_path)], continuous=1)
+    # 改行まで書き込まれていない行は処理しない
+    assert follower.read_available() == []
+    assert follower.networks == []
+
+    with open(log_path, "a") as f:
+        f.write("\n20201019133125,10.20.30.1/16,2\n")
+    address = ipaddress.IPv4Interface("10.20.30.1/16")
+    start, end = DT.datetime(2020, 10, 19, 13, 31, 24), DT.datetime(2020, 10, 19, 13, 31, 25)
+    assert follower.read_available() == [
+        Follower.IncidentEvent(Detector.EVENT_OPEN, Server.DOWNTIME_LABEL, address, start),
+        Follower.IncidentEvent(Detector.EVENT_OPEN, Network.SWITCH_DOWN_LABEL, address.network, start),
+        Follower.IncidentEvent(Detector.EVENT_CLOSE, Server.DOWNTIME_LABEL, address, end),
+        Follower.IncidentEvent(Detector.EVENT_CLOSE, Network.SWITCH_DOWN_LABEL, address.network, end),
+    ]
+    assert len(follower.networks[0].servers[0].ping_results) == 2
+
+
+def test_run_01(tmp_path):
+    log_paths = [tmp_path / "collector_0.csv", tmp_path / "collector_1.csv"]
+    rows = [
+        ["20201019133124,10.20.30.1/16,-\n", "20201019133125,10.20.30.1/16,-\n", "20201019133126,10.20.30.1/16,5\n"],
+        ["20201019133124,192.168.1.1/24,500\n", "20201019133125,192.168.1.1/24,500\n"],
+    ]
+
+    async def _write() -> None:
+        for log_path in log_paths:
+            log_path.write_text("datetime,server address,response time\n")
+        for i in range(3):
+            for log_path, lines in zip(log_paths, rows):
+                if i < len(lines):
+                    with open(log_path, "a") as f:
+                        f.write(lines[i])
+            await asyncio.sleep(0.02)
+
+    async def _main() -> List[Follower.IncidentEvent]:
+        follower = Follower.LogFollower([str(log_path) for log_path in log_paths], continuous=2, poll_interval=0.01)
+        task = asyncio.create_task(follower.run())
+        await _write()
+        events: List[Follower.IncidentEvent] = []
+        async for event in follower.events():
+            events.append(event)
+            if len(events) == 5:
+                follower.stop()
+        await task
+        return events
+
+    events = asyncio.run(asyncio.wait_for(_main(), timeout=10))
+    intervals = _to_intervals(events)
+    assert intervals == {
+        (ipaddress.IPv4Interface("10.20.30.1/16"), Server.DOWNTIME_LABEL): [
+            (DT.datetime(2020, 10, 19, 13, 31, 24), DT.datetime(2020, 10, 19, 13, 31, 26))
+        ],
+        (ipaddress.IPv4Network("10.20.0.0/16"), Network.SWITCH_DOWN_LABEL): [
+            (DT.datetime(2020, 10, 19, 13, 31, 24), DT.datetime(2020, 10, 19, 13, 31, 26))
+        ],
+        (ipaddress.IPv4Interface("192.168.1.1/24"), Server.OVERLOAD_LABEL): [
+            (DT.datetime(2020, 10, 19, 13, 31, 24), None)
+        ],
+    }
+
+
+def test_read_bounded_01(tmp_path):
+    file_path = "test_case/004_02_02.csv"
+    with open(file_path, "rb") as f:
+        data = f.read()
+    # 1度に読み込むバイト数を制限しても、行の途中で区切られた分は次の読み込みに持ち越す
+    tail = Follower._Tail(file_path, max_bytes=50)
+    lines: List[str] = []
+    reads = 0
+    while True:
+        chunk_lines = tail.read_lines()
+        reads += 1
+        assert len(chunk_lines) <= 2
+        lines.extend(chunk_lines)
+        if not tail.has_more:
+            break
+    assert reads >= len(data) // 50
+    assert lines == data.decode().splitlines()[1:]
+
+    follower = Follower.LogFollower([file_path], continuous=2)
+    bounded = Follower.LogFollower([file_path], continuous=2, max_read_bytes=50)
+    assert bounded.read_available() == follower.read_available()
+
+
+def test_read_available_preloaded_01(tmp_path):
+    # 既存のサーバーがダウンしたまま終わっている場合、追跡したサーバーのダウンでスイッチのダウンが開始する
+    preload_path = tmp_path / "preload.csv"
+    preload_path.write_text(
+        "datetime,server address,response time\n"
+        "20201019133120,10.20.30.1/16,1\n"
+        "20201019133120,10.20.30.2/16,1\n"
+        "20201019133121,10.20.30.1/16,-\n"
+        "20201019133121,10.20.30.2/16,1\n"
+        "20201019133122,10.20.30.1/16,-\n"
+    )
+    log_path = tmp_path / "ping.csv"
+    log_path.write_text(
+        "datetime,server address,response time\n"
+        "20201019133122,10.20.30.2/16,-\n"
+        "20201019133123,10.20.30.2/16,-\n"
+        "20201019133124,10.20.30.1/16,1\n"
+    )
+    networks = Network.load_data(str(preload_path))
+    follower = Follower.LogFollower([str(log_path)], networks=networks, continuous=2)
+
+    subnet = ipaddress.IPv4Network("10.20.0.0/16")
+    server_01, server_02 = ipaddress.IPv4Interface("10.20.30.1/16"), ipaddress.IPv4Interface("10.20.30.2/16")
+    # 既存の応答ログで確定した区間(10.20.30.1 のダウンの開始)はイベントとして出力しない
+    assert follower.read_available() == [
+        Follower.IncidentEvent(
+            Detector.EVENT_OPEN, Server.DOWNTIME_LABEL, server_02, DT.datetime(2020, 10, 19, 13, 31, 22)
+        ),
+        Follower.IncidentEvent(
+            Detector.EVENT_OPEN, Network.SWITCH_DOWN_LABEL, subnet, DT.datetime(2020, 10, 19, 13, 31, 22)
+        ),
+        Follower.IncidentEvent(
+            Detector.EVENT_CLOSE, Server.DOWNTIME_LABEL, server_01, DT.datetime(2020, 10, 19, 13, 31, 24)
+        ),
+        Follower.IncidentEvent(
+            Detector.EVENT_CLOSE, Network.SWITCH_DOWN_LABEL, subnet, DT.datetime(2020, 10, 19, 13, 31, 24)
+        ),
+    ]
+    assert follower.networks[0].get_network_downtime(continuous=2) == [
+        (DT.datetime(2020, 10, 19, 13, 31, 22), DT.datetime(2020, 10, 19, 13, 31, 24))
+    ]
+
+
+def test_follower_error_01():
+    with pytest.raises(ValueError) as e:
+        Follower.LogFollower([], continuous=0)
+    assert str(e.value) == "continuous must over 0 (now 0)"
+    with pytest.raises(ValueError) as e:
+        Follower.LogFollower([], poll_interval=0)
+    assert str(e.value) == "poll_interval must over 0 (now 0)"
+    with pytest.raises(ValueError) as e:
+        Follower.LogFollower([], max_read_bytes=0)
+    assert str(e.value) == "max_read_bytes must over 0 (now 0)"
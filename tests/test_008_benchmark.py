@@ -0,0 +1,72 @@
+import ipaddress
+import json
+
+import pytest
+
+from fixpoint_coding_test import Benchmark, Network, Server
+
+
+def test_server_addresses_01():
+    assert Benchmark.server_addresses(servers=4, subnets=2) == [
+        "10.0.0.1/24",
+        "10.0.1.1/24",
+        "10.0.0.2/24",
+        "10.0.1.2/24",
+    ]
+    # 多段のサブネットでは、`/16`のサブネットが他の`/24`のサブネットを包含する
+    addresses = Benchmark.server_addresses(servers=4, subnets=2, nested=True)
+    assert addresses[0] == "10.0.0.1/16"
+    assert ipaddress.IPv4Interface(addresses[1]).network.subnet_of(ipaddress.IPv4Interface(addresses[0]).network)
+
+    with pytest.raises(ValueError) as e:
+        Benchmark.server_addresses(servers=2, subnets=3)
+    assert str(e.value) == "subnets must be in 1 ~ 2 (now 3)"
+
+
+def test_generate_log_01(tmp_path):
+    file_path = str(tmp_path / "bench.csv")
+    kwargs = dict(servers=20, subnets=4, timeout_rate=0.05, overload_rate=0.05, switch_down_rate=0.02, seed=3)
+    assert Benchmark.generate_log(file_path, 5003, **kwargs) == 5003
+    with open(file_path) as f:
+        first = f.read()
+    # 同じ引数であれば同じ内容となる
+    Benchmark.generate_log(file_path, 5003, **kwargs)
+    with open(file_path) as f:
+        assert f.read() == first
+
+    servers = Server.load_data(file_path=file_path)
+    assert len(servers) == 20
+    assert sum(len(server.ping_results) for server in servers.values()) == 5003
+    assert any(len(server.get_downtimes(continuous=3)) != 0 for server in servers.values())
+    assert any(len(server.get_overload_times(continuous=3)) != 0 for server in servers.values())
+    networks = Network.load_data(file_path=file_path)
+    assert len(networks) == 4
+    assert any(len(network.get_network_downtime(continuous=3)) != 0 for network in networks)
+
+
+def test_run_benchmarks_01(tmp_path):
+    records = Benchmark.run_benchmarks([10, 200], servers=8, subnets=2, nested=True, work_dir=str(tmp_path))
+    stages = [
+        "generate",
+        "server_load_data",
+        "get_downtimes",
+        "get_overload_times",
+        "network_load_data",
+        "get_network_downtime",
+        "get_switch_downtimes",
+    ]
+    assert [(record["rows"], record["stage"]) for record in records] == [
+        (rows, stage) for rows in [10, 200] for stage in stages
+    ]
+    assert all(record["peak_memory_bytes"] > 0 for record in records)
+    assert json.loads(json.dumps(records)) == records
+    # 生成したログデータは測定後に削除される
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_benchmark_main_01(capfd: pytest.CaptureFixture):
+    Benchmark.main(["--sizes", "50", "--servers", "5", "--subnets", "1", "--no-trace-memory"])
+    out, _ = capfd.readouterr()
+    records = json.loads(out)
+    assert {record["stage"] for record in records} >= {"server_load_data", "get_network_downtime"}
+    assert all(record["peak_memory_bytes"] is None for record in records)
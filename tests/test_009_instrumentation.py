@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+
+from fixpoint_coding_test import Instrumentation, Network, Server
+
+
+def test_record_01():
+    file_path = "test_case/004_01_01.csv"
+    with Instrumentation.record() as stats:
+        assert Instrumentation.is_enabled()
+        networks = Network.load_data(file_path=file_path)
+        for network in networks:
+            network.get_network_downtime(continuous=2)
+            for server in network.servers:
+                server.get_overload_times(continuous=2, time_threshold=100)
+    assert not Instrumentation.is_enabled()
+
+    rows = sum(len(server.ping_results) for network in networks for server in network.servers)
+    assert stats.counters["rows_parsed"] == rows
+    assert stats.counters["rows_skipped"] == 0
+    assert stats.counters["downtime_intervals"] == sum(
+        len(server.get_downtimes(2)) for network in networks for server in network.servers
+    )
+    assert stats.counters["overload_intervals"] == sum(
+        len(server.get_overload_times(2, 100)) for network in networks for server in network.servers
+    )
+    assert stats.counters["network_intervals"] == sum(len(network.get_network_downtime(2)) for network in networks)
+    assert set(stats.seconds) == {"load", "parse", "register", "ip", "downtime", "overload", "intersect"}
+    assert stats.calls["load"] == 1
+    assert stats.seconds["load"] >= stats.seconds["parse"]
+
+    out = io.StringIO()
+    stats.dump(out)
+    assert json.loads(out.getvalue()) == stats.as_dict()
+
+
+def test_record_rejected_01(tmp_path):
+    file_path = tmp_path / "ping.csv"
+    file_path.write_text("datetime,server address,response time\n20201019133124,10.20.30.1/16,1\n\n20201019,1\n")
+    with Instrumentation.record() as stats:
+        with pytest.raises(ValueError):
+            Server.load_data(file_path=str(file_path))
+    assert stats.counters["rows_rejected"] == 1
+    assert "rows_parsed" not in stats.counters
+
+
+def test_hook_01():
+    events = []
+
+    def _hook(event: str, name: str, value: float) -> None:
+        events.append((event, name, value))
+
+    server = Server.Server(ip_address="10.20.30.1/16")
+    for timestamp, response in [(2, Server.Server.TIMEOUT_SYMBOL), (1, 10), (3, 10)]:
+        server.append_ping_epoch(timestamp, response)
+
+    Instrumentation.enable(_hook)
+    try:
+        server.get_downtimes()
+    finally:
+        Instrumentation.disable(_hook)
+    assert [(event, name) for event, name, _ in events] == [
+        (Instrumentation.EVENT_TIME, "sort"),
+        (Instrumentation.EVENT_TIME, "downtime"),
+        (Instrumentation.EVENT_COUNT, "downtime_intervals"),
+    ]
+    assert events[-1][2] == 1
+
+    # 無効な間は何も記録しない
+    events.clear()
+    server.get_downtimes(continuous=2)
+    Instrumentation.count("rows_parsed")
+    with Instrumentation.stage("parse"):
+        pass
+    assert events == []
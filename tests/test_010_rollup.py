@@ -0,0 +1,89 @@
+import datetime as DT
+
+import pytest
+
+from fixpoint_coding_test import Rollup, Server
+
+
+def _brute_summary(server: Server.Server, since: DT.datetime, until: DT.datetime) -> Rollup.LatencySummary:
+    responses = [response for datetime, response in server.ping_results.items() if since <= datetime <= until]
+    valid = [response for response in responses if response != Server.Server.TIMEOUT_SYMBOL]
+    return Rollup.LatencySummary(
+        len(responses),
+        len(responses) - len(valid),
+        min(valid) if len(valid) != 0 else None,
+        max(valid) if len(valid) != 0 else None,
+        sum(valid),
+    )
+
+
+def test_latency_summary_01():
+    file_path = "test_case/003_03.csv"
+    server = Server.load_data(file_path=file_path)["10.20.30.1"]
+    summary = server.get_latency_summary()
+    assert summary == _brute_summary(server, DT.datetime.min, DT.datetime.max)
+    assert summary.mean_msec == summary.sum_msec / (summary.samples - summary.timeouts)
+
+    since = DT.datetime(2020, 10, 19, 13, 31, 30)
+    until = DT.datetime(2020, 10, 19, 13, 32, 5)
+    assert server.get_latency_summary(since, until) == _brute_summary(server, since, until)
+    assert Server.get_latency_summaries({"10.20.30.1": server}, since, until) == {
+        "10.20.30.1": server.get_latency_summary(since, until)
+    }
+
+    # 有効な応答が無い期間
+    summary = server.get_latency_summary(DT.datetime(2020, 10, 19, 13, 31, 26), DT.datetime(2020, 10, 19, 13, 31, 27))
+    assert summary == Rollup.LatencySummary(2, 2, None, None, 0)
+    assert summary.mean_msec is None
+
+    with pytest.raises(ValueError) as e:
+        server.get_latency_summary(until, since)
+    assert str(e.value) == f"since must not be after until (since: {until}, until: {since})"
+
+
+def test_latency_summary_02():
+    # 日・時・分をまたいで追加される応答ログを、追加の度に集計に反映する
+    server = Server.Server("10.20.30.1/16")
+    start = DT.datetime(2020, 10, 19, 22, 58, 50)
+    since = start + DT.timedelta(minutes=30)
+    for i in range(0, 2 * 86400, 37):
+        server.append_ping_epoch(Server.datetime_to_epoch(start) + i, -1 if i % 5 == 0 else i % 300)
+        if i % 7400 == 0:
+            until = start + DT.timedelta(seconds=i)
+            if since <= until:
+                assert server.get_latency_summary(since, until) == _brute_summary(server, since, until)
+    until = start + DT.timedelta(days=1, hours=7)
+    assert server.get_latency_summary(since, until) == _brute_summary(server, since, until)
+
+    # 日時が前後した応答ログや同一日時の応答ログが追加されても、集計は応答ログと一致する
+    server.append_ping_results("20201020120000", 999)
+    server.append_ping_epoch(Server.datetime_to_epoch(start), 1)
+    assert server.get_latency_summary(since, until) == _brute_summary(server, since, until)
+    assert server.get_latency_summary() == _brute_summary(server, DT.datetime.min, DT.datetime.max)
+
+
+def test_latency_rollup_01():
+    server = Server.Server("10.20.30.1/16")
+    start = DT.datetime(2020, 10, 19, 22, 58, 50)
+    for i in range(0, 86400, 53):
+        server.append_ping_epoch(Server.datetime_to_epoch(start) + i, -1 if i % 3 == 0 else i % 1000)
+
+    since = DT.datetime(2020, 10, 20, 1, 30, 0)
+    until = DT.datetime(2020, 10, 20, 5, 10, 0)
+    for resolution in [60, 600, 3600, 7200, 86400]:
+        buckets = server.get_latency_rollup(resolution, since, until)
+        # 指定した日時を含む区間から、指定した日時を含む区間まで返す
+        assert buckets[0].start <= since < buckets[0].end
+        assert buckets[-1].start <= until < buckets[-1].end
+        for bucket in buckets:
+            assert bucket.end - bucket.start == DT.timedelta(seconds=resolution)
+            assert bucket.summary == _brute_summary(server, bucket.start, bucket.end - DT.timedelta(seconds=1))
+
+    daily = server.get_latency_rollup(86400)
+    assert [bucket.start for bucket in daily] == [DT.datetime(2020, 10, 19), DT.datetime(2020, 10, 20)]
+    assert sum(bucket.summary.samples for bucket in daily) == len(server.ping_results)
+    assert Server.Server("10.20.30.2/16").get_latency_rollup() == []
+
+    with pytest.raises(ValueError) as e:
+        server.get_latency_rollup(90)
+    assert str(e.value) == "resolution must be a multiple of 60 (now 90)"
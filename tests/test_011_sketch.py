@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from fixpoint_coding_test import Network, Server, Sketch
+
+
+def _exact_quantile(values, quantile):
+    values = sorted(values)
+    return values[int(quantile * (len(values) - 1))]
+
+
+def test_sketch_01():
+    rng = random.Random(0)
+    responses = [int(rng.lognormvariate(4, 1.5)) for _ in range(10000)] + [0] * 10 + [-1] * 100
+    sketch = Sketch.LatencySketch()
+    sketch.extend(responses)
+    assert sketch.count == 10010
+    assert sketch.timeouts == 100
+    valid = [response for response in responses if response != Server.Server.TIMEOUT_SYMBOL]
+    assert sketch.min_msec == 0
+    assert sketch.max_msec == max(valid)
+    for quantile, value in zip([0.0, 0.25, 0.5, 0.95, 0.99], sketch.quantiles([0.0, 0.25, 0.5, 0.95, 0.99])):
+        expected = _exact_quantile(valid, quantile)
+        assert abs(value - expected) <= expected * Sketch.RELATIVE_ACCURACY + 1e-9
+
+    # 分割して作成したスケッチを併合すると、まとめて作成したスケッチと一致する
+    first, second = Sketch.LatencySketch(), Sketch.LatencySketch()
+    first.extend(responses[:3000])
+    second.extend(responses[3000:])
+    merged = Sketch.merge_sketches([first, second])
+    assert merged.quantiles([0.5, 0.95, 0.99]) == sketch.quantiles([0.5, 0.95, 0.99])
+    assert (merged.count, merged.timeouts, merged.min_msec, merged.max_msec) == (
+        sketch.count,
+        sketch.timeouts,
+        sketch.min_msec,
+        sketch.max_msec,
+    )
+
+    empty = Sketch.LatencySketch()
+    assert empty.quantile(0.5) is None
+    assert empty.min_msec is None
+
+    with pytest.raises(ValueError) as e:
+        sketch.quantile(1.5)
+    assert str(e.value) == "quantile must be between 0 and 1 (now 1.5)"
+    with pytest.raises(ValueError) as e:
+        sketch.merge(Sketch.LatencySketch(relative_accuracy=0.05))
+    assert str(e.value) == "relative_accuracy mismatch (self: 0.01, other: 0.05)"
+    with pytest.raises(ValueError) as e:
+        Sketch.LatencySketch(relative_accuracy=0)
+    assert str(e.value) == "relative_accuracy must be between 0 and 1 (now 0)"
+
+
+def test_server_sketch_01():
+    file_path = "test_case/003_03.csv"
+    server = Server.load_data(file_path=file_path)["10.20.30.1"]
+    valid = [response for response in server.ping_results.values() if response != Server.Server.TIMEOUT_SYMBOL]
+    quantiles = server.get_latency_quantiles()
+    assert list(quantiles) == list(Sketch.DEFAULT_QUANTILES)
+    for quantile, value in quantiles.items():
+        expected = _exact_quantile(valid, quantile)
+        assert abs(value - expected) <= expected * Sketch.RELATIVE_ACCURACY + 1e-9
+
+    # 追加された応答ログはスケッチに反映される
+    sketch = server.get_latency_sketch()
+    server.append_ping_results("20201019140000", 5000)
+    assert server.get_latency_sketch().count == sketch.count + 1
+    assert server.get_latency_quantiles([1.0])[1.0] == 5000
+    # 同一日時の応答ログは後から登録されたものが優先される
+    server.append_ping_results("20201019140000", Server.Server.TIMEOUT_SYMBOL)
+    assert server.get_latency_sketch().count == sketch.count
+    assert server.get_latency_sketch().timeouts == sketch.timeouts + 1
+
+    # 返されたスケッチを変更しても、サーバーには影響しない
+    sketch.merge(server.get_latency_sketch())
+    assert server.get_latency_sketch().count != sketch.count
+
+
+def test_network_sketch_01():
+    file_path = "test_case/004_01_01.csv"
+    networks = Network.load_data(file_path=file_path)
+    for network in networks:
+        sketch = network.get_latency_sketch()
+        assert sketch.count == sum(server.get_latency_sketch().count for server in network.servers)
+        merged = Sketch.merge_sketches(server.get_latency_sketch() for server in network.servers)
+        assert network.get_latency_quantiles([0.5, 0.99]) == dict(zip([0.5, 0.99], merged.quantiles([0.5, 0.99])))
+
+    fleet = Sketch.merge_sketches(network.get_latency_sketch() for network in networks)
+    assert fleet.count == sum(network.get_latency_sketch().count for network in networks)
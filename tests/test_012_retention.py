@@ -0,0 +1,127 @@
+import datetime as DT
+import random
+from typing import List
+
+import pytest
+
+from fixpoint_coding_test import Follower, Server
+
+
+def _random_responses(rng: random.Random, size: int) -> List[int]:
+    return [Server.Server.TIMEOUT_SYMBOL if rng.random() < 0.3 else rng.randint(0, 250) for _ in range(size)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_retention_01(tmp_path, seed):
+    rng = random.Random(seed)
+    continuous, time_threshold = rng.randint(1, 5), rng.choice([50, 100, 150])
+    spill_path = str(tmp_path / "spill.csv")
+    policy = Server.RetentionPolicy(
+        max_samples=rng.randint(5, 60),
+        max_age=rng.choice([None, rng.randint(10, 200)]),
+        spill_path=spill_path,
+        continuous=continuous,
+        time_threshold=time_threshold,
+    )
+    full = Server.Server("10.20.30.1/16")
+    retained = Server.Server("10.20.30.1/16")
+    retained.set_retention(policy)
+    timestamp = 1_600_000_000
+    for response in _random_responses(rng, 600):
+        timestamp += rng.randint(1, 3)
+        full.append_ping_epoch(timestamp, response)
+        retained.append_ping_epoch(timestamp, response)
+
+    timestamps, responses = retained.get_columns()
+    assert len(timestamps) < 600
+    assert retained.evicted_samples + len(timestamps) == 600
+    # 保持している応答ログと重なる区間は、破棄した応答ログから継続しているものも含めて全ての応答ログを解析した場合と一致する
+    first = Server.epoch_to_datetime(timestamps[0])
+    for value in range(1, 6):
+        downtimes = Server._filter_time_range(full.get_downtimes(value), first, None)
+        assert retained.get_downtimes(value) == downtimes
+        assert retained.get_downtimes_multi([value]) == {value: downtimes}
+    overloads = Server._filter_time_range(full.get_overload_times(continuous, time_threshold), first, None)
+    assert retained.get_overload_times(continuous, time_threshold) == overloads
+    assert retained.get_overload_grid([continuous], [time_threshold]) == {(continuous, time_threshold): overloads}
+
+    # 破棄した応答ログはログデータと同じ形式で書き出され、保持している応答ログと合わせると全ての応答ログとなる
+    spilled = Server.load_data(file_path=spill_path)["10.20.30.1"]
+    assert list(spilled.get_columns()[0]) + list(timestamps) == list(full.get_columns()[0])
+    assert list(spilled.get_columns()[1]) + list(responses) == list(full.get_columns()[1])
+
+
+def test_retention_02():
+    server = Server.Server("10.20.30.1/16")
+    start = DT.datetime(2022, 10, 1)
+    for second in range(1000):
+        server.append_ping_results((start + DT.timedelta(seconds=second)).strftime("%Y%m%d%H%M%S"), 10)
+    assert server.retention is None
+
+    # 設定した時点で上限を超えている応答ログを破棄する
+    server.set_retention(Server.RetentionPolicy(max_age=100))
+    assert list(server.ping_results) == [start + DT.timedelta(seconds=second) for second in range(899, 1000)]
+    assert server.evicted_samples == 899
+    assert server.get_latency_summary().samples == 101
+
+    # 上限を超えた時点で、上限の`1 / _RETENTION_SLACK`の割合だけ余分に破棄する
+    server.set_retention(Server.RetentionPolicy(max_samples=80))
+    assert len(server.ping_results) == 80
+    server.append_ping_epoch(Server.datetime_to_epoch(start + DT.timedelta(seconds=1000)), 10)
+    assert len(server.ping_results) == 70
+    for second in range(1001, 1011):
+        server.append_ping_epoch(Server.datetime_to_epoch(start + DT.timedelta(seconds=second)), 10)
+    assert len(server.ping_results) == 80
+
+    # ダウンが継続している間も上限どおりに破棄し、ダウンタイムは破棄した応答ログを含めた本来の開始日時から求める
+    for second in range(1011, 1200):
+        server.append_ping_epoch(Server.datetime_to_epoch(start + DT.timedelta(seconds=second)), -1)
+    assert len(server.ping_results) <= 80
+    assert server.evicted_samples + len(server.ping_results) == 1200
+    assert server.get_downtimes() == [(start + DT.timedelta(seconds=1011), None)]
+    assert server.get_downtimes(200) == []
+    carry = server.retention_carry
+    assert carry is not None and carry.run_start == Server.datetime_to_epoch(start + DT.timedelta(seconds=1011))
+
+    server.set_retention(None)
+    assert server.retention is None
+
+    with pytest.raises(ValueError) as e:
+        server.set_retention(Server.RetentionPolicy(max_samples=0))
+    assert str(e.value) == "max_samples must over 0 (now 0)"
+    with pytest.raises(ValueError) as e:
+        server.set_retention(Server.RetentionPolicy(max_age=-1))
+    assert str(e.value) == "max_age must over 0 (now -1)"
+    with pytest.raises(ValueError) as e:
+        server.set_retention(Server.RetentionPolicy(max_samples=10, continuous=0))
+    assert str(e.value) == "continuous must over 0 (now 0)"
+
+
+def test_follower_retention_01(tmp_path):
+    file_path = "test_case/004_02_02.csv"
+    policy = Server.RetentionPolicy(max_samples=5, spill_path=str(tmp_path / "spill.csv"), continuous=2)
+    follower = Follower.LogFollower([file_path], continuous=2, time_threshold=100)
+    retained = Follower.LogFollower([file_path], continuous=2, time_threshold=100, retention=policy)
+    # 検出器は応答ログを保持しないため、保持ポリシーによらず同じイベントを出力する
+    assert retained.read_available() == follower.read_available()
+    servers = [server for network in retained.networks for server in network.servers]
+    assert all(server.retention == policy for server in servers)
+    assert sum(server.evicted_samples for server in servers) != 0
+
+
+def test_retention_late_row_01():
+    # 破棄が起きない間に日時の前後した応答ログを登録しても、集計表・スケッチに反映される
+    retained = Server.Server("10.20.30.1/16")
+    retained.set_retention(Server.RetentionPolicy(max_samples=100))
+    full = Server.Server("10.20.30.1/16")
+    for server in [retained, full]:
+        for timestamp, response in [(100, 10), (200, 20), (300, 30)]:
+            server.append_ping_epoch(timestamp, response)
+        assert server.get_latency_summary().samples == 3
+        assert server.get_latency_quantiles([1.0])[1.0] is not None
+        server.append_ping_epoch(150, 500)
+    assert retained.evicted_samples == 0
+    assert retained.get_latency_summary() == full.get_latency_summary()
+    assert retained.get_latency_summary().samples == 4
+    assert retained.get_latency_summary().max_msec == 500
+    assert retained.get_latency_quantiles([1.0]) == full.get_latency_quantiles([1.0])